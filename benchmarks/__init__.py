@@ -0,0 +1 @@
+"""gsab benchmarks — run with ``python -m benchmarks.run``."""
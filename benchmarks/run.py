@@ -0,0 +1,333 @@
+"""Run the gsab benchmarks and write machine-readable results.
+
+Usage (from the repo root)::
+
+    python -m benchmarks.run                       # everything, results to stdout
+    python -m benchmarks.run --quick -o new.json   # skip the 100k-row cases
+    python -m benchmarks.run -k read --compare old.json
+
+Each case runs against the in-memory `FakeSheetsService`, so numbers measure gsab's
+own encode / decode / diff work plus whatever latency the case injects — never the
+network. Every case reports the best of ``--repeat`` runs; the JSON carries the git
+commit and Python version so results from two commits can be compared directly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from cryptography.fernet import Fernet
+
+from gsab.core.connection import SheetConnection
+from gsab.core.query import build_gviz_url, parse_gviz_response
+from gsab.core.schema import Field, FieldType, Schema
+from gsab.core.sheet_manager import SheetManager
+from gsab.testing import FakeSheetsService
+from gsab.utils.metrics import OpMetrics
+
+TAB = "bench"
+
+
+def _schema() -> Schema:
+    return Schema(
+        TAB,
+        [
+            Field("id", FieldType.INTEGER, primary_key=True),
+            Field("name", FieldType.STRING),
+            Field("price", FieldType.FLOAT),
+            Field("active", FieldType.BOOLEAN),
+            Field("since", FieldType.DATE),
+        ],
+    )
+
+
+def _records(n: int, start: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(n + start)
+    day = date(2024, 1, 1)
+    return [
+        {
+            "id": i,
+            "name": f"user-{i}",
+            "price": round(rng.uniform(1, 1000), 2),
+            "active": i % 3 != 0,
+            "since": (day + timedelta(days=i % 365)).isoformat(),
+        }
+        for i in range(start, start + n)
+    ]
+
+
+def _grid(n: int) -> List[List[Any]]:
+    names = [f.name for f in _schema().fields]
+    return [names] + [[r[k] for k in names] for r in _records(n)]
+
+
+def _manager(rows: int, *, sink: list, latency: float = 0.0) -> SheetManager:
+    fake = FakeSheetsService(latency=latency)
+    db = SheetManager(SheetConnection(service=fake), _schema(), metrics=sink.append)
+    db.sheet_id = fake.add_spreadsheet({TAB: _grid(rows)})
+    return db
+
+
+# --- cases -------------------------------------------------------------------
+# Each case returns an async callable doing the timed work (setup happens outside
+# the timer) and the number of rows it processes.
+
+
+def read_decode(sink: list, n: int):
+    db = _manager(n, sink=sink)
+    return db.read, n
+
+
+def bulk_insert(sink: list, n: int):
+    db = _manager(0, sink=sink)
+    records = _records(n)
+    return (lambda: db.bulk_insert(records)), n
+
+
+def bulk_upsert(sink: list, n: int):
+    db = _manager(n, sink=sink)
+    # Half updates of existing keys, half new keys.
+    records = _records(n // 2, start=n // 2) + _records(n // 2, start=n)
+    return (lambda: db.bulk_upsert(records)), n
+
+
+def update_column(sink: list, n: int):
+    # One column set on the two thirds of rows that are active (mostly adjacent runs).
+    db = _manager(n, sink=sink)
+    return (lambda: db.update({"active": True}, {"price": 1.0})), n
+
+
+def concurrent_reads(sink: list, clients: int, rows: int = 1000, latency: float = 0.02):
+    db = _manager(rows, latency=latency, sink=sink)
+
+    async def run():
+        await asyncio.gather(*(db.read() for _ in range(clients)))
+
+    return run, clients * rows
+
+
+def watch_diff(sink: list, n: int, polls: int = 5):
+    db = _manager(n, sink=sink)
+    grid = db.connection.service.grid(db.sheet_id, TAB)
+
+    async def run():
+        events = db.watch(interval=0, emit_initial=True)
+        await events.__anext__()
+        for p in range(polls):
+            # Touch one row and add one per poll so every poll yields a change set.
+            grid[1 + p][1] = f"renamed-{p}"
+            grid.append([n + p, "new", 1.0, True, "2024-01-01"])
+            await events.__anext__()
+        await events.aclose()
+
+    return run, n * (polls + 1)
+
+
+def gviz_parse(sink: list, n: int):
+    fake = FakeSheetsService()
+    sheet_id = fake.add_spreadsheet({TAB: _grid(n)})
+    payload = fake.http_session().get(build_gviz_url(sheet_id, "SELECT *", sheet=TAB)).text
+
+    async def run():
+        parse_gviz_response(payload)
+
+    return run, n
+
+
+def query(sink: list, n: int):
+    db = _manager(n, sink=sink)
+
+    async def run():
+        await db.query("SELECT A, B, C WHERE D = true ORDER BY C DESC")
+
+    return run, n
+
+
+def query_all(sink: list, n: int, columnar: bool = False):
+    """A whole-tab query: gviz parsing plus per-column decoding dominate."""
+    db = _manager(n, sink=sink)
+
+    async def run():
+        if columnar:
+            await db.query("SELECT *", columnar=True)
+        else:
+            await db.query("SELECT *")
+
+    return run, n
+
+
+def _encrypted_manager(sink: list) -> SheetManager:
+    fields = [Field(f.name, f.field_type, encrypted=f.name == "name") for f in _schema().fields]
+    fake = FakeSheetsService()
+    db = SheetManager(
+        SheetConnection(service=fake),
+        Schema(TAB, fields),
+        Fernet.generate_key().decode(),
+        metrics=sink.append,
+    )
+    db.sheet_id = fake.add_spreadsheet({TAB: [[f.name for f in fields]]})
+    return db
+
+
+def encrypted_insert_read(sink: list, n: int):
+    # Insert then read back a tab with one encrypted column: n encrypts + n decrypts.
+    records = _records(n)
+
+    async def run():
+        db = _encrypted_manager(sink)
+        await db.bulk_insert(records)
+        await db.read()
+
+    return run, n
+
+
+def validate(sink: list, n: int):
+    schema = _schema()
+    records = _records(n)
+
+    async def run():
+        for record in records:
+            schema.validate(record)
+
+    return run, n
+
+
+def read_with_429(sink: list, n: int, reads: int = 4):
+    # One injected 429: four reads make one retry (with real backoff).
+    db = _manager(n, sink=sink)
+    db.connection.service.fail(429)
+
+    async def run():
+        for _ in range(reads):
+            await db.read()
+
+    return run, n * reads
+
+
+CASES: Dict[str, Callable[[list], Any]] = {
+    "read_decode_1k": lambda sink: read_decode(sink, 1_000),
+    "read_decode_10k": lambda sink: read_decode(sink, 10_000),
+    "read_decode_100k": lambda sink: read_decode(sink, 100_000),
+    "bulk_insert_1k": lambda sink: bulk_insert(sink, 1_000),
+    "bulk_insert_10k": lambda sink: bulk_insert(sink, 10_000),
+    "bulk_upsert_1k": lambda sink: bulk_upsert(sink, 1_000),
+    "bulk_upsert_10k": lambda sink: bulk_upsert(sink, 10_000),
+    "update_column_10k": lambda sink: update_column(sink, 10_000),
+    "concurrent_reads_1": lambda sink: concurrent_reads(sink, 1),
+    "concurrent_reads_8": lambda sink: concurrent_reads(sink, 8),
+    "concurrent_reads_32": lambda sink: concurrent_reads(sink, 32),
+    "watch_diff_10k": lambda sink: watch_diff(sink, 10_000),
+    "gviz_parse_10k": lambda sink: gviz_parse(sink, 10_000),
+    "gviz_parse_100k": lambda sink: gviz_parse(sink, 100_000),
+    "query_10k": lambda sink: query(sink, 10_000),
+    "query_all_100k": lambda sink: query_all(sink, 100_000),
+    "query_columnar_100k": lambda sink: query_all(sink, 100_000, columnar=True),
+    "read_with_429_1k": lambda sink: read_with_429(sink, 1_000),
+    "validate_100k": lambda sink: validate(sink, 100_000),
+    "encrypted_insert_read_10k": lambda sink: encrypted_insert_read(sink, 10_000),
+}
+SLOW = {
+    "read_decode_100k",
+    "gviz_parse_100k",
+    "validate_100k",
+    "query_all_100k",
+    "query_columnar_100k",
+}
+
+
+async def _measure(name: str, repeat: int) -> Dict[str, Any]:
+    best: Optional[float] = None
+    calls = retries = 0
+    rows = 0
+    for _ in range(repeat):
+        sink: List[OpMetrics] = []
+        fn, rows = CASES[name](sink)
+        start = time.perf_counter()
+        await fn()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+            calls = sum(m.api_calls for m in sink)
+            retries = sum(m.retries for m in sink)
+    return {
+        "name": name,
+        "seconds": round(best, 6),
+        "rows": rows,
+        "rows_per_s": round(rows / best) if best else None,
+        "api_calls": calls,
+        "retries": retries,
+    }
+
+
+def _meta() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def _compare(results: List[Dict[str, Any]], path: str) -> None:
+    with open(path, encoding="utf-8") as f:
+        before = {r["name"]: r for r in json.load(f)["results"]}
+    print(f"{'case':<22} {'before':>10} {'after':>10} {'change':>8}", file=sys.stderr)
+    for r in results:
+        old = before.get(r["name"])
+        if not old:
+            continue
+        change = (r["seconds"] - old["seconds"]) / old["seconds"] * 100 if old["seconds"] else 0
+        print(
+            f"{r['name']:<22} {old['seconds']:>9.4f}s {r['seconds']:>9.4f}s {change:>+7.1f}%",
+            file=sys.stderr,
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="only", help="run only cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="skip the 100k-row cases")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case (best is kept)")
+    parser.add_argument("-o", "--out", help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="a previous results file to diff against")
+    args = parser.parse_args(argv)
+
+    names = [
+        n for n in CASES if (not args.only or args.only in n) and not (args.quick and n in SLOW)
+    ]
+    results = []
+    for name in names:
+        result = asyncio.run(_measure(name, max(args.repeat, 1)))
+        print(
+            f"{name:<22} {result['seconds']:>9.4f}s  {result['rows_per_s']} rows/s", file=sys.stderr
+        )
+        results.append(result)
+
+    report = {"meta": _meta(), "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
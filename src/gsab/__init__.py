@@ -33,11 +33,25 @@ Key types:
     SheetManager               async create / insert / read / update / delete /
                                ``upsert()``, server-side ``query()``, native ``chart()``,
                                reactive ``watch()`` (Experimental) and public ``share()``.
+    SnapshotStore              optional on-disk tab snapshots for fast cold-start reads.
+    QueryCache                 optional in-memory TTL/LRU cache of ``query()`` results.
+    Select                     gviz queries by field name with quoted values (``db.select()``).
+    LocalSQL                   in-memory SQL (DuckDB / SQLite) over one or more tabs.
+    Database                   several tabs of one spreadsheet: batched reads, joins,
+                               and multi-tab writes in one ``batchUpdate``.
+    ShardedTable               one table hash-partitioned by primary key across several
+                               spreadsheets, past one sheet's size and write quota.
+    RetryPolicy                jittered, Retry-After aware, budgeted retries with a
+                               circuit breaker (``SheetConnection(retry_policy=...)``).
+    FileLock                   cross-process write lock for workers on one host
+                               (``SheetManager(..., write_lock=FileLock())``).
+    WriteAheadLog              durable local log that acknowledges inserts at once and
+                               appends them in the background (``wal=``).
 
 Errors: every exception subclasses ``GSABError`` — ``AuthError``,
-``ConnectionError``, ``NotFoundError``, ``PermissionDeniedError``,
-``QuotaExceededError``, ``ValidationError``, ``DuplicateKeyError``,
-``APIError`` — with messages written to be actionable for people and LLM
+``ConnectionError`` (and its ``CircuitOpenError``), ``NotFoundError``, ``PermissionDeniedError``,
+``QuotaExceededError``, ``ValidationError``, ``DuplicateKeyError``, ``ConflictError``,
+``LockTimeoutError``, ``APIError`` — with messages written to be actionable for people and LLM
 agents alike.
 
 Full documentation: https://gsab.ajmalaksar.com/docs
@@ -45,17 +59,18 @@ Full documentation: https://gsab.ajmalaksar.com/docs
 
 __version__ = "0.9.0"
 
-from .auth import login, logout, resolve_credentials, status
-from .core.connection import SheetConnection
-from .core.policy import AccessPolicy
-from .core.schema import Field, FieldType, Schema, ValidationRule
-from .core.sheet_manager import SheetManager
+import importlib
+from typing import TYPE_CHECKING
+
 from .exceptions import (
     APIError,
     AuthError,
+    CircuitOpenError,
+    ConflictError,
     ConnectionError,
     DuplicateKeyError,
     GSABError,
+    LockTimeoutError,
     NotFoundError,
     PermissionDeniedError,
     PolicyError,
@@ -63,6 +78,62 @@ from .exceptions import (
     ValidationError,
 )
 
+# Everything else is imported on first attribute access (PEP 562), so ``import gsab``
+# — and with it ``gsab --help`` / ``gsab version`` — doesn't pay for google-auth,
+# googleapiclient, cryptography or keyring until they're actually used.
+_LAZY = {
+    "SheetConnection": ".core.connection",
+    "Schema": ".core.schema",
+    "Field": ".core.schema",
+    "FieldType": ".core.schema",
+    "ValidationRule": ".core.schema",
+    "SheetManager": ".core.sheet_manager",
+    "SnapshotStore": ".core.snapshot",
+    "QueryCache": ".core.query_cache",
+    "Select": ".core.query_builder",
+    "LocalSQL": ".core.local_sql",
+    "Database": ".core.database",
+    "ShardedTable": ".core.sharding",
+    "AccessPolicy": ".core.policy",
+    "RetryPolicy": ".utils.retry",
+    "FileLock": ".core.write_lock",
+    "WriteAheadLog": ".core.wal",
+    "resolve_credentials": ".auth",
+    "login": ".auth",
+    "logout": ".auth",
+    "status": ".auth",
+}
+
+if TYPE_CHECKING:
+    from .auth import login, logout, resolve_credentials, status
+    from .core.connection import SheetConnection
+    from .core.database import Database
+    from .core.local_sql import LocalSQL
+    from .core.policy import AccessPolicy
+    from .core.query_builder import Select
+    from .core.query_cache import QueryCache
+    from .core.schema import Field, FieldType, Schema, ValidationRule
+    from .core.sharding import ShardedTable
+    from .core.sheet_manager import SheetManager
+    from .core.snapshot import SnapshotStore
+    from .core.wal import WriteAheadLog
+    from .core.write_lock import FileLock
+    from .utils.retry import RetryPolicy
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # cache: later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
 __all__ = [
     "SheetConnection",
     "Schema",
@@ -70,7 +141,16 @@ __all__ = [
     "FieldType",
     "ValidationRule",
     "SheetManager",
+    "SnapshotStore",
+    "QueryCache",
+    "Select",
+    "LocalSQL",
+    "Database",
+    "ShardedTable",
     "AccessPolicy",
+    "RetryPolicy",
+    "FileLock",
+    "WriteAheadLog",
     "resolve_credentials",
     "login",
     "logout",
@@ -78,11 +158,14 @@ __all__ = [
     "GSABError",
     "AuthError",
     "ConnectionError",
+    "CircuitOpenError",
     "NotFoundError",
     "PermissionDeniedError",
     "QuotaExceededError",
     "ValidationError",
     "DuplicateKeyError",
+    "ConflictError",
+    "LockTimeoutError",
     "APIError",
     "PolicyError",
 ]
@@ -2,19 +2,52 @@
 
 `resolve_credentials` auto-detects the best available credential source;
 `login`/`logout`/`status` manage the interactive browser sign-in.
+
+Attributes load on first use, so importing this package doesn't pull in
+google-auth until a credential is actually needed.
 """
 
-from .authenticator import GoogleAuthenticator  # back-compat (service account)
-from .resolver import (
-    CONFIG_DIR,
-    DEFAULT_SCOPES,
-    FULL_SCOPES,
-    TOKEN_PATH,
-    login,
-    logout,
-    resolve_credentials,
-    status,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+_LAZY = {
+    "resolve_credentials": ".resolver",
+    "login": ".resolver",
+    "logout": ".resolver",
+    "status": ".resolver",
+    "DEFAULT_SCOPES": ".resolver",
+    "FULL_SCOPES": ".resolver",
+    "TOKEN_PATH": ".resolver",
+    "CONFIG_DIR": ".resolver",
+    "GoogleAuthenticator": ".authenticator",  # back-compat (service account)
+}
+
+if TYPE_CHECKING:
+    from .authenticator import GoogleAuthenticator
+    from .resolver import (
+        CONFIG_DIR,
+        DEFAULT_SCOPES,
+        FULL_SCOPES,
+        TOKEN_PATH,
+        login,
+        logout,
+        resolve_credentials,
+        status,
+    )
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
 
 __all__ = [
     "resolve_credentials",
@@ -270,4 +270,7 @@ def logout() -> bool:
     if TOKEN_PATH.exists():
         TOKEN_PATH.unlink()
         removed = True
+    from ..core import pool
+
+    pool.clear()  # clients built on the old token must not outlive it
     return removed
@@ -15,12 +15,11 @@ from typing import Optional
 import typer
 
 from .. import __version__
-from ..auth import FULL_SCOPES
-from ..auth import login as _login
-from ..auth import logout as _logout
-from ..auth import status as _status
 from ..exceptions import AuthError, GSABError
 
+# Commands import what they need (google-auth, the Sheets client, pandas, ...) inside
+# their bodies, so `gsab --help` and `gsab version` start without loading any of it.
+
 app = typer.Typer(
     name="gsab",
     help="Google Sheets as a Backend - auth and manage your sheets from the terminal.",
@@ -109,9 +108,11 @@ def auth_login(
     ),
 ) -> None:
     """Sign in with Google (browser) and cache the token for reuse."""
+    from ..auth.resolver import FULL_SCOPES, login
+
     scopes = FULL_SCOPES if full else None
     try:
-        _login(scopes, client_secrets=client_secrets, no_browser=no_browser)
+        login(scopes, client_secrets=client_secrets, no_browser=no_browser)
     except AuthError as e:
         typer.secho(str(e), fg=typer.colors.RED, err=True)
         raise typer.Exit(1) from None
@@ -124,7 +125,9 @@ def auth_status(
     as_json: bool = typer.Option(False, "--json", help="Output raw JSON."),
 ) -> None:
     """Show which credential sources are available."""
-    info = _status()
+    from ..auth.resolver import status
+
+    info = status()
     if as_json:
         typer.echo(json.dumps(info, indent=2))
         raise typer.Exit()
@@ -140,7 +143,9 @@ def auth_status(
 @auth_app.command("logout")
 def auth_logout() -> None:
     """Remove the cached token."""
-    if _logout():
+    from ..auth.resolver import logout
+
+    if logout():
         typer.secho("Logged out (token removed).", fg=typer.colors.GREEN)
     else:
         typer.echo("No cached token to remove.")
@@ -266,8 +271,10 @@ def doctor(
     """Check your GSAB setup — and with --live, prove it end to end."""
     import sys
 
+    from ..auth.resolver import status
+
     typer.echo(f"gsab {__version__}  ·  Python {sys.version.split()[0]}")
-    info = _status()
+    info = status()
     authed = bool(info["logged_in"] and info["valid"])
     _check("authenticated", authed, info.get("storage", "") if authed else "run `gsab auth login`")
     _check("OAuth client available", bool(info["client_secrets"]))
@@ -368,47 +375,47 @@ def init(
 def import_csv(
     csv: str = typer.Argument(..., help="Path to the CSV file."),
     title: str = typer.Option(None, "--title", help="Spreadsheet title (default: the CSV name)."),
+    chunk_size: int = typer.Option(1000, "--chunk-size", min=1, help="Rows sent per append call."),
+    sample: int = typer.Option(
+        1000, "--sample", min=1, help="Rows read up front to infer column types."
+    ),
 ) -> None:
-    """Load a CSV into a new sheet, inferring a schema. Needs the pandas extra."""
-    try:
-        import pandas as pd
-    except ImportError:
-        typer.secho('Needs pandas: pip install "gsab[pandas]"', fg=typer.colors.RED, err=True)
-        raise typer.Exit(1) from None
+    """Stream a CSV into a new sheet, inferring a schema from the first rows.
 
+    Reads the file in chunks and uploads each as it goes, so memory stays flat
+    however large the CSV is. No pandas needed.
+    """
     src = Path(csv)
     if not src.exists():
         typer.secho(f"No such file: {csv}", fg=typer.colors.RED, err=True)
         raise typer.Exit(1)
 
-    from ..core.schema import Field, FieldType, Schema
-
-    df = pd.read_csv(src)
-    dtype_map = {
-        "int64": FieldType.INTEGER,
-        "int32": FieldType.INTEGER,
-        "float64": FieldType.FLOAT,
-        "float32": FieldType.FLOAT,
-        "bool": FieldType.BOOLEAN,
-    }
-    fields = []
-    for col in df.columns:
-        dt = str(df[col].dtype)
-        ftype = FieldType.DATETIME if "datetime" in dt else dtype_map.get(dt, FieldType.STRING)
-        fields.append(Field(str(col), ftype, required=False))
-    tab = re.sub(r"[^A-Za-z0-9_]+", "_", src.stem) or "data"
-    schema = Schema(tab, fields)
-
     import asyncio
+    import sys
+    import time
 
     from ..core.connection import SheetConnection
     from ..core.sheet_manager import SheetManager
+    from ..utils.csv_import import CsvStream, tab_name
 
     async def run() -> tuple:
-        db = SheetManager(SheetConnection(), schema)
-        sid = await db.create_sheet(title or src.stem)
-        clean = df.where(pd.notnull(df), None)  # NaN -> empty cell
-        return sid, await db.from_dataframe(clean)
+        with CsvStream(src, sample_size=sample) as stream:
+            db = SheetManager(SheetConnection(), stream.schema(tab_name(src)))
+            sid = await db.create_sheet(title or src.stem)
+            total, started, shown = 0, time.monotonic(), 0
+            with typer.progressbar(
+                length=max(stream.size, 1),
+                label="Importing",
+                item_show_func=lambda info: info,
+                file=sys.stderr,
+            ) as bar:
+                for chunk in stream.chunks(chunk_size):
+                    total += await db.bulk_insert(chunk)
+                    rate = total / max(time.monotonic() - started, 1e-6)
+                    bar.current_item = f"{total:,} rows · {rate:,.0f} rows/s"
+                    bar.update(stream.bytes_read - shown)
+                    shown = stream.bytes_read
+            return sid, total
 
     try:
         sid, n = asyncio.run(run())
@@ -419,6 +426,80 @@ def import_csv(
     typer.echo(f"  https://docs.google.com/spreadsheets/d/{sid}")
 
 
+async def _attach(sheet_id: str, tab: Optional[str]):
+    """A SheetManager on an existing tab, with text columns read from its header row."""
+    from ..core.connection import SheetConnection
+    from ..core.schema import Field, FieldType, Schema
+    from ..core.sheet_manager import SheetManager
+    from ..utils.errors import execute
+
+    conn = SheetConnection()
+    await conn.connect()
+    sheets = conn.service.spreadsheets()
+    if tab is None:
+        meta = await execute(sheets.get(spreadsheetId=sheet_id), op="export")
+        tab = meta["sheets"][0]["properties"]["title"]
+    res = await execute(
+        sheets.values().get(spreadsheetId=sheet_id, range=f"{tab}!A1:Z1"), op="export"
+    )
+    cols = (res.get("values") or [[]])[0]
+    if not cols:
+        raise GSABError(f"Sheet {sheet_id} has no header row to infer columns from.")
+    db = SheetManager(conn, Schema(tab, [Field(c, FieldType.STRING, required=False) for c in cols]))
+    db.sheet_id = sheet_id
+    return db
+
+
+@app.command("export")
+def export_cmd(
+    sheet_id: str = typer.Argument(..., help="Spreadsheet id to export from."),
+    tab: Optional[str] = typer.Option(None, "--tab", help="Tab to export (default: the first)."),
+    fmt: Optional[str] = typer.Option(
+        None,
+        "--format",
+        "-f",
+        help="csv, ndjson or parquet (default: from --out's extension, else csv).",
+    ),
+    out: Optional[str] = typer.Option(
+        None, "--out", "-o", help="Write to this file instead of stdout."
+    ),
+    page_size: int = typer.Option(1000, "--page-size", min=1, help="Rows fetched per read call."),
+) -> None:
+    """Stream a tab to CSV, NDJSON or Parquet — to a file, or stdout for piping.
+
+    Rows are read a page at a time and written as they arrive, so memory stays
+    bounded however large the tab is. Parquet needs the parquet extra.
+    """
+    import asyncio
+    import sys
+
+    from ..utils.export import resolve_format
+
+    try:
+        fmt = resolve_format(out, fmt)
+    except GSABError as e:
+        typer.secho(str(e), fg=typer.colors.RED, err=True)
+        raise typer.Exit(1) from None
+    if out:
+        dest = out
+    else:
+        dest = sys.stdout.buffer if fmt == "parquet" else sys.stdout
+
+    async def run() -> int:
+        db = await _attach(sheet_id, tab)
+        return await db.export(dest, format=fmt, page_size=page_size)
+
+    try:
+        n = asyncio.run(run())
+    except ImportError as e:
+        typer.secho(str(e), fg=typer.colors.RED, err=True)
+        raise typer.Exit(1) from None
+    except GSABError as e:
+        typer.secho(str(e), fg=typer.colors.RED, err=True)
+        raise typer.Exit(1) from None
+    typer.secho(f"Exported {n} rows ({fmt}).", fg=typer.colors.GREEN, err=True)
+
+
 cookbook_app = typer.Typer(help="Ready-to-run GSAB recipes.", no_args_is_help=True)
 app.add_typer(cookbook_app, name="cookbook")
 
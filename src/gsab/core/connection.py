@@ -1,9 +1,9 @@
 from typing import Optional, Sequence
 
-from googleapiclient.discovery import build
-
 from ..auth.resolver import DEFAULT_SCOPES, resolve_credentials
 from ..exceptions.custom_exceptions import ConnectionError
+from ..utils.retry import RetryPolicy
+from . import pool
 
 
 class SheetConnection:
@@ -11,7 +11,17 @@ class SheetConnection:
 
     Credentials are auto-resolved (cached `gsab auth login` token -> gcloud ADC
     -> service account). Inject your own with `credentials`, or point at a
-    service-account file with `service_account_file` for servers/CI.
+    service-account file with `service_account_file` for servers/CI. Pass a
+    ready-made `service` (e.g. ``gsab.testing.FakeSheetsService``) to skip
+    credentials and discovery entirely.
+
+    Built clients come from a per-thread pool (`gsab.core.pool`): every
+    connection on the same credentials in a thread shares one Sheets client and
+    its HTTP connections, so extra connections cost no discovery parsing.
+
+    ``retry_policy`` tunes how failed calls on this connection are retried —
+    backoff, ``Retry-After`` handling, retry budget, circuit breaker (see
+    `RetryPolicy`). By default they share the process-wide policy.
     """
 
     def __init__(
@@ -22,16 +32,19 @@ class SheetConnection:
         service_account_file: Optional[str] = None,
         scopes: Optional[Sequence[str]] = None,
         interactive: bool = False,
+        service=None,
+        retry_policy: Optional[RetryPolicy] = None,
     ):
         self.credentials = credentials
         # `credentials_path` kept as a positional alias for service_account_file.
         self.service_account_file = service_account_file or credentials_path
         self.scopes = list(scopes) if scopes else list(DEFAULT_SCOPES)
         self.interactive = interactive
-        self.service = None
+        self.service = service
+        self.retry_policy = retry_policy
 
     async def connect(self) -> None:
-        """Resolve credentials (if needed) and build the Sheets service."""
+        """Resolve credentials (if needed) and fetch the shared Sheets service."""
         try:
             if self.credentials is None:
                 self.credentials = resolve_credentials(
@@ -39,10 +52,33 @@ class SheetConnection:
                     service_account_file=self.service_account_file,
                     interactive=self.interactive,
                 )
-            self.service = build("sheets", "v4", credentials=self.credentials)
+            self.service = pool.service("sheets", "v4", self.credentials)
         except Exception as e:
             raise ConnectionError(f"Failed to connect to Google Sheets API: {e}") from e
 
+    def drive(self):
+        """The shared Drive v3 client for these credentials, or the service's own if it has one.
+
+        Raises:
+            ConnectionError: a ready-made ``service`` was injected without credentials
+                and has no ``drive()`` of its own.
+        """
+        own = getattr(self.service, "drive", None)
+        if own:
+            return own()
+        if self.credentials is None and self.service is not None:
+            raise ConnectionError(
+                "This connection was given a ready-made `service` without credentials, "
+                "so it has no Drive client. Pass `credentials=` too, or a service that "
+                "provides `drive()`."
+            )
+        return pool.service("drive", "v3", self.credentials)
+
+    def http_session(self):
+        """A shared authorized HTTP session (for gviz), or the service's own if it has one."""
+        own = getattr(self.service, "http_session", None)
+        return own() if own else pool.http_session(self.credentials)
+
     def is_connected(self) -> bool:
         """Return True once the service has been built."""
         return self.service is not None
@@ -0,0 +1,445 @@
+"""Database — several tabs of one spreadsheet, read and written together.
+
+A ``SheetManager`` is one tab. A ``Database`` groups the ``Schema`` of every tab in
+a spreadsheet so related data moves in as few round-trips as Google allows:
+
+- ``read()`` fetches any number of tabs in a single ``values().batchGet``;
+- ``join()`` / ``lookup()`` relate tabs through a hashed index, in Python;
+- ``transaction()`` sends inserts, updates and deletes across tabs as one
+  ``batchUpdate`` — which Google applies all-or-nothing.
+
+Joins are client-side (Sheets has no foreign keys), and a transaction is only as
+isolated as Sheets allows: rows are read at commit, then written in one call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..exceptions.custom_exceptions import NotFoundError, ValidationError
+from ..utils import metrics
+from ..utils.errors import execute
+from ..utils.metrics import MetricsHook, instrumented
+from .connection import SheetConnection
+from .policy import AccessPolicy
+from .schema import Schema
+from .sheet_manager import SheetManager
+from .write_lock import LockBackend
+
+logger = logging.getLogger(__name__)
+
+
+class Database:
+    """A spreadsheet of several tabs, each described by a `Schema`.
+
+    Args:
+        connection: a `SheetConnection` shared by every tab.
+        schemas: one `Schema` per tab; the tab name is ``schema.name``.
+        encryption_key: Fernet key for any encrypted fields.
+        policy: an `AccessPolicy` applied to every tab.
+        metrics: a hook called with an `OpMetrics` after each operation.
+        write_lock: a cross-process lock backend (e.g. `FileLock`) held around
+            writes, as for `SheetManager`.
+
+    Example:
+        db = Database(SheetConnection(), [users_schema, orders_schema])
+        await db.create("Shop")
+        data = await db.read("users", "orders")          # one batchGet
+        rows = await db.join("orders", "users", on=("user_id", "id"))
+        async with db.transaction() as tx:                 # one batchUpdate
+            tx.insert("orders", {"id": 7, "user_id": 1, "total": 30})
+            tx.update("users", {"id": 1}, {"plan": "pro"})
+    """
+
+    def __init__(
+        self,
+        connection: SheetConnection,
+        schemas: Sequence[Schema],
+        encryption_key: Optional[str] = None,
+        *,
+        policy: Optional[AccessPolicy] = None,
+        metrics: Optional[MetricsHook] = None,
+        write_lock: Optional[LockBackend] = None,
+    ):
+        names = [s.name for s in schemas]
+        if len(set(names)) != len(names):
+            raise ValidationError(f"Each tab needs its own schema name (got {names}).")
+        self.connection = connection
+        self.policy = policy or AccessPolicy()
+        self.metrics = metrics
+        self.tables: Dict[str, SheetManager] = {
+            s.name: SheetManager(
+                connection,
+                s,
+                encryption_key,
+                policy=self.policy,
+                metrics=metrics,
+                write_lock=write_lock,
+            )
+            for s in schemas
+        }
+        self._sheet_id: Optional[str] = None
+        self._tab_ids: Optional[Dict[str, int]] = None
+
+    @property
+    def _retry(self):
+        """The connection's `RetryPolicy` (None: the process-wide default)."""
+        return getattr(self.connection, "retry_policy", None)
+
+    @property
+    def sheet_id(self) -> Optional[str]:
+        """The spreadsheet id every tab is bound to."""
+        return self._sheet_id
+
+    @sheet_id.setter
+    def sheet_id(self, value: Optional[str]) -> None:
+        self._sheet_id = value
+        self._tab_ids = None
+        for table in self.tables.values():
+            table.sheet_id = value
+
+    def table(self, name: str) -> SheetManager:
+        """The `SheetManager` for one tab."""
+        try:
+            return self.tables[name]
+        except KeyError:
+            raise ValidationError(
+                f"Unknown tab '{name}'. Tabs: {', '.join(self.tables)}."
+            ) from None
+
+    __getitem__ = table
+
+    def _first(self) -> SheetManager:
+        table = next(iter(self.tables.values()))
+        table._require_sheet()
+        return table
+
+    @instrumented("create_sheet")
+    async def create(self, title: str) -> str:
+        """Create a spreadsheet with one tab per schema, in one call. Returns its id."""
+        self.policy.ensure_writable("create_sheet")
+        first = next(iter(self.tables.values()))
+        await first._ensure_connected()
+        body = {
+            "properties": {"title": title},
+            "sheets": [
+                {
+                    "properties": {"title": name},
+                    "data": [{"rowData": {"values": table._create_header_row()}}],
+                }
+                for name, table in self.tables.items()
+            ],
+        }
+        result = await execute(
+            self.connection.service.spreadsheets().create(body=body),
+            op="create_sheet",
+            retry_policy=self._retry,
+        )
+        self.sheet_id = result["spreadsheetId"]
+        for table in self.tables.values():
+            table._created_here = True
+        logger.info("Created new sheet with ID: %s (%d tabs)", self.sheet_id, len(self.tables))
+        self.policy.emit({"op": "create_sheet", "sheet_id": self.sheet_id, "title": title})
+        return self.sheet_id
+
+    async def _read_indexed(self, names: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Decoded rows (with ``_row_index``) of several tabs, from one ``batchGet``."""
+        tables = [self.table(n) for n in names]
+        if not tables:
+            return {}
+        self._first()
+        await tables[0]._ensure_connected()
+        result = await execute(
+            self.connection.service.spreadsheets()
+            .values()
+            .batchGet(spreadsheetId=self.sheet_id, ranges=[f"{n}!A:Z" for n in names]),
+            op="read",
+            retry_policy=self._retry,
+        )
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        for table, value_range in zip(tables, result.get("valueRanges", [])):
+            values = value_range.get("values") or []
+            out[table.schema.name] = (
+                await table._decode_rows_async(values[0], values[1:], 1) if len(values) > 1 else []
+            )
+        return out
+
+    @instrumented("read")
+    async def read(
+        self, *names: str, filters: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Read several tabs in one round-trip. Returns ``{tab: rows}``.
+
+        Args:
+            *names: tabs to read (default: every tab).
+            filters: optional ``{tab: read()-style filters}``.
+        """
+        names = names or tuple(self.tables)
+        data = await self._read_indexed(names)
+        filters = filters or {}
+        for name, rows in data.items():
+            table = self.tables[name]
+            if filters.get(name):
+                rows[:] = [r for r in rows if table._matches_filters(r, filters[name])]
+            for row in rows:
+                row.pop("_row_index", None)
+            self.policy.emit({"op": "read", "sheet_id": self.sheet_id, "count": len(rows)})
+        return data
+
+    @instrumented("read")
+    async def lookup(self, name: str, key: Optional[str] = None) -> Dict[Any, Dict[str, Any]]:
+        """A hashed index of one tab: ``{key value: row}`` (key defaults to the primary key)."""
+        table = self.table(name)
+        key = key or table.schema.primary_key
+        if not key:
+            raise ValidationError(f"Tab '{name}' has no primary key — pass key='<field>'.")
+        rows = (await self.read(name))[name]
+        return {row.get(key): row for row in rows}
+
+    @instrumented("read")
+    async def join(
+        self,
+        left: str,
+        right: str,
+        *,
+        on: Union[str, Tuple[str, str]],
+        how: str = "inner",
+    ) -> List[Dict[str, Any]]:
+        """Join two tabs on a key, client-side, with both read in one round-trip.
+
+        Builds a hash index of ``right`` on its key, then probes it once per
+        ``left`` row. Each result is the left row merged with the matching right
+        row; a right field whose name the left row already uses is prefixed with
+        ``"<right>."`` (e.g. ``"users.id"``).
+
+        Args:
+            left / right: tab names.
+            on: the shared field name, or ``(left_field, right_field)``.
+            how: ``"inner"`` (matches only) or ``"left"`` (keep unmatched left rows).
+        """
+        if how not in ("inner", "left"):
+            raise ValidationError("join `how` must be 'inner' or 'left'.")
+        left_key, right_key = (on, on) if isinstance(on, str) else on
+        for name, field in ((left, left_key), (right, right_key)):
+            if self.table(name).schema.get_field(field) is None:
+                raise ValidationError(f"Unknown field '{field}' in tab '{name}'.")
+        data = await self.read(left, right)
+        index: Dict[Any, List[Dict[str, Any]]] = {}
+        for row in data[right]:
+            index.setdefault(row.get(right_key), []).append(row)
+        joined: List[Dict[str, Any]] = []
+        for row in data[left]:
+            matches = index.get(row.get(left_key))
+            if not matches:
+                if how == "left":
+                    joined.append(dict(row))
+                continue
+            for match in matches:
+                merged = dict(row)
+                for k, v in match.items():
+                    merged[f"{right}.{k}" if k in row else k] = v
+                joined.append(merged)
+        return joined
+
+    @instrumented("sql")
+    async def sql(
+        self, sql: str, params: Optional[List[Any]] = None, *, engine: str = "auto"
+    ) -> List[Dict[str, Any]]:
+        """Run local SQL over every tab (each a table), loaded in one ``batchGet``."""
+        from .local_sql import LocalSQL
+
+        data = await self.read()
+        local = LocalSQL(*self.tables.values(), engine=engine)
+        local.load_rows({name: (self.tables[name].schema, rows) for name, rows in data.items()})
+        try:
+            return local.query(sql, params)
+        finally:
+            local.close()
+
+    async def tab_ids(self) -> Dict[str, int]:
+        """Each tab's numeric ``sheetId`` (cached — tab ids never change)."""
+        if self._tab_ids is None:
+            meta = await execute(
+                self.connection.service.spreadsheets().get(spreadsheetId=self.sheet_id),
+                op="metadata",
+                retry_policy=self._retry,
+            )
+            ids = {s["properties"]["title"]: s["properties"]["sheetId"] for s in meta["sheets"]}
+            missing = [n for n in self.tables if n not in ids]
+            if missing:
+                raise NotFoundError(
+                    f"Tab(s) {', '.join(missing)} not found in spreadsheet {self.sheet_id}."
+                )
+            self._tab_ids = ids
+        return self._tab_ids
+
+    def transaction(self) -> "Transaction":
+        """Collect writes across tabs and send them as one ``batchUpdate``.
+
+        Use as ``async with db.transaction() as tx: ...`` (commits on a clean exit,
+        discards on an exception) or call ``await tx.commit()`` yourself.
+        """
+        return Transaction(self)
+
+
+class Transaction:
+    """Queued inserts / updates / deletes over a `Database`, committed in one call.
+
+    ``commit()`` reads the tabs it needs in one ``batchGet`` (only when an update,
+    delete or unique check calls for it), then writes everything in a single
+    ``batchUpdate``, which Google applies atomically. Filters match rows as they
+    are at commit time; updates apply in order, then deletes, then inserts.
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+        self.metrics = database.metrics
+        self._ops: List[Tuple[str, str, Any]] = []
+
+    @property
+    def sheet_id(self) -> Optional[str]:
+        return self.database.sheet_id
+
+    def insert(self, tab: str, record: Dict[str, Any]) -> None:
+        """Queue one record for insertion into ``tab``."""
+        self.bulk_insert(tab, [record])
+
+    def bulk_insert(self, tab: str, records: List[Dict[str, Any]]) -> None:
+        """Queue records for insertion (validated now, written at commit)."""
+        table = self.database.table(tab)
+        table.policy.ensure_writable("insert")
+        self._ops.append(("insert", tab, (records, table._encode_rows(records))))
+
+    def update(self, tab: str, filters: Dict[str, Any], changes: Dict[str, Any]) -> None:
+        """Queue an update of the rows of ``tab`` matching ``filters``."""
+        self.database.table(tab).policy.ensure_writable("update")
+        self._ops.append(("update", tab, (filters, changes)))
+
+    def delete(self, tab: str, filters: Dict[str, Any], *, confirm: bool = False) -> None:
+        """Queue a delete of the rows of ``tab`` matching ``filters``."""
+        policy = self.database.table(tab).policy
+        policy.ensure_writable("delete")
+        policy.ensure_destructive_ok("delete", confirm)
+        self._ops.append(("delete", tab, filters))
+
+    async def __aenter__(self) -> "Transaction":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.commit()
+        else:
+            self._ops = []
+
+    @instrumented("transaction")
+    async def commit(self) -> Dict[str, Dict[str, int]]:
+        """Send every queued write in one ``batchUpdate``.
+
+        Returns:
+            Per-tab counts, e.g. ``{"orders": {"inserted": 1, "updated": 0, "deleted": 0}}``.
+
+        Raises:
+            DuplicateKeyError: an insert clashes with a unique / primary key.
+        """
+        ops, self._ops = self._ops, []
+        if not ops:
+            return {}
+        db = self.database
+        db._first()
+        async with AsyncExitStack() as locks:
+            # Every touched tab's write lock, in name order so transactions can't deadlock.
+            for tab in sorted({tab for _, tab, _ in ops}):
+                await locks.enter_async_context(db.tables[tab]._writing())
+            counts = await self._apply(ops)
+        m = metrics.current()
+        if m is not None:
+            m.rows = sum(n for tab in counts.values() for n in tab.values())
+        return counts
+
+    async def _apply(self, ops: List[Tuple[str, str, Any]]) -> Dict[str, Dict[str, int]]:
+        """`commit` body, run holding the write locks: read, plan, one ``batchUpdate``."""
+        db = self.database
+        needs_read = sorted(
+            {tab for kind, tab, _ in ops if kind != "insert" or db.tables[tab].schema.unique_fields}
+        )
+        existing, tab_ids = await asyncio.gather(db._read_indexed(needs_read), db.tab_ids())
+
+        counts = {tab: {"inserted": 0, "updated": 0, "deleted": 0} for _, tab, _ in ops}
+        updates: List[Dict[str, Any]] = []
+        deletes: Dict[str, set] = {}
+        appends: List[Dict[str, Any]] = []
+        for kind, tab, payload in ops:
+            table = db.tables[tab]
+            if kind == "insert":
+                records, rows = payload
+                if table.schema.unique_fields:
+                    table._assert_unique(existing[tab], records)
+                    existing[tab].extend(dict(r) for r in records)  # later inserts see these
+                appends.append(
+                    {
+                        "appendCells": {
+                            "sheetId": tab_ids[tab],
+                            "rows": [
+                                {
+                                    "values": [
+                                        {"userEnteredValue": table._as_user_entered(c)} for c in row
+                                    ]
+                                }
+                                for row in rows
+                            ],
+                            "fields": "userEnteredValue",
+                        }
+                    }
+                )
+                counts[tab]["inserted"] += len(rows)
+            elif kind == "update":
+                filters, changes = payload
+                for row in existing[tab]:
+                    if "_row_index" in row and table._matches_filters(row, filters):
+                        row.update(changes)  # a later op on this row sees the change
+                        updates.append(
+                            table._update_cells_request(
+                                tab_ids[tab], row["_row_index"], table._merge(row, {})
+                            )
+                        )
+                        counts[tab]["updated"] += 1
+            else:
+                hits = {
+                    row["_row_index"]
+                    for row in existing[tab]
+                    if "_row_index" in row and table._matches_filters(row, payload)
+                }
+                deletes.setdefault(tab, set()).update(hits)
+                counts[tab]["deleted"] = len(deletes[tab])
+
+        removals = [
+            {
+                "deleteDimension": {
+                    "range": {
+                        "sheetId": tab_ids[tab],
+                        "dimension": "ROWS",
+                        "startIndex": i,
+                        "endIndex": i + 1,
+                    }
+                }
+            }
+            for tab, indices in deletes.items()
+            # Highest index first so deleting a row never shifts the ones still to delete.
+            for i in sorted(indices, reverse=True)
+        ]
+        requests = updates + removals + appends
+        if requests:
+            await execute(
+                db.connection.service.spreadsheets().batchUpdate(
+                    spreadsheetId=db.sheet_id, body={"requests": requests}
+                ),
+                op="transaction",
+                retry_policy=db._retry,
+            )
+            for tab in counts:
+                db.tables[tab]._invalidate_reads()
+        db.policy.emit({"op": "transaction", "sheet_id": db.sheet_id, "tabs": counts})
+        return counts
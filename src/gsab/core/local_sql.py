@@ -0,0 +1,163 @@
+"""Local SQL over tab rows: real field names, joins, no API quota per query.
+
+``LocalSQL`` loads the rows of one or more ``SheetManager`` tabs into an in-memory
+database — DuckDB when it's installed, else the stdlib ``sqlite3`` — with a table
+per tab named after its schema and columns typed from the schema. Queries then run
+entirely locally, so a dashboard can ask the same aggregate a hundred times without
+touching Google. Pair the managers with a ``SnapshotStore`` to make each ``load()``
+a metadata call instead of a download when nothing changed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..exceptions.custom_exceptions import ValidationError
+from .schema import FieldType, Schema
+
+ENGINES = ("auto", "sqlite", "duckdb")
+
+# Column types per engine. SQLite stores dates as ISO text (its own convention).
+_SQLITE_TYPES = {
+    FieldType.INTEGER: "INTEGER",
+    FieldType.FLOAT: "REAL",
+    FieldType.BOOLEAN: "INTEGER",
+}
+_DUCKDB_TYPES = {
+    FieldType.INTEGER: "BIGINT",
+    FieldType.FLOAT: "DOUBLE",
+    FieldType.BOOLEAN: "BOOLEAN",
+    FieldType.DATE: "DATE",
+    FieldType.DATETIME: "TIMESTAMP",
+}
+
+
+def _quote(name: str) -> str:
+    """Quote an identifier (tab or field name) for SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _resolve_engine(engine: str) -> str:
+    if engine not in ENGINES:
+        raise ValidationError(f"Unknown SQL engine '{engine}'. Use one of: {', '.join(ENGINES)}.")
+    if engine != "auto":
+        return engine
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return "sqlite"
+    return "duckdb"
+
+
+class LocalSQL:
+    """An in-memory SQL engine over the rows of one or more tabs.
+
+    Args:
+        *managers: the ``SheetManager`` tabs to expose; each becomes a table named
+            after its schema (``users``, ``orders``, …).
+        engine: ``"duckdb"``, ``"sqlite"``, or ``"auto"`` (DuckDB if installed).
+
+    Example:
+        sql = await LocalSQL(users, orders).load()
+        sql.query("SELECT u.name, SUM(o.total) FROM users u JOIN orders o "
+                  "ON o.user_id = u.id GROUP BY u.name")
+        sql.query("SELECT * FROM users WHERE plan = ?", ["pro"])   # no API call
+    """
+
+    def __init__(self, *managers: Any, engine: str = "auto"):
+        if not managers:
+            raise ValidationError("LocalSQL needs at least one SheetManager.")
+        names = [m.schema.name for m in managers]
+        dupes = sorted({n for n in names if names.count(n) > 1})
+        if dupes:
+            raise ValidationError(f"Two tabs share the table name(s) {', '.join(dupes)}.")
+        self.managers = managers
+        self.engine = _resolve_engine(engine)
+        self._conn: Any = None
+
+    async def load(self) -> "LocalSQL":
+        """(Re)load every tab's rows — read concurrently — into a fresh database."""
+        tables = await asyncio.gather(*(m.read() for m in self.managers))
+        self.load_rows({m.schema.name: (m.schema, rows) for m, rows in zip(self.managers, tables)})
+        return self
+
+    def load_rows(self, tables: Dict[str, Any]) -> None:
+        """Build the database from ``{name: (schema, rows)}`` already in hand."""
+        self.close()
+        if self.engine == "duckdb":
+            import duckdb
+
+            self._conn = duckdb.connect()
+            types = _DUCKDB_TYPES
+        else:
+            self._conn = sqlite3.connect(":memory:")
+            types = _SQLITE_TYPES
+        for name, (schema, rows) in tables.items():
+            self._create(name, schema, rows, types)
+
+    def _create(self, name: str, schema: Schema, rows: List[Dict[str, Any]], types) -> None:
+        cols = ", ".join(
+            f"{_quote(f.name)} {types.get(f.field_type, 'TEXT')}" for f in schema.fields
+        )
+        self._conn.execute(f"CREATE TABLE {_quote(name)} ({cols})")
+        if not rows:
+            return
+        converters = [(f.name, self._converter(f.field_type)) for f in schema.fields]
+        marks = ", ".join("?" for _ in converters)
+        self._conn.executemany(
+            f"INSERT INTO {_quote(name)} VALUES ({marks})",
+            [tuple(conv(row.get(fname)) for fname, conv in converters) for row in rows],
+        )
+
+    def _converter(self, ftype: FieldType):
+        """Map a decoded cell to a column value; anything off-type becomes NULL."""
+        native_dates = self.engine == "duckdb"
+
+        def convert(value: Any) -> Any:
+            if value is None or value == "":
+                return None
+            if ftype is FieldType.INTEGER:
+                return value if isinstance(value, int) and not isinstance(value, bool) else None
+            if ftype is FieldType.FLOAT:
+                ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+                return float(value) if ok else None
+            if ftype is FieldType.BOOLEAN:
+                return value if isinstance(value, bool) else None
+            if ftype in (FieldType.DATE, FieldType.DATETIME):
+                if not isinstance(value, (date, datetime)):
+                    return None
+                return value if native_dates else value.isoformat()
+            if isinstance(value, (dict, list)):
+                return json.dumps(value, default=str)
+            return str(value)
+
+        return convert
+
+    def query(self, sql: str, params: Optional[Sequence[Any]] = None) -> List[Dict[str, Any]]:
+        """Run ``sql`` locally and return rows as dicts keyed by column name.
+
+        Use ``?`` placeholders with ``params`` rather than formatting values in.
+        """
+        if self._conn is None:
+            raise ValidationError("LocalSQL has no data yet — call `await sql.load()` first.")
+        errors: tuple = (sqlite3.Error,)
+        if self.engine == "duckdb":
+            import duckdb
+
+            errors = (duckdb.Error,)
+        try:
+            cursor = self._conn.execute(sql, list(params or []))
+            names = [d[0] for d in cursor.description or []]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+        except errors as e:
+            raise ValidationError(f"Local SQL failed: {e}") from e
+
+    def close(self) -> None:
+        """Drop the in-memory database."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,106 @@
+"""Pool of built Google API clients, shared per credential within a thread.
+
+Building a client (``googleapiclient.discovery.build``) parses a discovery
+document and opens a fresh HTTP connection pool, so doing it per
+``SheetConnection`` — or per ``share()`` call — makes attaching a sheet slow and
+lets memory grow with the number of sheets. The pool builds each Sheets / Drive
+client (and the gviz ``AuthorizedSession``) once per credential, from the
+discovery documents bundled with ``google-api-python-client`` (no network fetch),
+and hands the same object — with its warm HTTP connections — to every caller in
+the thread.
+
+Credentials are matched by identity of the account and grant, not by object:
+two ``resolve_credentials()`` calls for the same login share one client, while
+a different delegated subject, quota project or token endpoint gets its own.
+
+The pool is per thread. A discovery client wraps a single ``httplib2.Http``,
+which isn't thread-safe, so each thread (each event loop, in an app that runs
+several) gets clients of its own and never shares a connection with another.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Any, Dict, Hashable, Tuple
+
+_local = threading.local()
+_generation = 0  # bumped by clear(): every thread's clients are dropped on next use
+
+
+def credential_key(credentials: Any) -> Hashable:
+    """A stable key for the account + grant behind ``credentials``.
+
+    Recognised credentials (a service account, or an OAuth client with a refresh
+    token) are keyed by everything that changes who the calls act as or bill to:
+    the account, the domain-wide-delegation subject, the grant, the scopes, the
+    quota project, the token URI and the universe. Anything else is keyed by the
+    object itself, so it never shares a client with another credential.
+    """
+    if credentials is None:
+        return None
+    service_account = getattr(credentials, "service_account_email", None)
+    client_id = getattr(credentials, "client_id", None)
+    refresh = getattr(credentials, "refresh_token", None)
+    if service_account:
+        account, grant = service_account, getattr(credentials, "_subject", None)
+    elif client_id and refresh:
+        # Hash the refresh token so a re-login (new grant) gets its own client.
+        account = client_id
+        grant = hashlib.sha256(refresh.encode("utf-8")).hexdigest()[:16]
+    else:
+        return ("object", id(credentials))
+    scopes = tuple(sorted(getattr(credentials, "scopes", None) or ()))
+    token_uri = getattr(credentials, "token_uri", None) or getattr(credentials, "_token_uri", None)
+    return (
+        type(credentials).__name__,
+        account,
+        grant,
+        scopes,
+        getattr(credentials, "quota_project_id", None),
+        token_uri,
+        getattr(credentials, "universe_domain", None),
+    )
+
+
+def _clients() -> Dict[Tuple[Hashable, str], Tuple[Any, Any]]:
+    """This thread's ``(client, credentials)`` pairs, emptied after a `clear()`."""
+    if getattr(_local, "generation", None) != _generation:
+        _local.generation, _local.clients = _generation, {}
+    return _local.clients
+
+
+def _get(kind: str, credentials: Any, factory) -> Any:
+    clients = _clients()
+    key = (credential_key(credentials), kind)
+    entry = clients.get(key)
+    if entry is None:
+        # The credentials are kept too: a key made from id() stays unique while held.
+        entry = clients[key] = (factory(), credentials)
+    return entry[0]
+
+
+def service(api: str, version: str, credentials: Any) -> Any:
+    """The shared client for ``api``/``version`` (e.g. ``"sheets", "v4"``) under ``credentials``."""
+    from googleapiclient.discovery import build
+
+    return _get(
+        f"{api}/{version}",
+        credentials,
+        lambda: build(
+            api, version, credentials=credentials, static_discovery=True, cache_discovery=False
+        ),
+    )
+
+
+def http_session(credentials: Any) -> Any:
+    """A shared ``AuthorizedSession`` (keep-alive HTTP) for non-discovery endpoints like gviz."""
+    from google.auth.transport.requests import AuthorizedSession
+
+    return _get("session", credentials, lambda: AuthorizedSession(credentials))
+
+
+def clear() -> None:
+    """Drop every pooled client, in every thread (e.g. after ``gsab auth logout``)."""
+    global _generation
+    _generation += 1
@@ -0,0 +1,284 @@
+"""Build gviz queries by field name, with typed and safely quoted values.
+
+``SheetManager.query()`` takes raw gviz text that refers to columns by letter.
+Building that text with f-strings is easy to get wrong and lets a stray quote
+in a value change the query. `Select` builds it for you::
+
+    rows = await db.select("name", "price").where(price__gt=1000).order_by("-price").limit(10)
+
+Field names are resolved to column letters with ``column()``. Each value is
+rendered the way the field stores it: numbers and booleans as gviz literals, and
+everything else as quoted text. Dates and datetimes are stored as ISO text, so
+they are compared as ISO text too, which sorts the same way. A `searchable`
+encrypted field is compared through its sealed value.
+
+Compiled text is cached at two levels. Every builder remembers its own text.
+Builders with the same shape (the same fields, operators, ordering, and whether
+there is a limit/offset) share one template, so only the values are formatted
+in. That includes successive pages of one query.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..exceptions.custom_exceptions import ValidationError
+
+# Operator suffix (``price__gt``) -> gviz operator. ``eq`` is the default.
+_COMPARISONS = {
+    "eq": "=",
+    "ne": "!=",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+    "contains": "contains",
+    "startswith": "starts with",
+    "endswith": "ends with",
+    "like": "like",
+    "matches": "matches",
+}
+_TEXT_OPS = frozenset({"contains", "startswith", "endswith", "like", "matches"})
+_OPERATORS = (*_COMPARISONS, "in", "nin", "isnull")
+
+_AGGREGATE = re.compile(r"^(count|sum|avg|min|max)\(\s*(\w+)\s*\)$", re.IGNORECASE)
+
+# One WHERE condition's shape: (field, operator, number of values).
+Shape = Tuple[str, str, int]
+
+
+def _literal(cell: Any) -> str:
+    """A stored cell value as a gviz literal."""
+    if isinstance(cell, bool):
+        return "true" if cell else "false"
+    if isinstance(cell, int):
+        return str(cell)
+    if isinstance(cell, float):
+        if not math.isfinite(cell):
+            raise ValidationError(f"Can't query for {cell!r}; use a finite number.")
+        return repr(cell)
+    text = str(cell)
+    # gviz string literals have no escape sequences: pick the quote the text lacks.
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    raise ValidationError(
+        f"Can't query for {text!r}: gviz can't quote text holding both ' and \". "
+        "Match part of it with contains / startswith instead, or filter with read()."
+    )
+
+
+def _expression(name: str, letters: Dict[str, str]) -> str:
+    """``"price"`` -> ``"D"``; ``"avg(price)"`` -> ``"avg(D)"``."""
+    match = _AGGREGATE.match(name)
+    if match:
+        return f"{match.group(1).lower()}({_letter(match.group(2), letters)})"
+    return _letter(name, letters)
+
+
+def _letter(name: str, letters: Dict[str, str]) -> str:
+    letter = letters.get(name)
+    if letter is None:
+        raise ValidationError(f"Unknown field: {name}. Fields: {', '.join(letters)}.")
+    return letter
+
+
+def _condition(shape: Shape, letters: Dict[str, str]) -> str:
+    name, op, count = shape
+    column = _letter(name, letters)
+    if op == "isnull":
+        return f"{column} is null"
+    if op == "notnull":
+        return f"{column} is not null"
+    if op in ("in", "nin"):
+        either = " or ".join([f"{column} = {{}}"] * count)
+        return f"not ({either})" if op == "nin" else f"({either})"
+    return f"{column} {_COMPARISONS[op]} {{}}"
+
+
+@functools.lru_cache(maxsize=512)
+def _template(names: Tuple[str, ...], spec: Tuple[Any, ...]) -> str:
+    """The gviz text for a query shape, with ``{}`` where each value goes."""
+    select, where, group, order, limit, offset = spec
+    letters = {name: chr(ord("A") + i) for i, name in enumerate(names)}
+    parts = ["SELECT " + (", ".join(_expression(s, letters) for s in select) or "*")]
+    if where:
+        parts.append("WHERE " + " and ".join(_condition(shape, letters) for shape in where))
+    if group:
+        parts.append("GROUP BY " + ", ".join(_letter(g, letters) for g in group))
+    if order:
+        parts.append(
+            "ORDER BY "
+            + ", ".join(
+                _expression(name, letters) + (" desc" if descending else "")
+                for name, descending in order
+            )
+        )
+    if limit:
+        parts.append("LIMIT {}")
+    if offset:
+        parts.append("OFFSET {}")
+    return " ".join(parts)
+
+
+class Select:
+    """An immutable gviz query over one `SheetManager`'s tab; start with ``db.select()``.
+
+    Every method returns a new builder, so a base query can be shared and refined::
+
+        pro = db.select("id", "name").where(plan="pro")
+        first = await pro.order_by("id").limit(50)
+        rest = await pro.order_by("id").limit(50).offset(50)
+
+    Awaiting a builder runs it (``fetch()`` does the same and takes ``columnar=``).
+    ``compile()`` returns the gviz text without running it.
+    """
+
+    __slots__ = ("_manager", "_select", "_where", "_group", "_order", "_limit", "_offset", "_sql")
+
+    def __init__(self, manager: Any, *fields: str):
+        self._manager = manager
+        self._select: Tuple[str, ...] = fields
+        self._where: Tuple[Tuple[Shape, Tuple[Any, ...]], ...] = ()
+        self._group: Tuple[str, ...] = ()
+        self._order: Tuple[Tuple[str, bool], ...] = ()
+        self._limit: Optional[int] = None
+        self._offset: Optional[int] = None
+        self._sql: Optional[str] = None
+
+    def _with(self, **changes: Any) -> "Select":
+        new = Select.__new__(Select)
+        for slot in Select.__slots__:
+            setattr(new, slot, getattr(self, slot))
+        for slot, value in changes.items():
+            setattr(new, "_" + slot, value)
+        new._sql = None
+        return new
+
+    def where(self, **conditions: Any) -> "Select":
+        """Keep rows matching every condition (combined with earlier ``where()`` calls).
+
+        A key is a field name, optionally with an operator suffix:
+        ``eq`` (the default), ``ne``, ``gt``, ``gte``, ``lt``, ``lte``, ``in``,
+        ``nin``, ``contains``, ``startswith``, ``endswith``, ``like``, ``matches``
+        or ``isnull``. ``name=None`` matches empty cells.
+
+        Example::
+
+            db.select().where(plan__in=["pro", "team"], signup__gte=date(2024, 1, 1))
+
+        Raises:
+            ValidationError: unknown field or operator, a value the field can't
+                hold, or a comparison an encrypted field can't support.
+        """
+        added = [self._compile_condition(key, value) for key, value in conditions.items()]
+        return self._with(where=self._where + tuple(added))
+
+    def group_by(self, *fields: str) -> "Select":
+        """Group rows by ``fields``; select them plus aggregates like ``"sum(price)"``."""
+        return self._with(group=self._group + fields)
+
+    def order_by(self, *fields: str) -> "Select":
+        """Sort by ``fields``; a leading ``-`` sorts that one descending (``"-price"``)."""
+        order = tuple((f[1:], True) if f.startswith("-") else (f, False) for f in fields)
+        return self._with(order=self._order + order)
+
+    def limit(self, count: int) -> "Select":
+        """Return at most ``count`` rows."""
+        return self._with(limit=self._count("limit", count))
+
+    def offset(self, count: int) -> "Select":
+        """Skip the first ``count`` rows (pair with ``order_by`` for stable pages)."""
+        return self._with(offset=self._count("offset", count))
+
+    @staticmethod
+    def _count(what: str, count: Any) -> int:
+        if isinstance(count, bool) or not isinstance(count, int) or count < 0:
+            raise ValidationError(f"{what}() takes a whole number ≥ 0, got {count!r}.")
+        return count
+
+    def _compile_condition(self, key: str, value: Any) -> Tuple[Shape, Tuple[Any, ...]]:
+        """``("price__gt", 10)`` -> ``(("price", "gt", 1), ("10",))``."""
+        name, _, op = key.rpartition("__")
+        if not name or op not in _OPERATORS:
+            name, op = key, "eq"
+        manager = self._manager
+        field = manager._field_map.get(name)
+        if field is None:
+            raise ValidationError(
+                f"Unknown field in {key!r}. Fields: {', '.join(manager._field_map)}; "
+                f"operators (as field__op): {', '.join(_OPERATORS)}."
+            )
+        if op == "isnull" or (value is None and op in ("eq", "ne")):
+            null = bool(value) if op == "isnull" else op == "eq"
+            return (name, "isnull" if null else "notnull", 0), ()
+        if op in ("in", "nin"):
+            values = list(value) if isinstance(value, (list, tuple, set, frozenset)) else None
+            if not values:
+                raise ValidationError(f"{key} takes a non-empty list of values, got {value!r}.")
+        else:
+            values = [value]
+        if field.encrypted and manager.encryptor:
+            if op not in ("eq", "ne", "in", "nin") or not manager._searchable(field):
+                raise ValidationError(
+                    f"Field '{name}' is encrypted, so the server can't compare it with {op!r}. "
+                    "Declare it Field(..., searchable=True) for equality lookups, "
+                    "or filter with read()."
+                )
+            # One ciphertext per key: under key rotation a value has several.
+            cells = sorted({c for v in values for c in manager._sealed_forms(field, v)})
+        elif op in _TEXT_OPS:
+            cells = [str(value)]
+        else:
+            try:
+                cells = [manager._cell(field, v) for v in values]
+            except ValueError as e:
+                raise ValidationError(f"{key}: {e}") from e
+        if op in ("eq", "in"):
+            op = "eq" if len(cells) == 1 else "in"
+        elif op in ("ne", "nin"):
+            op = "ne" if len(cells) == 1 else "nin"
+        return (name, op, len(cells)), tuple(cells)
+
+    def compile(self) -> str:
+        """The gviz query text.
+
+        Raises:
+            ValidationError: an unknown field, or a value that can't be quoted.
+        """
+        if self._sql is None:
+            names = tuple(f.name for f in self._manager.schema.fields)
+            spec = (
+                tuple(self._select),
+                tuple(shape for shape, _ in self._where),
+                self._group,
+                self._order,
+                self._limit is not None,
+                bool(self._offset),
+            )
+            values: List[Any] = [cell for _, cells in self._where for cell in cells]
+            if self._limit is not None:
+                values.append(self._limit)
+            if self._offset:
+                values.append(self._offset)
+            self._sql = _template(names, spec).format(*map(_literal, values))
+        return self._sql
+
+    async def fetch(
+        self, *, columnar: bool = False
+    ) -> Union[List[Dict[str, Any]], Dict[str, List[Any]]]:
+        """Run the query; see ``SheetManager.query()`` for the result shapes."""
+        return await self._manager.query(self.compile(), columnar=columnar)
+
+    def __await__(self):
+        return self.fetch().__await__()
+
+    def __repr__(self) -> str:
+        try:
+            return f"<Select {self.compile()!r}>"
+        except ValidationError as e:
+            return f"<Select (invalid: {e})>"
@@ -0,0 +1,162 @@
+"""In-memory cache of gviz query results, for dashboards that ask the same thing often.
+
+A ``QueryCache`` keeps the decoded rows of recent ``SheetManager.query()`` calls,
+keyed by (spreadsheet id, tab, query text). An entry is served until any of these
+happens:
+
+- its ``ttl`` runs out;
+- it's the least recently used entry and the cache is over ``max_entries`` or
+  ``max_bytes``;
+- a write goes through a manager sharing the cache (``insert``, ``update``,
+  ``delete``, …), which drops every entry of that spreadsheet;
+- with ``validate=True``, the spreadsheet's Drive ``version`` has moved on. That
+  catches edits made elsewhere (the web UI, another process) at the price of one
+  cheap Drive metadata call per hit instead of a gviz query.
+
+Cached results are shared, not copied: ``SheetManager`` stores each query's
+decoded `GvizTable` and builds fresh rows from it for every caller, so mutating a
+result never changes the cache.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+Key = Tuple[str, str, str]
+
+
+def _approx_bytes(result: Any) -> int:
+    """A cheap size estimate for the byte budget: a table's response size, else the
+    text form of the rows."""
+    nbytes = getattr(result, "nbytes", None)
+    if nbytes is not None:
+        return nbytes + 56
+    return sum(len(repr(row)) for row in result) + 56
+
+
+class _Entry:
+    __slots__ = ("result", "size", "expires", "version")
+
+    def __init__(self, result: Any, size: int, expires: float, version: Optional[str]):
+        self.result = result
+        self.size = size
+        self.expires = expires
+        self.version = version
+
+
+class QueryCache:
+    """A TTL + LRU cache of query results with a byte budget.
+
+    Args:
+        ttl: seconds an entry stays fresh.
+        max_entries: most entries kept; the least recently used go first.
+        max_bytes: approximate budget for all cached rows; a single result larger
+            than this isn't cached.
+        validate: check the spreadsheet's Drive version on every hit, so edits
+            made outside this process invalidate entries too.
+
+    Example:
+        cache = QueryCache(ttl=30)
+        db = SheetManager(conn, schema, query_cache=cache)
+        await db.query("SELECT AVG(D)")   # gviz
+        await db.query("SELECT AVG(D)")   # from memory
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 60.0,
+        max_entries: int = 256,
+        max_bytes: int = 32 * 1024 * 1024,
+        validate: bool = False,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.validate = validate
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Key, _Entry]" = OrderedDict()
+        self._bytes = 0
+        # Bumped on every invalidation: a result fetched across one isn't stored.
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0  # bumped by invalidate() of every spreadsheet
+        self.hits = self.misses = 0
+
+    def generation(self, sheet_id: str) -> int:
+        """The invalidation counter of ``sheet_id``; pass it back to `put`."""
+        return self._epoch + self._generations.get(sheet_id, 0)
+
+    def get(self, sheet_id: str, tab: str, sql: str, *, version: Optional[str] = None) -> Any:
+        """The cached result, or None if absent, expired or (when given) not fetched
+        at ``version``."""
+        key = (sheet_id, tab, sql)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry.expires <= time.monotonic()
+                or (version is not None and entry.version != version)
+            ):
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.result
+
+    def put(
+        self,
+        sheet_id: str,
+        tab: str,
+        sql: str,
+        result: Any,
+        *,
+        generation: int,
+        version: Optional[str] = None,
+    ) -> None:
+        """Cache ``result`` (treated as read-only from now on) — unless ``sheet_id``
+        was invalidated since ``generation`` was read, or the result alone is over
+        the byte budget."""
+        size = _approx_bytes(result)
+        if size > self.max_bytes:
+            return
+        key = (sheet_id, tab, sql)
+        entry = _Entry(result, size, time.monotonic() + self.ttl, version)
+        with self._lock:
+            if self.generation(sheet_id) != generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, sheet_id: Optional[str] = None) -> None:
+        """Drop every entry of ``sheet_id`` (or of every spreadsheet)."""
+        with self._lock:
+            if sheet_id is None:
+                self._epoch += 1
+                self._entries.clear()
+                self._bytes = 0
+                return
+            self._generations[sheet_id] = self._generations.get(sheet_id, 0) + 1
+            for key in [k for k in self._entries if k[0] == sheet_id]:
+                self._drop(key)
+
+    def _drop(self, key: Key) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate bytes held."""
+        return self._bytes
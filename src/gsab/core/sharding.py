@@ -0,0 +1,306 @@
+"""ShardedTable — one logical table spread over several spreadsheets (or tabs).
+
+A spreadsheet holds at most 10 million cells, and Google meters writes per
+spreadsheet. A `ShardedTable` gets past both limits by splitting the rows of one
+`Schema` across N shards: each record lives on the shard its primary key hashes
+to, and each shard is a plain `SheetManager`.
+
+- Writes are grouped by shard and sent to all shards at once, so N shards give
+  about N times the write rate of one.
+- A read or write whose filters pin the primary key (``{"id": 7}``,
+  ``{"id": {"$in": [...]}}``) only touches the shards that own those keys.
+  Anything else fans out to every shard concurrently and the results are
+  concatenated, in shard order.
+- Keys are placed by rendezvous hashing over SHA-256 (Python's ``hash()`` is
+  salted per process). Placement doesn't depend on shard order. Adding a shard
+  moves only the ~1/N of the keys that now belong to it, and `add_shard()` moves
+  them for you.
+
+Every shard must have the schema's header row; a shard in another tab of the same
+spreadsheet is named ``(spreadsheet_id, tab)``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..exceptions.custom_exceptions import ValidationError
+from .connection import SheetConnection
+from .schema import Schema
+from .sheet_manager import SheetManager
+
+logger = logging.getLogger(__name__)
+
+# A spreadsheet id (the tab is ``schema.name``), or ``(spreadsheet_id, tab)``.
+ShardSpec = Union[str, Tuple[str, str]]
+
+
+class ShardedTable:
+    """The rows of one `Schema`, hash-partitioned by primary key across shards.
+
+    Args:
+        connection: a `SheetConnection` shared by every shard.
+        schema: the table's `Schema`; it must declare a ``primary_key``.
+        shards: the shards, as spreadsheet ids or ``(spreadsheet_id, tab)`` pairs.
+            May be empty, to build the table up with `add_shard()`.
+        encryption_key: Fernet key for any encrypted fields.
+        **kwargs: passed on to each shard's `SheetManager` (``policy``,
+            ``metrics``, ``write_lock``, ``wal``, …).
+
+    Example:
+        users = ShardedTable(SheetConnection(), schema, ["1AbC…", "1DeF…"])
+        await users.bulk_insert(records)          # one append per shard, in parallel
+        user = await users.get(42)                # reads one shard
+        pros = await users.read({"plan": "pro"})  # reads every shard, concurrently
+        await users.add_shard(title="Users 3")    # grow: moves ~1/3 of the rows
+    """
+
+    def __init__(
+        self,
+        connection: SheetConnection,
+        schema: Schema,
+        shards: Sequence[ShardSpec] = (),
+        encryption_key: Optional[Union[str, Sequence[str]]] = None,
+        **kwargs: Any,
+    ):
+        if not schema.primary_key:
+            raise ValidationError(
+                f"ShardedTable needs a key to place rows by, but schema '{schema.name}' "
+                "has none. Declare one with Field(..., primary_key=True)."
+            )
+        self.connection = connection
+        self.schema = schema
+        self.encryption_key = encryption_key
+        self._kwargs = kwargs
+        self._key_field = schema.get_field(schema.primary_key)
+        self.shards: List[SheetManager] = []
+        # Each shard's SHA-256 state after hashing its name: placing a key costs
+        # one copy + update per shard instead of rehashing the name every time.
+        self._seeds: List[Any] = []
+        for spec in shards:
+            self._add(spec)
+
+    @staticmethod
+    def shard_name(shard: SheetManager) -> str:
+        """A shard's identity for placement: ``"<spreadsheet_id>/<tab>"``."""
+        return f"{shard.sheet_id}/{shard.schema.name}"
+
+    def _add(self, spec: ShardSpec, shard: Optional[SheetManager] = None) -> SheetManager:
+        """Register a shard, reusing ``shard`` (the manager that created it) if given."""
+        sheet_id, tab = (spec, self.schema.name) if isinstance(spec, str) else spec
+        if any(s.sheet_id == sheet_id and s.schema.name == tab for s in self.shards):
+            raise ValidationError(f"Shard {sheet_id}/{tab} is listed twice.")
+        if shard is None:
+            schema = self.schema if tab == self.schema.name else Schema(tab, self.schema.fields)
+            shard = SheetManager(self.connection, schema, self.encryption_key, **self._kwargs)
+            shard.sheet_id = sheet_id
+        self.shards.append(shard)
+        self._seeds.append(hashlib.sha256(self.shard_name(shard).encode() + b"\0"))
+        return shard
+
+    def _key_bytes(self, value: Any) -> bytes:
+        """The canonical bytes of a key value: ``7`` and ``"7"`` place alike."""
+        if value in (None, ""):
+            raise ValidationError(
+                f"Every record needs a value for the key field '{self.schema.primary_key}': "
+                "it decides which shard the record lives on."
+            )
+        try:
+            typed = self.schema._convert_value(value, self._key_field.field_type)
+        except ValueError as e:
+            raise ValidationError(f"Bad value for key '{self.schema.primary_key}': {e}") from e
+        text = typed.isoformat() if hasattr(typed, "isoformat") else str(typed)
+        return text.encode()
+
+    def _owner(self, key: bytes) -> int:
+        """Index of the shard that owns ``key``: the highest hash of (shard, key)."""
+        best, best_index = b"", -1
+        for index, seed in enumerate(self._seeds):
+            h = seed.copy()
+            h.update(key)
+            digest = h.digest()
+            if digest > best:
+                best, best_index = digest, index
+        return best_index
+
+    def _require_shards(self) -> None:
+        if not self.shards:
+            raise ValidationError(
+                "This ShardedTable has no shards. Pass spreadsheet ids as `shards=`, "
+                "or add one with `await table.add_shard(title=...)`."
+            )
+
+    def shard_for(self, key: Any) -> SheetManager:
+        """The `SheetManager` of the shard that owns primary key ``key``."""
+        self._require_shards()
+        return self.shards[self._owner(self._key_bytes(key))]
+
+    def _group(self, records: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+        """Records by owning shard index, keeping their order within each shard."""
+        self._require_shards()
+        key = self.schema.primary_key
+        groups: Dict[int, List[Dict[str, Any]]] = {}
+        for record in records:
+            groups.setdefault(self._owner(self._key_bytes(record.get(key))), []).append(record)
+        return groups
+
+    def _targets(self, filters: Optional[Dict[str, Any]]) -> List[SheetManager]:
+        """The shards that can hold rows matching ``filters``."""
+        self._require_shards()
+        cond = (filters or {}).get(self.schema.primary_key)
+        if cond is None:
+            return self.shards
+        if isinstance(cond, dict):
+            if "$eq" in cond:
+                keys = [cond["$eq"]]
+            elif "$in" in cond:
+                keys = list(cond["$in"])
+            else:
+                return self.shards
+        else:
+            keys = [cond]
+        owners = {self._owner(self._key_bytes(k)) for k in keys}
+        return [shard for index, shard in enumerate(self.shards) if index in owners]
+
+    async def insert(self, data: Dict[str, Any]) -> None:
+        """Insert one record into the shard its key belongs to."""
+        await self.shard_for(data.get(self.schema.primary_key)).insert(data)
+
+    async def bulk_insert(self, records: List[Dict[str, Any]]) -> int:
+        """Insert records, one append per shard, all shards at once. Returns the count.
+
+        Each shard checks its own batch for duplicate keys; since a key always
+        lands on the same shard, that covers the whole table. If one shard fails,
+        the others' rows are still written.
+        """
+        groups = self._group(records)
+        counts = await asyncio.gather(
+            *(self.shards[i].bulk_insert(group) for i, group in groups.items())
+        )
+        return sum(counts)
+
+    async def read(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Read matching records from every shard that can hold them, concurrently.
+
+        Filters are those of `SheetManager.read`. Rows come back shard by shard.
+        """
+        results = await asyncio.gather(*(s.read(filters) for s in self._targets(filters)))
+        return [record for rows in results for record in rows]
+
+    async def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        """The record with primary key ``key`` (read from its shard only), or None."""
+        rows = await self.shard_for(key).read({self.schema.primary_key: key})
+        return rows[0] if rows else None
+
+    async def query(self, sql: str) -> List[Dict[str, Any]]:
+        """Run a gviz ``query()`` on every shard concurrently and concatenate the rows.
+
+        The query runs per shard: ``ORDER BY`` and ``LIMIT`` order and cut each
+        shard's rows, and aggregates come back once per shard.
+        """
+        self._require_shards()
+        results = await asyncio.gather(*(s.query(sql) for s in self.shards))
+        return [record for rows in results for record in rows]
+
+    async def update(self, filters: Dict[str, Any], updates: Dict[str, Any]) -> int:
+        """Update matching records on the shards that can hold them. Returns the count.
+
+        The primary key can't be changed here, since that would leave the row on
+        the wrong shard; delete the record and insert it under the new key.
+        """
+        if self.schema.primary_key in updates:
+            raise ValidationError(
+                f"update() can't change the key field '{self.schema.primary_key}' of a "
+                "ShardedTable (it decides the row's shard). Delete and re-insert instead."
+            )
+        counts = await asyncio.gather(*(s.update(filters, updates) for s in self._targets(filters)))
+        return sum(counts)
+
+    async def upsert(self, data: Dict[str, Any]) -> str:
+        """Insert or update one record on its shard. Returns ``"inserted"`` / ``"updated"``."""
+        return await self.shard_for(data.get(self.schema.primary_key)).upsert(data)
+
+    async def bulk_upsert(self, records: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Insert-or-update records by primary key, one call per shard, concurrently.
+
+        Returns ``{"inserted": n, "updated": m}`` summed over the shards.
+        """
+        groups = self._group(records)
+        results = await asyncio.gather(
+            *(self.shards[i].bulk_upsert(group) for i, group in groups.items())
+        )
+        return {
+            "inserted": sum(r["inserted"] for r in results),
+            "updated": sum(r["updated"] for r in results),
+        }
+
+    async def delete(self, filters: Dict[str, Any], *, confirm: bool = False) -> int:
+        """Delete matching rows on the shards that can hold them. Returns the count."""
+        counts = await asyncio.gather(
+            *(s.delete(filters, confirm=confirm) for s in self._targets(filters))
+        )
+        return sum(counts)
+
+    async def add_shard(
+        self,
+        shard: Optional[ShardSpec] = None,
+        *,
+        title: Optional[str] = None,
+        migrate: bool = True,
+    ) -> SheetManager:
+        """Grow the table by one shard, then move the rows that now belong to it.
+
+        Args:
+            shard: an existing spreadsheet id or ``(spreadsheet_id, tab)`` with the
+                schema's header row. Omit it to create a new spreadsheet.
+            title: the new spreadsheet's title (default: ``"<schema> shard <n>"``).
+            migrate: move rows to the new shard now (see `rebalance()`). Pass
+                False if every shard is still empty.
+
+        Returns:
+            The new shard's `SheetManager`.
+        """
+        creator = None
+        if shard is None:
+            creator = SheetManager(
+                self.connection, self.schema, self.encryption_key, **self._kwargs
+            )
+            shard = await creator.create_sheet(
+                title or f"{self.schema.name} shard {len(self.shards) + 1}"
+            )
+        # Keep the creating manager: only it knows the spreadsheet was created here,
+        # which an allowlist policy (e.g. ``allowed_sheets=[]``) relies on.
+        added = self._add(shard, creator)
+        if migrate:
+            await self.rebalance()
+        return added
+
+    async def rebalance(self) -> int:
+        """Move every row that sits on a shard other than its owner. Returns the count.
+
+        Each shard is read once. Rows are upserted into their owning shard before
+        they're deleted from the old one, so a run that fails halfway can simply be
+        run again. While rows move, a key lookup can miss a row that hasn't reached
+        its new shard yet: pause writes, or accept that, while growing.
+        """
+        self._require_shards()
+        moved = await asyncio.gather(*(self._move_from(i) for i in range(len(self.shards))))
+        total = sum(moved)
+        logger.info("Rebalanced %d shard(s): moved %d row(s)", len(self.shards), total)
+        return total
+
+    async def _move_from(self, index: int) -> int:
+        """Move the rows of shard ``index`` that belong elsewhere."""
+        source = self.shards[index]
+        key = self.schema.primary_key
+        groups = self._group(await source.read())
+        groups.pop(index, None)
+        moved = 0
+        for target, records in groups.items():
+            await self.shards[target].bulk_upsert(records)
+            keys = [record[key] for record in records]
+            moved += await source.delete({key: {"$in": keys}}, confirm=True)
+        return moved
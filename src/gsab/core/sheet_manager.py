@@ -1,22 +1,42 @@
 import asyncio
+import contextvars
 import json
 import logging
+import random
 import re
+import secrets
+from contextlib import asynccontextmanager
 from datetime import date, datetime
-from typing import Any, Dict, List, Optional, Union
-
-from googleapiclient.discovery import build
-
-from ..exceptions.custom_exceptions import DuplicateKeyError, NotFoundError, ValidationError
-from ..utils.encryption import Encryptor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar, Union
+
+from ..exceptions.custom_exceptions import (
+    ConflictError,
+    DuplicateKeyError,
+    EncryptionError,
+    GSABError,
+    NotFoundError,
+    PermissionDeniedError,
+    PolicyError,
+    ValidationError,
+)
+from ..utils.encryption import PARALLEL_MIN, Encryptor
 from ..utils.errors import execute
+from ..utils.metrics import MetricsHook, codec, instrumented
+from ..utils.singleflight import SingleFlight, copy_rows
 from .connection import SheetConnection
 from .policy import AccessPolicy
-from .schema import FieldType, Schema
+from .query import GvizTable, gviz_pages
+from .query_builder import Select
+from .query_cache import QueryCache
+from .schema import Field, FieldType, Schema
+from .snapshot import SnapshotStore
+from .wal import WriteAheadLog
+from .write_lock import LockBackend, writing
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 _OPERATORS = (
     "$eq",
     "$ne",
@@ -34,6 +54,33 @@ _OPERATORS = (
 _BASIC_CHARTS = frozenset({"COLUMN", "BAR", "LINE", "AREA", "SCATTER", "COMBO", "STEPPED_AREA"})
 _CHART_TYPES = _BASIC_CHARTS | {"PIE"}
 
+# Errors a logged insert will hit again however often it's retried (see `_flush_wal`).
+_PERMANENT = (
+    ValidationError,
+    DuplicateKeyError,
+    NotFoundError,
+    PermissionDeniedError,
+    PolicyError,
+    EncryptionError,
+)
+
+# Set while a write holds its tab lock. The reads a write makes skip the snapshot's
+# ttl: row positions and unique checks must come from the sheet as it is now.
+_in_write: "contextvars.ContextVar[bool]" = contextvars.ContextVar("gsab_in_write", default=False)
+
+# Field types whose cell conversion is a single builtin call (see `_decode_column`).
+_FAST_CONVERTERS = {
+    FieldType.INTEGER: int,
+    FieldType.FLOAT: float,
+    FieldType.BOOLEAN: bool,
+    FieldType.STRING: str,
+}
+
+
+def _new_version() -> str:
+    """A fresh row-version token for a `Field(version=True)` column."""
+    return secrets.token_hex(6)
+
 
 def _match_op(actual: Any, op: str, target: Any) -> bool:
     """Evaluate a single filter operator against a record value."""
@@ -73,11 +120,31 @@ class SheetManager:
     Validation runs on every write; fields flagged `encrypted=True` are sealed
     before they reach the sheet and decrypted on read. A `unique`/`primary_key`
     field is enforced on insert/upsert (read-check-write; `DuplicateKeyError`).
+    Writes to one tab run one at a time, in order, across every manager in the
+    process (see ``gsab.core.write_lock``); reads never wait for them.
 
     Args:
         connection: a `SheetConnection` (connected lazily on first use).
         schema: the `Schema` describing the tab.
         encryption_key: Fernet key; required only if the schema has encrypted fields.
+            A list of keys (newest first) encrypts with the first and decrypts with
+            any — the state to run `rotate_encryption_key()` in.
+        policy: an `AccessPolicy` guarding what this manager may do.
+        snapshot: a `SnapshotStore` to serve reads from disk while the sheet's Drive
+            version is unchanged (one metadata call instead of a full download).
+        metrics: a hook called with an `OpMetrics` after each operation (API calls,
+            network / codec / backoff time, bytes, rows, retries) — see
+            ``gsab.utils.metrics``.
+        query_cache: a `QueryCache` to answer repeated `query()` calls from memory;
+            writes through this manager invalidate it.
+        conflict_retries: with a `version` field in the schema, how many times an
+            `update` / `upsert` / `delete` is redone after finding that a target row
+            changed since it was read, before raising `ConflictError`.
+        write_lock: a cross-process lock backend (e.g. `FileLock`) held around each
+            write, so writers in several worker processes take turns too.
+        wal: a `WriteAheadLog`. Inserts then return once their rows are durable on
+            local disk, and a background task appends them to the sheet in batches
+            (see ``gsab.core.wal``). Call `flush()` to wait for it.
 
     Example:
         db = SheetManager(connection, schema, encryption_key=key)
@@ -88,23 +155,43 @@ class SheetManager:
     Every method raises a subclass of `GSABError` on failure — `ValidationError`
     for bad input, `NotFoundError` for a missing sheet, `QuotaExceededError` when
     rate-limited. Transient errors (429/5xx, dropped connections) are retried
-    automatically with backoff.
+    automatically with jittered backoff, as the connection's `RetryPolicy` allows.
     """
 
     def __init__(
         self,
         connection: SheetConnection,
         schema: Schema,
-        encryption_key: Optional[str] = None,
+        encryption_key: Optional[Union[str, Sequence[str]]] = None,
         *,
         policy: Optional[AccessPolicy] = None,
+        snapshot: Optional[SnapshotStore] = None,
+        metrics: Optional[MetricsHook] = None,
+        query_cache: Optional[QueryCache] = None,
+        conflict_retries: int = 3,
+        write_lock: Optional[LockBackend] = None,
+        wal: Optional[WriteAheadLog] = None,
     ):
         """Initialize sheet manager."""
         self.connection = connection
         self.schema = schema
         self.sheet_id = None
         self.policy = policy or AccessPolicy()
+        self.snapshot = snapshot
+        self.metrics = metrics
+        self.query_cache = query_cache
+        self.conflict_retries = conflict_retries
+        self.write_lock = write_lock
+        self.wal = wal
+        self._flusher: Optional["asyncio.Task[None]"] = None
+        self._wal_dirty = False
         self._created_here = False
+        # Concurrent identical reads / queries share one request (see `_invalidate_reads`).
+        self._flights = SingleFlight()
+        # Bumped by every write through this manager; `sql()` reloads when it moves.
+        self._generation = 0
+        # `sql()`'s loaded databases: (engine, others) -> (LocalSQL, generations, versions).
+        self._local: Dict[tuple, tuple] = {}
         self._field_map = {field.name: field for field in self.schema.fields}
 
         # Initialize encryptor only if we have encrypted fields
@@ -113,6 +200,11 @@ class SheetManager:
             Encryptor(encryption_key) if has_encrypted_fields and encryption_key else None
         )
 
+    @property
+    def _retry(self):
+        """The connection's `RetryPolicy` (None: the process-wide default)."""
+        return getattr(self.connection, "retry_policy", None)
+
     def _require_sheet(self) -> None:
         """Ensure a spreadsheet is bound (and policy-allowed) before an operation runs."""
         if not self.sheet_id:
@@ -123,10 +215,21 @@ class SheetManager:
         if not self._created_here:
             self.policy.ensure_sheet_allowed(self.sheet_id)
 
+    @asynccontextmanager
+    async def _writing(self):
+        """Hold this tab's write lock (see ``gsab.core.write_lock``) for one write."""
+        async with writing(self.sheet_id, self.schema.name, self.write_lock):
+            token = _in_write.set(True)
+            try:
+                yield
+            finally:
+                _in_write.reset(token)
+
     async def _ensure_connected(self) -> None:
         if not self.connection.is_connected():
             await self.connection.connect()
 
+    @instrumented("create_sheet")
     async def create_sheet(self, title: str) -> str:
         """
         Create a new sheet with the defined schema.
@@ -149,7 +252,9 @@ class SheetManager:
             ],
         }
         result = await execute(
-            self.connection.service.spreadsheets().create(body=spreadsheet), op="create_sheet"
+            self.connection.service.spreadsheets().create(body=spreadsheet),
+            op="create_sheet",
+            retry_policy=self._retry,
         )
         self.sheet_id = result["spreadsheetId"]
         self._created_here = True
@@ -165,6 +270,19 @@ class SheetManager:
         Strings stay strings under ``RAW`` input, so a leading ``=`` is inert text,
         never an executable formula. Dates are stored as ISO text.
         """
+        value = self._plain_cell(field, value)
+        if value == "":
+            return ""
+        if field.encrypted and self.encryptor:
+            if field.searchable:
+                return self.encryptor.encrypt_deterministic(value)
+            return self.encryptor.encrypt(value)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return value
+
+    def _plain_cell(self, field, value: Any) -> Any:
+        """`_cell` up to (not including) encryption: default, coercion, JSON text."""
         if value is None:
             value = field.default
         if value is None or value == "":
@@ -173,22 +291,70 @@ class SheetManager:
         if field.field_type == FieldType.JSON:
             # Store JSON as a serialized string (so it round-trips back to an object).
             value = json.dumps(value, default=str)
-        if field.encrypted and self.encryptor:
-            return self.encryptor.encrypt(value)
-        if isinstance(value, (date, datetime)):
-            return value.isoformat()
         return value
 
-    def _encode_row(self, data: Dict[str, Any]) -> List[Any]:
+    def _encode_row(self, data: Dict[str, Any], *, validate: bool = True) -> List[Any]:
         """Validate one record and return its typed cell values."""
-        errors = self.schema.validate(data)
-        if errors:
-            raise ValidationError(f"Validation errors: {', '.join(errors)}")
-        return [self._cell(field, data.get(field.name)) for field in self.schema.fields]
+        return self._encode_rows([data], validate=validate)[0]
+
+    def _encode_rows(
+        self, records: List[Dict[str, Any]], *, validate: bool = True
+    ) -> List[List[Any]]:
+        """Validate records and return their typed cell values, one column at a time.
+
+        Encrypted columns are sealed with a single `Encryptor.encrypt_many` call, so
+        a large batch is spread across the encryption pool.
+        """
+        with codec():
+            if validate:
+                for data in records:
+                    errors = self.schema.validate(data)
+                    if errors:
+                        raise ValidationError(f"Validation errors: {', '.join(errors)}")
+            version = self.schema.version_field
+            columns = [
+                [_new_version() for _ in records]
+                if field.name == version
+                else self._cells_for(field, [r.get(field.name) for r in records])
+                for field in self.schema.fields
+            ]
+            return [list(row) for row in zip(*columns)]
+
+    def _cells_for(self, field: Field, values: List[Any]) -> List[Any]:
+        """`_cell` over a column of values; an encrypted column is sealed in one batch."""
+        if not (field.encrypted and self.encryptor):
+            cell = self._cell
+            return [cell(field, v) for v in values]
+        column = [self._plain_cell(field, v) for v in values]
+        filled = [i for i, v in enumerate(column) if v != ""]
+        sealed = self.encryptor.encrypt_many(
+            [column[i] for i in filled], deterministic=field.searchable
+        )
+        for i, token in zip(filled, sealed):
+            column[i] = token
+        return column
+
+    async def _encode_rows_async(
+        self, records: List[Dict[str, Any]], *, validate: bool = True
+    ) -> List[List[Any]]:
+        """`_encode_rows`, on a worker thread when a large batch has cells to encrypt."""
+        if self._crypto_cells(len(records)) >= PARALLEL_MIN:
+            return await asyncio.to_thread(self._encode_rows, records, validate=validate)
+        return self._encode_rows(records, validate=validate)
+
+    def _crypto_cells(self, rows: int) -> int:
+        """How many cells ``rows`` rows would encrypt / decrypt."""
+        if self.encryptor is None:
+            return 0
+        return rows * sum(1 for f in self.schema.fields if f.encrypted)
 
     def _user_entered(self, field, value: Any) -> Dict[str, Any]:
         """Build a typed Sheets ``userEnteredValue`` for the update path."""
-        cell = self._cell(field, value)
+        return self._as_user_entered(self._cell(field, value))
+
+    @staticmethod
+    def _as_user_entered(cell: Any) -> Dict[str, Any]:
+        """Wrap an encoded cell (from ``_cell``) as a typed ``userEnteredValue``."""
         if isinstance(cell, bool):
             return {"boolValue": cell}
         if isinstance(cell, (int, float)):
@@ -202,11 +368,16 @@ class SheetManager:
                 value = self.encryptor.decrypt(value)
             except Exception as e:
                 logger.warning("Failed to decrypt field %s: %s", field.name, e)
+        return self._convert_cell(field, value)
+
+    def _convert_cell(self, field, value: Any) -> Any:
+        """Convert a raw (already decrypted) cell to the field's Python type."""
         try:
             return self.schema._convert_value(value, field.field_type)
         except ValueError:
             return str(value)
 
+    @instrumented("insert")
     async def insert(self, data: Dict[str, Any]) -> None:
         """Insert a single record.
 
@@ -220,6 +391,7 @@ class SheetManager:
         """
         await self.bulk_insert([data])
 
+    @instrumented("insert")
     async def bulk_insert(self, records: List[Dict[str, Any]]) -> int:
         """Insert many records in a single append call. Returns the number inserted.
 
@@ -228,15 +400,27 @@ class SheetManager:
         raises `DuplicateKeyError` — use `upsert()` to insert-or-update instead.
         That check is a read-check-write, so two concurrent inserts of the same new
         key can still both land; schemas with no unique field skip the read entirely.
+
+        With a ``wal``, the records are validated and logged to local disk, and the
+        append (and the unique check) happen in the background; see `flush()`.
         """
+        return await self._insert(records)
+
+    async def _insert(self, records: List[Dict[str, Any]], *, validated: bool = False) -> int:
+        """`bulk_insert` body; ``validated`` skips re-validating records already checked."""
         self._require_sheet()
         self.policy.ensure_writable("insert")
-        await self._ensure_connected()
-        rows = [self._encode_row(r) for r in records]
+        rows = await self._encode_rows_async(records, validate=not validated)
         if not rows:
             return 0
-        await self._check_unique(records)
-        await self._append_rows(rows)
+        if self.wal is not None:
+            await asyncio.to_thread(self.wal.append, self.sheet_id, self.schema.name, rows)
+            self._kick_flusher()
+            return len(rows)
+        await self._ensure_connected()
+        async with self._writing():
+            await self._check_unique(records)
+            await self._append_rows(rows)
         logger.info("Inserted %d row(s)", len(rows))
         self.policy.emit({"op": "insert", "sheet_id": self.sheet_id, "count": len(rows)})
         return len(rows)
@@ -253,36 +437,207 @@ class SheetManager:
                 body={"values": rows},
             ),
             op="insert",
+            retry_policy=self._retry,
         )
+        self._invalidate_reads()
 
     async def _check_unique(self, records: List[Dict[str, Any]]) -> None:
         """Reject a batch that would duplicate any `unique`/`primary_key` field.
 
         Compares incoming values (in their schema type) against the values already
         in the sheet and against earlier records in the same batch. No-ops when the
-        schema has no unique field, so the common insert path stays read-free.
+        schema has no unique field, so the common insert path stays read-free. Only
+        the unique columns are decoded, and a `searchable` one is compared as
+        ciphertext without decrypting anything.
         """
         if not self.schema.unique_fields:
             return
-        existing = await self._read_indexed()
+        values = await self._fetch_values()
+        headers, rows = (values[0], values[1:]) if values else ([], [])
+        for field in self.schema.unique_fields:
+            if field.name not in headers:
+                cells: List[Any] = []
+            else:
+                col = headers.index(field.name)
+                cells = [row[col] if col < len(row) else "" for row in rows]
+            if self._searchable(field) and self.encryptor.key_count == 1:
+                seen = {c for c in cells if c not in (None, "")}
+                self._reject_duplicates(field, seen, records, lambda v, f=field: self._cell(f, v))
+            else:
+                decoded = self._decode_rows([field.name], [[c] for c in cells], 1)
+                seen = {r[field.name] for r in decoded if r[field.name] not in (None, "")}
+                self._reject_duplicates(field, seen, records)
+
+    def _assert_unique(self, existing: List[Dict[str, Any]], records: List[Dict[str, Any]]) -> None:
+        """Raise `DuplicateKeyError` if ``records`` clash with ``existing`` rows or each other."""
         for field in self.schema.unique_fields:
             seen = {r.get(field.name) for r in existing if r.get(field.name) not in (None, "")}
-            for record in records:
-                value = record.get(field.name)
-                if value in (None, ""):
-                    continue
-                typed = self.schema._convert_value(value, field.field_type)
-                if typed in seen:
-                    raise DuplicateKeyError(
-                        f"Duplicate value for unique field '{field.name}': {typed!r} "
-                        f"already exists. Use upsert() to insert-or-update, or change it."
-                    )
-                seen.add(typed)
+            self._reject_duplicates(field, seen, records)
+
+    def _reject_duplicates(
+        self,
+        field: Field,
+        seen: set,
+        records: List[Dict[str, Any]],
+        key: Optional[Any] = None,
+    ) -> None:
+        """Raise `DuplicateKeyError` if a record's ``field`` value is in ``seen`` (or repeats).
+
+        ``key`` maps a value to what ``seen`` holds — its schema type by default.
+        """
+        for record in records:
+            value = record.get(field.name)
+            if value in (None, ""):
+                continue
+            typed = self.schema._convert_value(value, field.field_type)
+            marker = key(value) if key else typed
+            if marker in seen:
+                raise DuplicateKeyError(
+                    f"Duplicate value for unique field '{field.name}': {typed!r} "
+                    f"already exists. Use upsert() to insert-or-update, or change it."
+                )
+            seen.add(marker)
+
+    def _sealed_forms(self, field: Field, value: Any) -> set:
+        """Every cell a `searchable` field may hold for ``value`` — one per key."""
+        plain = self._plain_cell(field, value)
+        if plain == "":
+            return {""}
+        return set(self.encryptor.equal_tokens(plain))
+
+    def _searchable(self, field: Field) -> bool:
+        """True when ``field``'s cells are deterministic ciphertexts we can compare."""
+        return field.searchable and self.encryptor is not None
+
+    def seal(self, field_name: str, value: Any) -> str:
+        """The ciphertext a `searchable` field stores for ``value``.
+
+        Use it to look up encrypted values server-side::
+
+            email = db.column("email")
+            rows = await db.query(f"SELECT * WHERE {email} = '{db.seal('email', x)}'")
+
+        Raises:
+            ValidationError: the field is unknown, not `searchable`, or no
+                ``encryption_key`` was given.
+        """
+        field = self._field_map.get(field_name)
+        if field is None:
+            raise ValidationError(
+                f"Unknown field: {field_name}. Fields: {', '.join(self._field_map)}."
+            )
+        if not self._searchable(field):
+            raise ValidationError(
+                f"Field '{field_name}' isn't searchable. Declare it with "
+                "Field(..., searchable=True) and pass an encryption_key to look it up sealed."
+            )
+        return self._cell(field, value)
+
+    @instrumented("flush")
+    async def flush(self) -> int:
+        """Append every row waiting in the ``wal`` to the sheet now. Returns how many.
+
+        The background flusher does this on its own; call ``flush()`` to wait for
+        it, e.g. before shutting down. Without a ``wal`` it does nothing.
+
+        Raises:
+            GSABError: the append failed (rate limit, network, …); the rows stay
+                logged and a later flush retries them. Rows that can never be
+                written are set aside in ``wal.failed()`` instead of raising.
+        """
+        if self.wal is None:
+            return 0
+        self._require_sheet()
+        return await self._flush_wal()
+
+    def _kick_flusher(self) -> None:
+        """Make sure a background task is draining the ``wal``."""
+        self._wal_dirty = True
+        loop = asyncio.get_running_loop()
+        task = self._flusher
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._flusher = loop.create_task(self._run_flusher())
+
+    async def _run_flusher(self) -> None:
+        """Drain the ``wal`` until it's empty, backing off while appends fail."""
+        delay = self.wal.retry_delay
+        while self._wal_dirty:
+            self._wal_dirty = False
+            try:
+                await self._flush_wal()
+                delay = self.wal.retry_delay
+            except Exception as e:
+                self._wal_dirty = True
+                logger.warning("Flushing the write-ahead log failed (%s); retry in %.0fs", e, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.wal.max_retry_delay)
+
+    async def _drain_wal(self) -> None:
+        """Write logged inserts out first, so an update / upsert / delete sees them."""
+        if self.wal is None:
+            return
+        if await asyncio.to_thread(self.wal.count, self.sheet_id, self.schema.name):
+            await self._flush_wal()
+
+    async def _flush_wal(self) -> int:
+        """Append this tab's pending ``wal`` rows a batch at a time; returns the count.
+
+        A batch that fails for good is retried entry by entry, so only the entries
+        that can't be written are set aside (`WriteAheadLog.fail`).
+        """
+        await self._ensure_connected()
+        written = 0
+        while True:
+            async with self._writing():
+                entries = await asyncio.to_thread(self.wal.pending, self.sheet_id, self.schema.name)
+                if not entries:
+                    return written
+                try:
+                    written += await self._append_logged(entries)
+                except _PERMANENT:
+                    for entry in entries:
+                        written += await self._append_logged([entry])
+
+    async def _append_logged(self, entries: List[tuple]) -> int:
+        """Append logged ``(id, rows)`` entries in one call, then drop them from the log.
+
+        A lone entry that fails for good is set aside instead of raising.
+        """
+        rows = [row for _, batch in entries for row in batch]
+        try:
+            if self.schema.unique_fields:
+                headers = [field.name for field in self.schema.fields]
+                await self._check_unique(self._decode_rows(headers, rows, 0))
+            await self._append_rows(rows)
+        except _PERMANENT as e:
+            if len(entries) > 1:
+                raise
+            logger.error("Logged insert %d can't be written; set aside: %s", entries[0][0], e)
+            await asyncio.to_thread(self.wal.fail, [entries[0][0]], f"{type(e).__name__}: {e}")
+            return 0
+        await asyncio.to_thread(self.wal.ack, [seq for seq, _ in entries])
+        logger.info("Inserted %d logged row(s)", len(rows))
+        self.policy.emit({"op": "insert", "sheet_id": self.sheet_id, "count": len(rows)})
+        return len(rows)
 
+    @instrumented("insert")
     async def from_dataframe(self, df) -> int:
-        """Insert every row of a pandas DataFrame in bulk. Returns the number inserted."""
-        return await self.bulk_insert(df.to_dict("records"))
+        """Insert every row of a pandas DataFrame in bulk. Returns the number inserted.
 
+        The frame is validated a column at a time (see `CompiledValidator.validate_frame`)
+        before any row is encoded; the first failing row is reported by position.
+        """
+        with codec():
+            failures = self.schema.validator.validate_frame(df)
+        if failures:
+            position, errors = next(iter(failures.items()))
+            raise ValidationError(
+                f"Validation errors in DataFrame row {position} "
+                f"({len(failures)} failing row(s)): {', '.join(errors)}"
+            )
+        return await self._insert(df.to_dict("records"), validated=True)
+
+    @instrumented("read")
     async def to_dataframe(self, filters: Optional[Dict[str, Any]] = None):
         """Read records into a pandas DataFrame (install the `pandas` extra)."""
         import pandas as pd
@@ -308,11 +663,13 @@ class SheetManager:
             for field in self.schema.fields
         ]
 
+    @instrumented("read")
     async def read(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Read records matching the filters, as dicts keyed by field name.
 
         Filtering happens in Python (every row is fetched). For server-side
-        filtering/sorting/aggregation use `query()` instead.
+        filtering/sorting/aggregation use `query()` instead. Reads that run at the
+        same time share one fetch and one decode; each caller gets its own dicts.
 
         Args:
             filters: optional ``{field: value}`` (equality) or ``{field: {op: value}}``.
@@ -397,39 +754,338 @@ class SheetManager:
         row) for the update/delete machinery. Internal — public ``read`` strips it."""
         self._require_sheet()
         await self._ensure_connected()
+        values = await self._fetch_values()
+        if not values or len(values) <= 1:  # Missing or header-only
+            return []
+
+        headers, rows = values[0], values[1:]
+        kept = self._prefilter_sealed(headers, rows, filters) if filters else None
+        if kept is None:
+            # Readers that got the same grid share one decode (each gets its own dicts).
+            records = await self._flights.do(
+                ("decode", id(values)),
+                lambda: self._decode_rows_async(headers, rows, 1),
+                copy=copy_rows,
+            )
+        else:
+            # Decode only the rows whose ciphertexts match; keep their real row indexes.
+            records = await self._decode_rows_async(headers, [rows[i] for i in kept], 1)
+            for i, record in zip(kept, records):
+                record["_row_index"] = i + 1
+        if filters:
+            records = [r for r in records if self._matches_filters(r, filters)]
+        return records
+
+    def _prefilter_sealed(
+        self, headers: List[str], rows: List[List[Any]], filters: Dict[str, Any]
+    ) -> Optional[List[int]]:
+        """Positions of the rows that can match the equality filters on `searchable`
+        fields, found by comparing ciphertexts — or None if no filter qualifies.
+
+        A superset: the full filters still run on the decoded rows afterwards.
+        """
+        checks = []
+        for name, cond in filters.items():
+            field = self._field_map.get(name)
+            if field is None or not self._searchable(field) or name not in headers:
+                continue
+            if isinstance(cond, dict):
+                if set(cond) == {"$eq"}:
+                    targets = [cond["$eq"]]
+                elif set(cond) == {"$in"}:
+                    targets = list(cond["$in"])
+                else:
+                    continue
+            else:
+                targets = [cond]
+            try:
+                sealed = set().union(*(self._sealed_forms(field, t) for t in targets))
+            except (ValueError, GSABError):
+                continue  # not this field's type: leave it to the decoded comparison
+            checks.append((headers.index(name), sealed))
+        if not checks:
+            return None
+        return [
+            i
+            for i, row in enumerate(rows)
+            if all((row[col] if col < len(row) else "") in sealed for col, sealed in checks)
+        ]
+
+    def _invalidate_reads(self) -> None:
+        """Forget reads in flight and cached query results: after a write, new reads
+        must see it (read-your-writes)."""
+        self._flights.forget()
+        self._generation += 1
+        if self.query_cache is not None and self.sheet_id:
+            self.query_cache.invalidate(self.sheet_id)
+        if self.snapshot is not None and self.sheet_id:
+            self.snapshot.invalidate(self.sheet_id)
+
+    async def _fetch_values(self) -> List[List[Any]]:
+        """The tab's raw cell grid, header first (shared with identical reads in flight).
+
+        Callers must treat the grid as read-only: concurrent readers get the same one.
+        """
+        checked = _in_write.get()
+        key = ("values", self.sheet_id, self.schema.name, checked)
+        return await self._flights.do(key, lambda: self._load_values(checked=checked))
+
+    async def _load_values(self, *, checked: bool = False) -> List[List[Any]]:
+        """The tab's raw cell grid, header first — from the snapshot store when current.
+
+        The store's sqlite I/O runs on a worker thread. Within the store's ``ttl`` the
+        snapshot is served without asking Drive for the version, unless ``checked``
+        (a write's read).
+        """
+        store, tab = self.snapshot, self.schema.name
+        version = None
+        if store is not None:
+            if not checked:
+                cached = await asyncio.to_thread(store.fresh, self.sheet_id, tab)
+                if cached is not None:
+                    return cached
+            version = await self._drive_version()
+        if version is not None:
+            cached = await asyncio.to_thread(store.get, self.sheet_id, tab, version)
+            if cached is not None:
+                return cached
         result = await execute(
             self.connection.service.spreadsheets()
             .values()
             .get(spreadsheetId=self.sheet_id, range=f"{self.schema.name}!A:Z"),
             op="read",
+            retry_policy=self._retry,
         )
+        values = result.get("values") or []
+        if version is not None:
+            # Tagged with the version seen *before* the fetch: a write landing in
+            # between only makes the next read refetch, never serve stale rows.
+            await asyncio.to_thread(store.put, self.sheet_id, tab, version, values)
+        return values
+
+    async def _drive_version(self) -> Optional[str]:
+        """The spreadsheet's Drive ``version`` (bumped on every edit), or None if unknown."""
+        try:
+            meta = await execute(
+                self._drive().files().get(fileId=self.sheet_id, fields="version,modifiedTime"),
+                op="snapshot_check",
+                retry_policy=self._retry,
+            )
+        except GSABError as e:
+            logger.debug("Snapshot check unavailable (%s); reading from the API.", e)
+            return None
+        version = meta.get("version") or meta.get("modifiedTime")
+        return str(version) if version else None
+
+    def _decode_rows(
+        self, headers: List[str], rows: List[List[Any]], first_index: int
+    ) -> List[Dict[str, Any]]:
+        """Decode raw sheet rows into records, one column at a time.
+
+        Each column is looked up against the schema once and decoded in a single
+        pass (short rows are padded with empty cells). Every record carries
+        ``_row_index`` — its 0-based sheet row, ``first_index`` for the first one.
+        """
+        records: List[Dict[str, Any]] = [{} for _ in rows]
+        with codec():
+            for col, header in enumerate(headers):
+                field = self._field_map.get(header)
+                if field is None:
+                    continue
+                column = [row[col] if col < len(row) else "" for row in rows]
+                if field.encrypted and self.encryptor:
+                    column = self._decrypt_column(field, column)
+                    decode = self._convert_cell
+                else:
+                    decode = self._decode_value
+                for record, value in zip(records, column):
+                    record[header] = decode(field, value)
+        # 0-based sheet row index (header is row 0) — used by update/delete.
+        for row_index, record in enumerate(records, start=first_index):
+            record["_row_index"] = row_index
+        return records
 
-        values = result.get("values")
-        if not values or len(values) <= 1:  # Missing or header-only
-            return []
+    def _decrypt_column(self, field, column: List[Any]) -> List[Any]:
+        """Decrypt a column's non-empty cells in one `decrypt_many` call.
 
-        headers = values[0]
-        records = []
-        for row_index, row in enumerate(values[1:], start=1):
-            record = {}
+        A cell that won't decrypt is logged and kept as-is, like `_decode_value`.
+        """
 
-            # Pad row with empty strings if necessary
-            row_data = row + [""] * (len(headers) - len(row))
+        def keep(token: str, error: Exception) -> str:
+            logger.warning("Failed to decrypt field %s: %s", field.name, error)
+            return token
 
-            for header, value in zip(headers, row_data):
-                field = self._field_map.get(header)
-                if field:
-                    record[header] = self._decode_value(field, value)
+        filled = [i for i, v in enumerate(column) if v]
+        opened = self.encryptor.decrypt_many([column[i] for i in filled], on_error=keep)
+        column = list(column)
+        for i, value in zip(filled, opened):
+            column[i] = value
+        return column
 
-            # 0-based sheet row index (header is row 0) — used by update/delete.
-            record["_row_index"] = row_index
+    async def _decode_rows_async(
+        self, headers: List[str], rows: List[List[Any]], first_index: int
+    ) -> List[Dict[str, Any]]:
+        """`_decode_rows`, on a worker thread when many cells need decrypting.
 
-            if filters and not self._matches_filters(record, filters):
-                continue
+        Decryption is pure CPU; running it off the event loop keeps other tasks
+        (and `watch()` polls) moving while a large encrypted tab is opened.
+        """
+        if self._crypto_cells(len(rows)) >= PARALLEL_MIN:
+            return await asyncio.to_thread(self._decode_rows, headers, rows, first_index)
+        return self._decode_rows(headers, rows, first_index)
 
-            records.append(record)
+    async def _iter_pages(self, page_size: int):
+        """Yield the tab's records a page (``page_size`` rows) at a time.
 
-        return records
+        Reads the header once, then fixed row ranges down to the grid's last row, so
+        only one page is ever held in memory. Records carry ``_row_index``.
+        """
+        async for headers, rows, start in self._iter_raw_pages(page_size):
+            yield await self._decode_rows_async(headers, rows, start - 1)
+
+    async def _iter_raw_pages(self, page_size: int):
+        """Yield ``(headers, raw rows, first 1-based row)`` a page at a time (see `_iter_pages`)."""
+        if page_size < 1:
+            raise ValidationError("page_size must be at least 1.")
+        self._require_sheet()
+        await self._ensure_connected()
+        values = self.connection.service.spreadsheets().values()
+        header = await execute(
+            values.get(spreadsheetId=self.sheet_id, range=f"{self.schema.name}!A1:Z1"),
+            op="read",
+            retry_policy=self._retry,
+        )
+        headers = (header.get("values") or [[]])[0]
+        if not headers:
+            return
+        # Page down to the grid's row count, not the first empty page: a block of
+        # blank rows mid-tab must not end the scan (rotation would skip the rest).
+        grid = (await self._tab_properties()).get("gridProperties") or {}
+        last = grid.get("rowCount", 0)
+        start = 2  # first data row, 1-based
+        while start <= last:
+            end = min(start + page_size - 1, last)
+            result = await execute(
+                values.get(
+                    spreadsheetId=self.sheet_id, range=f"{self.schema.name}!A{start}:Z{end}"
+                ),
+                op="read",
+                retry_policy=self._retry,
+            )
+            rows = result.get("values") or []
+            if rows:
+                yield headers, rows, start
+            start = end + 1
+
+    @instrumented("rotate_key")
+    async def rotate_encryption_key(
+        self, new_key: Optional[str] = None, *, page_size: int = 1000
+    ) -> int:
+        """Re-encrypt every encrypted cell of the tab under the newest key.
+
+        Pass ``new_key`` to make it the primary key (the current keys stay on to
+        decrypt), or construct the manager with ``encryption_key=[new, old]`` and
+        call this with no argument. The tab is streamed ``page_size`` rows at a time:
+        each page's encrypted columns are re-sealed (in parallel for large pages,
+        off the event loop) and written back with one ``values().batchUpdate`` of
+        column ranges, so a page costs one read and one write whatever its size.
+        Other columns are never written. Returns the number of cells re-encrypted.
+
+        Once it returns, every cell opens with the new key alone and the old one can
+        be dropped. Rotate while the tab is quiet: a cell written by someone else
+        between a page's read and its write-back is overwritten with its old value.
+
+        Raises:
+            ValidationError: the schema has no encrypted field or no key was given.
+            PolicyError: the policy is read-only.
+        """
+        self._require_sheet()
+        self.policy.ensure_writable("rotate_encryption_key")
+        if not any(f.encrypted for f in self.schema.fields):
+            raise ValidationError("This schema has no encrypted fields — nothing to rotate.")
+        if new_key is not None:
+            old = self.encryptor._keys if self.encryptor else ()
+            self.encryptor = Encryptor([new_key, *old])
+        if self.encryptor is None:
+            raise ValidationError(
+                "rotate_encryption_key needs a key: pass new_key, or build the manager "
+                "with encryption_key=[new_key, old_key]."
+            )
+        async with self._writing():
+            count = await self._rotate_pages(page_size)
+        self.policy.emit({"op": "rotate_encryption_key", "sheet_id": self.sheet_id, "count": count})
+        return count
+
+    async def _rotate_pages(self, page_size: int) -> int:
+        """`rotate_encryption_key` body: re-seal the tab a page at a time."""
+        count = 0
+        values = self.connection.service.spreadsheets().values()
+        async for headers, rows, start in self._iter_raw_pages(page_size):
+            data = []
+            for col, name in enumerate(headers[:26]):
+                field = self._field_map.get(name)
+                if field is None or not field.encrypted:
+                    continue
+                cells = [row[col] if col < len(row) else "" for row in rows]
+                if not any(cells):
+                    continue
+                if len(cells) >= PARALLEL_MIN:
+                    rotated = await asyncio.to_thread(self.encryptor.rotate_many, cells)
+                else:
+                    rotated = self.encryptor.rotate_many(cells)
+                count += sum(1 for c in cells if c)
+                letter = chr(ord("A") + col)
+                end = start + len(rows) - 1
+                data.append(
+                    {
+                        "range": f"{self.schema.name}!{letter}{start}:{letter}{end}",
+                        "values": [[c] for c in rotated],
+                    }
+                )
+            if data:
+                await execute(
+                    values.batchUpdate(
+                        spreadsheetId=self.sheet_id,
+                        body={"valueInputOption": "RAW", "data": data},
+                    ),
+                    op="rotate_key",
+                    retry_policy=self._retry,
+                )
+                self._invalidate_reads()
+        return count
+
+    @instrumented("export")
+    async def export(
+        self, dest: Any, *, format: Optional[str] = None, page_size: int = 1000
+    ) -> int:
+        """Stream every row of the tab to CSV, NDJSON or Parquet. Returns the row count.
+
+        Rows are fetched a page at a time and written as they arrive, so memory
+        stays bounded by ``page_size`` however large the tab is — fit for nightly
+        backups and shell pipes.
+
+        Args:
+            dest: a file path, or an open file object (text for ``csv`` / ``ndjson``,
+                binary for ``parquet``) such as ``sys.stdout``.
+            format: ``"csv"``, ``"ndjson"`` or ``"parquet"``. Defaults to the path's
+                extension, else ``"csv"``. Parquet needs ``pip install "gsab[parquet]"``.
+            page_size: rows fetched per read call.
+
+        Example:
+            await db.export("users.ndjson")
+            await db.export(sys.stdout, format="csv")
+        """
+        from ..utils.export import open_writer
+
+        count = 0
+        with open_writer(dest, self.schema, format) as writer:
+            async for page in self._iter_pages(page_size):
+                for record in page:
+                    record.pop("_row_index", None)
+                writer.write(page)
+                count += len(page)
+        self.policy.emit({"op": "export", "sheet_id": self.sheet_id, "count": count})
+        return count
 
     def _matches_filters(self, record: Dict[str, Any], filters: Dict[str, Any]) -> bool:
         """Check whether a record matches all filters (equality or operator dicts).
@@ -452,7 +1108,23 @@ class SheetManager:
             raise ValidationError(f"Unknown field: {field_name}. Fields: {', '.join(names)}.")
         return chr(ord("A") + names.index(field_name))
 
-    async def query(self, sql: str) -> List[Dict[str, Any]]:
+    def select(self, *fields: str) -> Select:
+        """Start a gviz query by field name — see `Select`.
+
+        Example::
+
+            top = await db.select("name").where(price__gt=1000).order_by("-price").limit(10)
+
+        With no ``fields`` every column is selected; aggregates read like
+        ``"avg(price)"``. Values are quoted for you, so user input can't change
+        the query the way an f-string built for ``query()`` could.
+        """
+        return Select(self, *fields)
+
+    @instrumented("query")
+    async def query(
+        self, sql: str, *, columnar: bool = False
+    ) -> Union[List[Dict[str, Any]], Dict[str, List[Any]]]:
         """Run a Google Visualization (gviz) query against this tab, server-side.
 
         Columns are referenced by letter — use ``column()`` to map a field name.
@@ -460,35 +1132,204 @@ class SheetManager:
 
             await db.query("SELECT A, D WHERE D = 'pro' ORDER BY A DESC LIMIT 10")
 
-        Returns a list of dicts keyed by the sheet's header labels. Columns that
+        Returns a list of dicts keyed by the sheet's header labels — or, with
+        ``columnar=True``, one ``{label: [values]}`` dict of columns (cheaper for
+        large results; ``pandas.DataFrame(...)`` takes it as is). Columns that
         map to a schema field come back in that field's Python type (and decrypted),
         matching ``read()``; aggregates like ``SUM(D)`` stay gviz-native. Filtering,
         sorting and aggregation run on Google's servers, not in Python.
+
+        The request runs on a worker thread, and concurrent calls with the same
+        ``sql`` share a single request (each gets its own copy of the rows). With a
+        ``query_cache``, a repeated query is answered from memory while fresh.
         """
         self._require_sheet()
         await self._ensure_connected()
-        from .query import run_gviz_query
+        key = ("query", self.sheet_id, self.schema.name, sql)
+        table = await self._flights.do(key, lambda: self._cached_query(sql))
+        self.policy.emit({"op": "query", "sheet_id": self.sheet_id, "count": len(table)})
+        return table.to_columns() if columnar else table.rows()
+
+    async def iter_query(self, sql: str, *, page_size: int = 1000):
+        """Run a gviz ``query()`` a page at a time, yielding its rows one by one.
+
+        ``sql`` is re-issued with ``LIMIT page_size`` and a growing ``OFFSET``
+        (within any ``LIMIT`` / ``OFFSET`` it already has) until a page comes back
+        short. The next page is requested while the current one is being consumed,
+        so at most two pages are held in memory and the first rows arrive after one
+        page, not the whole result. Give the query an ``ORDER BY`` so that rows
+        written between pages can't shift rows across a page boundary.
 
-        rows = run_gviz_query(
-            self.connection.credentials, self.sheet_id, sql, sheet=self.schema.name
+        Example::
+
+            async for row in db.iter_query("SELECT * WHERE C > 100 ORDER BY A", page_size=500):
+                ...
+
+        Yields:
+            Row dicts, decoded as ``query()`` decodes them.
+        """
+        if page_size < 1:
+            raise ValidationError("page_size must be at least 1.")
+        pages = gviz_pages(sql, page_size)
+        page = next(pages, None)
+        pending = asyncio.ensure_future(self.query(page[0])) if page else None
+        try:
+            while pending is not None:
+                rows = await pending
+                pending = None
+                if len(rows) == page[1]:  # a full page: there may be more
+                    page = next(pages, None)
+                    if page is not None:
+                        pending = asyncio.ensure_future(self.query(page[0]))
+                for row in rows:
+                    yield row
+        finally:
+            if pending is not None:  # the caller stopped early
+                pending.cancel()
+
+    async def _cached_query(self, sql: str) -> GvizTable:
+        """`_run_query` through the query cache, if there is one."""
+        cache = self.query_cache
+        if cache is None:
+            return await self._run_query(sql)
+        sheet_id, tab = self.sheet_id, self.schema.name
+        generation = cache.generation(sheet_id)
+        version = None
+        if cache.validate:
+            version = await self._drive_version()
+            if version is None:  # can't tell whether it changed: ask Google
+                return await self._run_query(sql)
+        table = cache.get(sheet_id, tab, sql, version=version)
+        if table is None:
+            table = await self._run_query(sql)
+            # Tagged with the version seen before the query, like snapshots.
+            cache.put(sheet_id, tab, sql, table, generation=generation, version=version)
+        return table
+
+    async def _run_query(self, sql: str) -> GvizTable:
+        """Run the gviz request and decode its columns, on a worker thread."""
+        session = getattr(self.connection, "http_session", None)
+        return await asyncio.to_thread(self._query_table, sql, session() if session else None)
+
+    def _query_table(self, sql: str, session: Any) -> GvizTable:
+        from . import query
+
+        table = query.run_gviz_query(
+            self.connection.credentials,
+            self.sheet_id,
+            sql,
+            sheet=self.schema.name,
+            session=session,
+            retry_policy=self._retry,
+            columnar=True,
         )
-        for row in rows:
-            for key, value in row.items():
-                field = self._field_map.get(key)
-                if field is not None and value is not None:
-                    row[key] = self._decode_value(field, value)
-        self.policy.emit({"op": "query", "sheet_id": self.sheet_id, "count": len(rows)})
+        if isinstance(table, list):  # a stand-in that returns row dicts
+            table = GvizTable.from_rows(table)
+        with codec():
+            columns = [
+                self._decode_column(self._field_map[label], column)
+                if label in self._field_map
+                else column
+                for label, column in zip(table.labels, table.columns)
+            ]
+        return GvizTable(table.labels, columns, table.nbytes)
+
+    def _decode_column(self, field: Field, column: List[Any]) -> List[Any]:
+        """Decode one column of gviz values to the field's type (nulls stay None).
+
+        Same result as `_decode_value` per cell, but a column of plain numbers,
+        booleans or text converts in one ``map`` call.
+        """
+        if field.encrypted and self.encryptor:
+            column = self._decrypt_column(field, column)
+        else:
+            fast = _FAST_CONVERTERS.get(field.field_type)
+            if fast is not None and None not in column:
+                try:
+                    return list(map(fast, column))
+                except (TypeError, ValueError, OverflowError):
+                    pass  # a stray cell: convert one by one, keeping it as text
+        convert = self._convert_cell
+        return [None if v is None else convert(field, v) for v in column]
+
+    @instrumented("sql")
+    async def sql(
+        self,
+        sql: str,
+        *others: "SheetManager",
+        params: Optional[List[Any]] = None,
+        engine: str = "auto",
+    ) -> List[Dict[str, Any]]:
+        """Run SQL locally over this tab's rows (and any ``others``), by field name.
+
+        Unlike ``query()``, columns are real field names, tabs can be joined, and
+        the SQL runs in an in-memory DuckDB (if installed) or SQLite database —
+        the tab is the table named after the schema. The loaded database is kept
+        for the next call over the same tabs: while no write has gone through any
+        of their managers and each spreadsheet's Drive ``version`` is unchanged, a
+        repeat costs one Drive metadata call per spreadsheet instead of a download.
+        If the version can't be read, the tabs are downloaded every time.
+
+        Example::
+
+            await db.sql("SELECT name, SUM(price) FROM users GROUP BY name")
+            await users.sql(
+                "SELECT u.name, COUNT(*) AS n FROM users u "
+                "JOIN orders o ON o.user_id = u.id GROUP BY u.name",
+                orders,
+            )
+
+        Raises:
+            ValidationError: the SQL is rejected by the local engine.
+        """
+        local, kept = await self._local_sql(others, engine)
+        try:
+            rows = local.query(sql, params)
+        finally:
+            if not kept:
+                local.close()
+        self.policy.emit({"op": "sql", "sheet_id": self.sheet_id, "count": len(rows)})
         return rows
 
+    async def _local_sql(self, others: tuple, engine: str) -> tuple:
+        """``(LocalSQL, kept)``: the database `sql()` loaded last time if still current,
+        else a fresh one (``kept`` when it's stored for reuse)."""
+        from .local_sql import LocalSQL
+
+        managers = (self, *others)
+        key = (engine, others)
+        # Read before loading: a write or edit landing mid-load only forces a reload.
+        generations = tuple(m._generation for m in managers)
+        by_sheet = {m.sheet_id: m for m in managers}
+        found = await asyncio.gather(*(m._drive_version() for m in by_sheet.values()))
+        versions = dict(zip(by_sheet, found))
+        entry = self._local.pop(key, None)
+        if entry is not None:
+            local, old_generations, old_versions = entry
+            if old_generations == generations and old_versions == versions:
+                self._local[key] = entry
+                return local, True
+            local.close()
+        local = await LocalSQL(*managers, engine=engine).load()
+        if None in found:  # can't tell when it goes stale: don't keep it
+            return local, False
+        self._local[key] = (local, generations, versions)
+        return local, True
+
     async def _tab_id(self) -> int:
         """Return this tab's numeric ``sheetId`` (not the spreadsheet id)."""
+        return (await self._tab_properties())["sheetId"]
+
+    async def _tab_properties(self) -> Dict[str, Any]:
+        """This tab's ``properties`` (``sheetId``, ``gridProperties``, …): one metadata call."""
         meta = await execute(
             self.connection.service.spreadsheets().get(spreadsheetId=self.sheet_id),
             op="metadata",
+            retry_policy=self._retry,
         )
         for sheet in meta["sheets"]:
             if sheet["properties"]["title"] == self.schema.name:
-                return sheet["properties"]["sheetId"]
+                return sheet["properties"]
         raise NotFoundError(f"Tab '{self.schema.name}' not found in spreadsheet {self.sheet_id}.")
 
     def _update_cells_request(
@@ -498,8 +1339,12 @@ class SheetManager:
 
         ``record`` is the full row (all field names → values); callers merge their
         changes over the existing values first. ``row_index`` is 0-based (header = 0).
+        A `version` field gets a new version.
         """
-        values = [self._user_entered(field, record.get(field.name)) for field in self.schema.fields]
+        values = [
+            self._user_entered(field, _new_version() if field.version else record.get(field.name))
+            for field in self.schema.fields
+        ]
         return {
             "updateCells": {
                 "range": {
@@ -521,31 +1366,197 @@ class SheetManager:
         merged.update(changes)
         return merged
 
+    def _changed_cells(self, changes: List[tuple]) -> Dict[int, Dict[int, Any]]:
+        """``{column: {row_index: cell}}`` for the cells ``changes`` really alter.
+
+        ``changes`` pairs an existing record (with ``_row_index``) with the values to
+        overlay on it. A field counts as changed when its encoded plain value differs
+        from the current one; only those cells are encoded (and encrypted — one
+        batch per column).
+        """
+        pending: Dict[int, List[tuple]] = {}
+        for col, field in enumerate(self.schema.fields):
+            if field.version:
+                continue  # stamped by `_write_changes`, never taken from the caller
+            for record, overlay in changes:
+                if field.name not in overlay:
+                    continue
+                new = overlay[field.name]
+                try:
+                    unchanged = self._plain_cell(field, new) == self._plain_cell(
+                        field, record.get(field.name)
+                    )
+                except ValueError:
+                    unchanged = False
+                if not unchanged:
+                    pending.setdefault(col, []).append((record["_row_index"], new))
+        out: Dict[int, Dict[int, Any]] = {}
+        for col, cells in pending.items():
+            # Last write wins for a row listed twice (e.g. duplicate keys in a batch).
+            latest = dict(cells)
+            encoded = self._cells_for(self.schema.fields[col], list(latest.values()))
+            out[col] = dict(zip(latest, encoded))
+        return out
+
+    def _value_ranges(self, cells: Dict[int, Dict[int, Any]]) -> List[Dict[str, Any]]:
+        """Group changed cells into A1 ranges for ``values().batchUpdate``.
+
+        Each column's rows are split into runs of adjacent rows; neighbouring columns
+        with the same run are merged into one rectangle. ``row_index`` is 0-based
+        (header = 0), so sheet row = ``row_index + 1``.
+        """
+        runs: Dict[tuple, List[int]] = {}
+        for col in sorted(cells):
+            rows = sorted(cells[col])
+            first = prev = rows[0]
+            for row in rows[1:] + [None]:
+                if row is not None and row == prev + 1:
+                    prev = row
+                    continue
+                runs.setdefault((first, prev), []).append(col)
+                if row is not None:
+                    first = prev = row
+        ranges = []
+        for (first, last), cols in sorted(runs.items()):
+            group = [cols[0]]
+            for col in cols[1:] + [None]:
+                if col is not None and col == group[-1] + 1:
+                    group.append(col)
+                    continue
+                left, right = chr(ord("A") + group[0]), chr(ord("A") + group[-1])
+                ranges.append(
+                    {
+                        "range": f"{self.schema.name}!{left}{first + 1}:{right}{last + 1}",
+                        "values": [
+                            [cells[c][row] for c in group] for row in range(first, last + 1)
+                        ],
+                    }
+                )
+                group = [col]
+        return ranges
+
+    async def _write_changes(
+        self, changes: List[tuple], *, op: str, key: Optional[str] = None
+    ) -> int:
+        """Write only the changed cells of ``changes`` (see `_changed_cells`) in one
+        ``values().batchUpdate``. Returns the number of ranges sent (0 = no call).
+
+        With a `version` field, every changed row also gets a new version, and the
+        rows are checked with `_verify_rows` (matched on ``key``) first.
+        """
+        with codec():
+            cells = self._changed_cells(changes)
+        version = self.schema.version_field
+        if cells and version:
+            touched = {row for column in cells.values() for row in column}
+            await self._verify_rows([r for r, _ in changes if r["_row_index"] in touched], key=key)
+            col = ord(self.column(version)) - ord("A")
+            cells[col] = {row: _new_version() for row in touched}
+        with codec():
+            data = self._value_ranges(cells) if cells else []
+        if data:
+            await execute(
+                self.connection.service.spreadsheets()
+                .values()
+                .batchUpdate(
+                    spreadsheetId=self.sheet_id,
+                    body={"valueInputOption": "RAW", "data": data},
+                ),
+                op=op,
+                retry_policy=self._retry,
+            )
+            self._invalidate_reads()
+        return len(data)
+
+    async def _verify_rows(self, records: List[Dict[str, Any]], *, key: Optional[str]) -> None:
+        """Raise `ConflictError` unless each record's row still holds what was read.
+
+        Re-reads only the version column (and the ``key`` column, default: the
+        primary key) over the span of the records' rows. A row whose version
+        changed was written by someone else; a row whose key changed has moved
+        (a delete above it shifted the tab) — either way the write must not land.
+        """
+        version = self.schema.version_field
+        if not version or not records:
+            return
+        key = key or self.schema.primary_key
+        names = [version] + ([key] if key and key != version else [])
+        first = min(r["_row_index"] for r in records) + 1  # 1-based sheet rows
+        last = max(r["_row_index"] for r in records) + 1
+        ranges = [
+            f"{self.schema.name}!{self.column(n)}{first}:{self.column(n)}{last}" for n in names
+        ]
+        result = await execute(
+            self.connection.service.spreadsheets()
+            .values()
+            .batchGet(spreadsheetId=self.sheet_id, ranges=ranges),
+            op="verify",
+            retry_policy=self._retry,
+        )
+        columns = []
+        for value_range in result.get("valueRanges", []):
+            rows = value_range.get("values") or []
+            columns.append([row[0] if row else "" for row in rows])
+        for record in records:
+            offset = record["_row_index"] + 1 - first
+            for name, column in zip(names, columns):
+                raw = column[offset] if offset < len(column) else ""
+                if name == version:
+                    same = raw == (record.get(version) or "")
+                else:
+                    same = self._decode_value(self._field_map[name], raw) == record.get(name)
+                if not same:
+                    raise ConflictError(
+                        f"Row {record['_row_index'] + 1} of '{self.schema.name}' changed after "
+                        f"it was read ({name} is now {raw!r}): another writer updated, moved "
+                        "or deleted it. Retry the operation, or serialize concurrent writers."
+                    )
+
+    async def _optimistic(self, op: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Run a read-check-write ``attempt``, redoing it from a fresh read (after a
+        short jittered pause) each time `_verify_rows` finds a conflict."""
+        retry = 0
+        while True:
+            try:
+                return await attempt()
+            except ConflictError:
+                if retry >= self.conflict_retries:
+                    raise
+                logger.info("%s hit a concurrent write; redoing it (%d)", op, retry + 1)
+                self._invalidate_reads()
+                await asyncio.sleep(random.uniform(0, 0.05 * 2**retry))
+                retry += 1
+
+    @instrumented("update")
     async def update(self, filters: Dict[str, Any], updates: Dict[str, Any]) -> int:
-        """Update records matching the filters. Returns the number of rows updated."""
+        """Update records matching the filters. Returns the number of rows updated.
+
+        Only the cells whose value actually changes are written — one range per run
+        of adjacent rows and columns, all in a single ``values().batchUpdate``.
+
+        With a `version` field, the target rows are re-checked just before writing
+        and the update is redone on a conflict (see ``conflict_retries``). Include
+        the version you read in ``filters`` to update only if nobody else has since.
+        """
         self._require_sheet()
         self.policy.ensure_writable("update")
+        await self._drain_wal()
+        async with self._writing():
+            return await self._optimistic("update", lambda: self._update_once(filters, updates))
+
+    async def _update_once(self, filters: Dict[str, Any], updates: Dict[str, Any]) -> int:
         matching_records = await self._read_indexed(filters)
         if not matching_records:
             logger.info("No rows found matching the filters")
             return 0
 
-        sheet_id = await self._tab_id()
-        requests = [
-            self._update_cells_request(sheet_id, record["_row_index"], self._merge(record, updates))
-            for record in matching_records
-        ]
-        await execute(
-            self.connection.service.spreadsheets().batchUpdate(
-                spreadsheetId=self.sheet_id, body={"requests": requests}
-            ),
-            op="update",
-        )
+        await self._write_changes([(record, updates) for record in matching_records], op="update")
         self.policy.emit(
             {"op": "update", "sheet_id": self.sheet_id, "count": len(matching_records)}
         )
         return len(matching_records)
 
+    @instrumented("upsert")
     async def upsert(self, data: Dict[str, Any], *, key: Optional[str] = None) -> str:
         """Insert ``data``, or update the existing row with the same key.
 
@@ -565,12 +1576,18 @@ class SheetManager:
 
         Note:
             This is a read-check-write — Google Sheets has no conditional write — so
-            two concurrent upserts of the same new key can both insert (duplicate), and
-            concurrent updates are last-write-wins.
+            two concurrent upserts of the same new key in *different processes* can
+            both insert (duplicate), and concurrent updates are last-write-wins.
+            Within a process, writes to a tab are serialized; give every worker the
+            same ``write_lock`` (e.g. `FileLock`) to serialize across processes. A
+            `version` field in the schema narrows the update race to one round
+            trip: rows are re-checked right before the write, and the upsert is
+            redone if another writer got there first.
         """
         result = await self.bulk_upsert([data], key=key)
         return "updated" if result["updated"] else "inserted"
 
+    @instrumented("upsert")
     async def bulk_upsert(
         self, records: List[Dict[str, Any]], *, key: Optional[str] = None
     ) -> Dict[str, int]:
@@ -579,7 +1596,8 @@ class SheetManager:
         Reads the tab once, then appends the new rows and updates the matching ones —
         at most one append plus one batched update. Within ``records``, the last entry
         for a given key wins. Returns ``{"inserted": n, "updated": m}`` (row counts).
-        See `upsert()` for the race-window caveat.
+        See `upsert()` for the race-window caveat; with a `version` field, updates
+        are re-checked and redone on a conflict as in `update()`.
         """
         self._require_sheet()
         self.policy.ensure_writable("upsert")
@@ -606,63 +1624,68 @@ class SheetManager:
             return {"inserted": 0, "updated": 0}
 
         await self._ensure_connected()
+        await self._drain_wal()
+        async with self._writing():
+            return await self._optimistic("upsert", lambda: self._upsert_once(deduped, key))
+
+    async def _upsert_once(self, deduped: Dict[Any, Dict[str, Any]], key: str) -> Dict[str, int]:
         existing = await self._read_indexed()
         # Key value -> the existing records (a list, in case legacy data has duplicates).
         by_key: Dict[Any, List[Dict[str, Any]]] = {}
         for record in existing:
             by_key.setdefault(record.get(key), []).append(record)
 
-        to_append: List[List[Any]] = []
-        update_requests: List[Dict[str, Any]] = []
-        sheet_id: Optional[int] = None
+        to_append: List[Dict[str, Any]] = []
+        updates: List[tuple] = []
         for key_value, record in deduped.items():
             matches = by_key.get(key_value)
             if matches:
-                if sheet_id is None:
-                    sheet_id = await self._tab_id()
-                for existing_row in matches:
-                    merged = self._merge(existing_row, record)
-                    update_requests.append(
-                        self._update_cells_request(sheet_id, existing_row["_row_index"], merged)
-                    )
+                updates.extend((existing_row, record) for existing_row in matches)
             else:
-                to_append.append(self._encode_row(record))
-
-        if to_append:
-            await self._append_rows(to_append)
-        if update_requests:
-            await execute(
-                self.connection.service.spreadsheets().batchUpdate(
-                    spreadsheetId=self.sheet_id, body={"requests": update_requests}
-                ),
-                op="upsert",
-            )
-        logger.info("Upserted: %d inserted, %d updated", len(to_append), len(update_requests))
+                to_append.append(record)
+
+        # Validate the new rows before writing anything, then updates before the
+        # append: a bad record or a conflict found while updating leaves nothing
+        # half-done.
+        new_rows = await self._encode_rows_async(to_append) if to_append else []
+        if updates:
+            await self._write_changes(updates, op="upsert", key=key)
+        if new_rows:
+            await self._append_rows(new_rows)
+        logger.info("Upserted: %d inserted, %d updated", len(to_append), len(updates))
         self.policy.emit(
             {
                 "op": "upsert",
                 "sheet_id": self.sheet_id,
                 "inserted": len(to_append),
-                "updated": len(update_requests),
+                "updated": len(updates),
             }
         )
-        return {"inserted": len(to_append), "updated": len(update_requests)}
+        return {"inserted": len(to_append), "updated": len(updates)}
 
+    @instrumented("delete")
     async def delete(self, filters: Dict[str, Any], *, confirm: bool = False) -> int:
         """Delete rows matching the filters. Returns the number of rows deleted.
 
         Uses each record's true sheet row index (captured during ``read``), so
         duplicate rows are deleted correctly. Rows are removed bottom-up in one
         batch call so earlier indices stay valid. If the policy sets
-        ``confirm_destructive``, pass ``confirm=True`` to proceed.
+        ``confirm_destructive``, pass ``confirm=True`` to proceed. With a `version`
+        field, the rows are re-checked just before deleting, as in `update()`.
         """
         self._require_sheet()
         self.policy.ensure_writable("delete")
         self.policy.ensure_destructive_ok("delete", confirm)
+        await self._drain_wal()
+        async with self._writing():
+            return await self._optimistic("delete", lambda: self._delete_once(filters))
+
+    async def _delete_once(self, filters: Dict[str, Any]) -> int:
         rows = await self._read_indexed(filters)
         if not rows:
             return 0
 
+        await self._verify_rows(rows, key=None)
         sheet_id = await self._tab_id()
         # Highest index first so deleting a row never shifts the ones still to delete.
         indices = sorted({record["_row_index"] for record in rows}, reverse=True)
@@ -684,7 +1707,9 @@ class SheetManager:
                 spreadsheetId=self.sheet_id, body={"requests": requests}
             ),
             op="delete",
+            retry_policy=self._retry,
         )
+        self._invalidate_reads()
         self.policy.emit({"op": "delete", "sheet_id": self.sheet_id, "count": len(indices)})
         return len(indices)
 
@@ -696,9 +1721,11 @@ class SheetManager:
             .values()
             .get(spreadsheetId=self.sheet_id, range=f"{self.schema.name}!A:A"),
             op="extent",
+            retry_policy=self._retry,
         )
         return sheet_id, len(result.get("values", []))
 
+    @instrumented("chart")
     async def chart(
         self,
         *,
@@ -804,11 +1831,13 @@ class SheetManager:
                 spreadsheetId=self.sheet_id, body={"requests": [request]}
             ),
             op="chart",
+            retry_policy=self._retry,
         )
         chart_id = result["replies"][0]["addChart"]["chart"]["chartId"]
         logger.info("Added %s chart %s", kind, chart_id)
         return chart_id
 
+    @instrumented("rename_sheet")
     async def rename_sheet(self, new_title: str) -> None:
         """Rename the spreadsheet."""
         self._require_sheet()
@@ -824,12 +1853,13 @@ class SheetManager:
                 spreadsheetId=self.sheet_id, body={"requests": [request]}
             ),
             op="rename",
+            retry_policy=self._retry,
         )
         logger.info("Renamed sheet to: %s", new_title)
 
     def _drive(self):
-        """Build a Drive v3 client for ownership-level ops on sheets GSAB created."""
-        return build("drive", "v3", credentials=self.connection.credentials)
+        """The shared Drive v3 client, for ownership-level ops on sheets GSAB created."""
+        return self.connection.drive()
 
     @property
     def csv_url(self) -> str:
@@ -841,6 +1871,7 @@ class SheetManager:
         self._require_sheet()
         return f"https://docs.google.com/spreadsheets/d/{self.sheet_id}/export?format=csv"
 
+    @instrumented("share")
     async def share(self, *, role: Optional[str] = None) -> str:
         """Make this spreadsheet accessible to anyone with the link; return its URL.
 
@@ -868,15 +1899,19 @@ class SheetManager:
                 fileId=self.sheet_id, body={"type": "anyone", "role": role}, fields="id"
             ),
             op="share",
+            retry_policy=self._retry,
         )
         meta = await execute(
-            drive.files().get(fileId=self.sheet_id, fields="webViewLink"), op="share"
+            drive.files().get(fileId=self.sheet_id, fields="webViewLink"),
+            op="share",
+            retry_policy=self._retry,
         )
         url = meta.get("webViewLink", f"https://docs.google.com/spreadsheets/d/{self.sheet_id}")
         logger.info("Shared spreadsheet publicly (%s): %s", role, url)
         self.policy.emit({"op": "share", "sheet_id": self.sheet_id, "role": role, "url": url})
         return url
 
+    @instrumented("unshare")
     async def unshare(self) -> None:
         """Revoke the public "anyone with the link" access added by ``share()``."""
         self._require_sheet()
@@ -887,11 +1922,13 @@ class SheetManager:
                 .permissions()
                 .delete(fileId=self.sheet_id, permissionId="anyoneWithLink"),
                 op="unshare",
+                retry_policy=self._retry,
             )
             logger.info("Revoked public access: %s", self.sheet_id)
         except NotFoundError:
             pass  # already not shared — nothing to revoke
 
+    @instrumented("delete_sheet")
     async def delete_sheet(self) -> None:
         """Delete the entire spreadsheet via the Drive API (falls back to clearing rows)."""
         self._require_sheet()
@@ -902,8 +1939,10 @@ class SheetManager:
             await execute(
                 drive_service.files().delete(fileId=self.sheet_id, supportsAllDrives=True),
                 op="delete_sheet",
+                retry_policy=self._retry,
             )
             logger.info("Deleted spreadsheet: %s", self.sheet_id)
+            self._invalidate_reads()
             self.sheet_id = None
             return
         except Exception as drive_error:
@@ -918,6 +1957,8 @@ class SheetManager:
             .values()
             .clear(spreadsheetId=self.sheet_id, range=f"{self.schema.name}!A2:Z"),
             op="clear",
+            retry_policy=self._retry,
         )
+        self._invalidate_reads()
         logger.info("Cleared sheet contents: %s", self.sheet_id)
         self.sheet_id = None
@@ -0,0 +1,149 @@
+"""On-disk snapshots of tab contents, for fast cold-start reads.
+
+A ``SnapshotStore`` keeps the last-read cell grid of each (spreadsheet, tab) in a
+small SQLite file under the user cache dir, tagged with the spreadsheet's Drive
+``version``. A ``SheetManager`` given a store serves reads from disk instead of
+downloading the tab again — across processes (CLI runs, MCP server, API workers).
+By default every read first makes one cheap Drive metadata call, and the snapshot
+is used only while the version still matches, so reads are never stale.
+
+Opting in to a ``ttl`` skips that call for ``ttl`` seconds after a snapshot was
+saved or last confirmed current, serving it straight from disk. The price is
+staleness: an edit made elsewhere (the web UI, another process) stays invisible
+for up to ``ttl`` seconds. A write through any manager sharing the store ends the
+window for that spreadsheet, so a process still always reads its own writes.
+
+Snapshots hold the raw cells exactly as the sheet stores them, so fields flagged
+``encrypted=True`` stay sealed at rest on disk too; decoding happens on load.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, List, Optional, Set, Union
+
+from platformdirs import user_cache_dir
+
+DEFAULT_PATH = Path(user_cache_dir("gsab")) / "snapshots.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    sheet_id TEXT NOT NULL,
+    tab TEXT NOT NULL,
+    version TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    grid TEXT NOT NULL,
+    PRIMARY KEY (sheet_id, tab)
+)
+"""
+
+
+class SnapshotStore:
+    """A SQLite file of tab snapshots keyed by spreadsheet id + tab name.
+
+    The methods do blocking file I/O; `SheetManager` calls them on a worker thread.
+
+    Args:
+        path: the database file (default: ``snapshots.sqlite3`` in the gsab cache dir).
+        ttl: seconds a snapshot is served without checking the Drive version, counted
+            from when it was saved or last confirmed current. The default, 0, checks
+            on every read; a positive ``ttl`` lets reads miss edits made elsewhere
+            for up to that long.
+
+    Example:
+        db = SheetManager(SheetConnection(), schema, snapshot=SnapshotStore())
+        rows = await db.read()   # from disk when the sheet hasn't changed
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        *,
+        ttl: float = 0.0,
+    ):
+        self.path = Path(path) if path else DEFAULT_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Spreadsheets written to since their snapshots were last confirmed.
+        self._stale: Set[str] = set()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.path), timeout=10)
+
+    def fresh(self, sheet_id: str, tab: str) -> Optional[List[List[Any]]]:
+        """The stored grid for a tab if it's within ``ttl`` and nothing was written to
+        the spreadsheet since; else None (check the version, then call `get`)."""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            if sheet_id in self._stale:
+                return None
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT saved_at, grid FROM snapshots WHERE sheet_id = ? AND tab = ?",
+                (sheet_id, tab),
+            ).fetchone()
+        if row is None or time.time() - row[0] >= self.ttl:
+            return None
+        return json.loads(row[1])
+
+    def get(self, sheet_id: str, tab: str, version: str) -> Optional[List[List[Any]]]:
+        """The stored grid for a tab, or None if missing or tagged with another version.
+
+        A match confirms the snapshot current: its ``ttl`` starts over.
+        """
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT version, grid FROM snapshots WHERE sheet_id = ? AND tab = ?",
+                (sheet_id, tab),
+            ).fetchone()
+            if row is None or row[0] != version:
+                return None
+            conn.execute(
+                "UPDATE snapshots SET saved_at = ? WHERE sheet_id = ? AND tab = ?",
+                (time.time(), sheet_id, tab),
+            )
+        self._confirmed(sheet_id)
+        return json.loads(row[1])
+
+    def put(self, sheet_id: str, tab: str, version: str, grid: List[List[Any]]) -> None:
+        """Store (or replace) a tab's grid under ``version``."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)",
+                (sheet_id, tab, version, time.time(), json.dumps(grid)),
+            )
+        self._confirmed(sheet_id)
+
+    def invalidate(self, sheet_id: str) -> None:
+        """End the ``ttl`` of a spreadsheet's snapshots (after a write): until one is
+        confirmed again, its reads check the Drive version. No file I/O."""
+        with self._lock:
+            self._stale.add(sheet_id)
+
+    def _confirmed(self, sheet_id: str) -> None:
+        with self._lock:
+            self._stale.discard(sheet_id)
+
+    def drop(self, sheet_id: str, tab: Optional[str] = None) -> None:
+        """Forget one tab's snapshot, or every tab of a spreadsheet."""
+        with closing(self._connect()) as conn, conn:
+            if tab is None:
+                conn.execute("DELETE FROM snapshots WHERE sheet_id = ?", (sheet_id,))
+            else:
+                conn.execute(
+                    "DELETE FROM snapshots WHERE sheet_id = ? AND tab = ?", (sheet_id, tab)
+                )
+
+    def clear(self) -> None:
+        """Remove every snapshot."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM snapshots")
@@ -0,0 +1,280 @@
+"""Schema validation compiled once per schema.
+
+``Schema.validate()`` is on the path of every write, so for a ``bulk_insert`` of
+100k rows it runs 100k × fields times. ``CompiledValidator`` turns each field into
+one closure up front: the type check is picked by field type, ``pattern`` is
+compiled once, and ``min_length`` / ``max_length`` / ``pattern`` / ``min_value`` /
+``max_value`` are folded into plain predicates. A value that passes every check
+returns without building a message or a list; only a failing value takes the slow
+path that reproduces the exact per-rule messages ``Schema.validate`` has always
+returned.
+
+``validate_frame()`` checks a pandas DataFrame a column at a time, with vectorized
+checks for numeric, boolean and plain-string columns.
+
+The validator is built on first use (``Schema.validator``) and assumes the fields
+don't change afterwards.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .schema import Field, FieldType, Schema
+
+# A field check: None when the value is valid, else its error messages.
+Check = Callable[[Any], Optional[List[str]]]
+
+_NUMERIC = (FieldType.INTEGER, FieldType.FLOAT)
+
+
+def _type_check(schema: Schema, field: Field) -> Callable[[Any], Optional[str]]:
+    """The field-type check: None if ``value`` has an acceptable type, else the message."""
+    ft = field.field_type
+
+    def message(value: Any) -> str:
+        return f"Invalid value for type {ft}: {value}"
+
+    if ft in _NUMERIC:
+
+        def check(value):
+            cls = type(value)
+            if cls is int or cls is float:
+                return None
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return message(value)
+            return None
+
+    elif ft == FieldType.BOOLEAN:
+
+        def check(value):
+            return None if isinstance(value, bool) else message(value)
+
+    elif ft == FieldType.STRING:
+
+        def check(value):
+            return None if isinstance(value, str) else message(value)
+
+    elif ft == FieldType.DATE:
+        convert = schema._convert_value
+        fromisoformat = date.fromisoformat
+
+        def check(value):
+            # Canonical "YYYY-MM-DD" text parses ~10x faster than strptime; anything
+            # else ("2024-1-5", a date object, junk) takes the exact coercion path.
+            if type(value) is str and len(value) == 10 and value[4] == "-" == value[7]:
+                try:
+                    fromisoformat(value)
+                    return None
+                except ValueError:
+                    pass
+            try:
+                convert(value, ft)
+            except ValueError as e:
+                return str(e)
+            return None
+
+    else:
+        # DATETIME / JSON / ENCRYPTED — validate by coercion.
+        convert = schema._convert_value
+
+        def check(value):
+            try:
+                convert(value, ft)
+            except ValueError as e:
+                return str(e)
+            return None
+
+    return check
+
+
+def _builtin_rules(field: Field) -> List[Tuple[Callable[[Any], bool], str]]:
+    """The field's constraint rules as fast predicates, in ``Field``'s rule order."""
+    rules = []
+    if field.min_length is not None:
+        lo = field.min_length
+        rules.append(
+            (
+                lambda x: len(x if type(x) is str else str(x)) >= lo,
+                f"Value must be at least {lo} characters long",
+            )
+        )
+    if field.max_length is not None:
+        hi = field.max_length
+        rules.append(
+            (
+                lambda x: len(x if type(x) is str else str(x)) <= hi,
+                f"Value must be at most {hi} characters long",
+            )
+        )
+    if field.pattern is not None:
+        match = re.compile(field.pattern).match
+        rules.append(
+            (
+                lambda x: match(x if type(x) is str else str(x)) is not None,
+                f"Value must match pattern: {field.pattern}",
+            )
+        )
+    if field.min_value is not None:
+        lo_v = field.min_value
+        rules.append(
+            (lambda x: x >= lo_v, f"Value must be greater than or equal to {field.min_value}")
+        )
+    if field.max_value is not None:
+        hi_v = field.max_value
+        rules.append(
+            (lambda x: x <= hi_v, f"Value must be less than or equal to {field.max_value}")
+        )
+    return rules
+
+
+def compile_field(schema: Schema, field: Field) -> Check:
+    """Build the check for one field (see the module docstring)."""
+    missing = (
+        [f"Field {field.name} is required"] if field.required and field.default is None else None
+    )
+    type_error = _type_check(schema, field)
+    custom = [(r.condition, r.error_message) for r in field.custom_rules]
+    rules = custom + _builtin_rules(field)
+
+    def slow(value: Any) -> Optional[List[str]]:
+        errors = []
+        for condition, error_message in rules:
+            try:
+                if not condition(value):
+                    errors.append(error_message)
+            except Exception as e:
+                errors.append(f"Validation error: {str(e)}")
+        return errors or None
+
+    if not rules:
+
+        def check(value):
+            if value is None:
+                return missing
+            error = type_error(value)
+            return [error] if error else None
+
+        return check
+
+    conditions = [condition for condition, _ in rules]
+
+    def check(value):
+        if value is None:
+            return missing
+        error = type_error(value)
+        if error:
+            return [error]
+        try:
+            for condition in conditions:
+                if not condition(value):
+                    return slow(value)
+        except Exception:
+            return slow(value)
+        return None
+
+    return check
+
+
+class CompiledValidator:
+    """A schema's validation, compiled into one closure per field.
+
+    Returns the same messages, in the same order, as the per-value rules it replaces.
+    """
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self._checks: Dict[str, Check] = {f.name: compile_field(schema, f) for f in schema.fields}
+        self._items = list(self._checks.items())
+
+    def check(self, field_name: str, value: Any) -> List[str]:
+        """Errors for one value of ``field_name`` (empty if valid)."""
+        return list(self._checks[field_name](value) or ())
+
+    def validate(self, data: Dict[str, Any]) -> List[str]:
+        """Errors for one record (empty if valid)."""
+        get = data.get
+        errors = None
+        for name, check in self._items:
+            found = check(get(name))
+            if found:
+                errors = errors + found if errors else list(found)
+        return errors or []
+
+    def validate_frame(self, df) -> Dict[int, List[str]]:
+        """Validate every row of a pandas DataFrame, a column at a time.
+
+        Returns ``{row position: errors}`` for the rows that fail (empty if all are
+        valid). Numeric, boolean and all-``str`` columns are checked with vectorized
+        pandas operations; any other column (or a field with custom
+        ``validation_rules``) runs the field's compiled check over the column.
+        """
+        import numpy as np
+
+        n = len(df)
+        bad = np.zeros(n, dtype=bool)
+        for field in self.schema.fields:
+            check = self._checks[field.name]
+            if field.name not in df.columns:
+                if check(None):
+                    bad[:] = True
+                continue
+            column = df[field.name]
+            mask = _vector_mask(field, column)
+            if mask is None:
+                mask = np.fromiter(
+                    (check(v) is not None for v in column.tolist()), dtype=bool, count=n
+                )
+            bad |= mask
+        if not bad.any():
+            return {}
+        positions = np.flatnonzero(bad).tolist()
+        records = df.iloc[positions].to_dict("records")
+        return {pos: self.validate(record) for pos, record in zip(positions, records)}
+
+
+def _vector_mask(field: Field, column) -> Optional[Any]:
+    """A vectorized bad-row mask for ``column``, or None when it needs per-value checks."""
+    import numpy as np
+    from pandas.api.types import infer_dtype
+
+    if field.custom_rules:
+        return None
+    ft = field.field_type
+    kind = column.dtype.kind
+    lengths = field.min_length is not None or field.max_length is not None
+    bounds = field.min_value is not None or field.max_value is not None
+
+    if ft in _NUMERIC and kind in "iuf":
+        if lengths or field.pattern is not None:
+            return None
+        mask = np.zeros(len(column), dtype=bool)
+        if field.min_value is not None:
+            mask |= ~(column >= field.min_value).to_numpy()
+        if field.max_value is not None:
+            mask |= ~(column <= field.max_value).to_numpy()
+        return mask
+    if ft in _NUMERIC and kind == "b":
+        return np.ones(len(column), dtype=bool)  # a bool is not a number
+    if ft == FieldType.BOOLEAN and kind == "b" and not (lengths or bounds or field.pattern):
+        return np.zeros(len(column), dtype=bool)
+    if (
+        ft == FieldType.STRING
+        and not bounds
+        and infer_dtype(column, skipna=False) == "string"
+        and not column.isna().any()
+    ):
+        strings = column.astype(object).str
+        mask = np.zeros(len(column), dtype=bool)
+        if lengths:
+            size = strings.len().to_numpy()
+            if field.min_length is not None:
+                mask |= size < field.min_length
+            if field.max_length is not None:
+                mask |= size > field.max_length
+        if field.pattern is not None:
+            mask |= ~strings.match(field.pattern).to_numpy(dtype=bool)
+        return mask
+    return None
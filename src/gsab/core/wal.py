@@ -0,0 +1,172 @@
+"""A durable local write-ahead log, so inserts don't wait on (or fail with) Google.
+
+With ``SheetManager(..., wal=WriteAheadLog())``, ``insert()`` / ``bulk_insert()``
+validate and encode the records, commit the encoded rows to a small SQLite file,
+and return. The rows are durable at that point. A background flusher then appends
+them to the sheet in batches. Whatever piles up while a batch is in flight goes
+out in one append, so a burst of inserts costs a few API calls, not one each.
+While Google is rate-limiting or unreachable, the flusher keeps the rows and
+backs off, and ingest latency stays that of a local disk write.
+
+Delivery is at least once. A crash between an append and its acknowledgement
+replays the batch. With a `unique` / `primary_key` field, the replayed rows fail
+the uniqueness check and are set aside rather than duplicated. Rows that can
+never be written (a duplicate key, a deleted spreadsheet, a revoked permission)
+are set aside as *failed*, with the error, instead of blocking the rows behind
+them: see `failed()` and `requeue()`.
+
+The log holds rows exactly as they will be written, so ``encrypted`` fields are
+sealed on disk too.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from platformdirs import user_data_dir
+
+DEFAULT_PATH = Path(user_data_dir("gsab")) / "wal.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    sheet_id TEXT NOT NULL,
+    tab TEXT NOT NULL,
+    rows TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    created REAL NOT NULL,
+    error TEXT
+)
+"""
+_INDEX = "CREATE INDEX IF NOT EXISTS entries_tab ON entries (sheet_id, tab, seq)"
+
+
+class WriteAheadLog:
+    """A SQLite file of encoded rows waiting to be appended, per (spreadsheet, tab).
+
+    Args:
+        path: the database file (default: ``wal.sqlite3`` in the gsab data dir —
+            not the cache dir, which the OS may clear).
+        batch_rows: most rows sent in one append.
+        retry_delay: the flusher's first wait after a failed batch; doubles up to
+            ``max_retry_delay``.
+        max_retry_delay: the longest the flusher waits between attempts.
+
+    Example:
+        db = SheetManager(conn, schema, wal=WriteAheadLog())
+        await db.insert(event)   # returns once the row is on local disk
+        ...
+        await db.flush()         # at shutdown: write out whatever is pending
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        *,
+        batch_rows: int = 1000,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 60.0,
+    ):
+        self.path = Path(path) if path else DEFAULT_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_rows = batch_rows
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            # WAL journaling + FULL sync: a committed append survives a power cut.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.execute(_SCHEMA)
+            self._conn.execute(_INDEX)
+
+    def append(self, sheet_id: str, tab: str, rows: List[List[Any]]) -> int:
+        """Durably log ``rows`` (already encoded) for ``tab``. Returns the entry's id."""
+        payload = json.dumps(rows, separators=(",", ":"))
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO entries (sheet_id, tab, rows, n, created) VALUES (?, ?, ?, ?, ?)",
+                (sheet_id, tab, payload, len(rows), time.time()),
+            )
+            return cursor.lastrowid
+
+    def pending(self, sheet_id: str, tab: str) -> List[Tuple[int, List[List[Any]]]]:
+        """The oldest pending entries of ``tab`` as ``(id, rows)``, up to about
+        ``batch_rows`` rows (always at least one entry, however large)."""
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT seq, rows, n FROM entries WHERE sheet_id = ? AND tab = ? "
+                "AND error IS NULL ORDER BY seq LIMIT ?",
+                (sheet_id, tab, self.batch_rows),
+            ).fetchall()
+        batch, total = [], 0
+        for seq, payload, n in found:
+            if batch and total + n > self.batch_rows:
+                break
+            batch.append((seq, json.loads(payload)))
+            total += n
+        return batch
+
+    def ack(self, seqs: Sequence[int]) -> None:
+        """Drop entries that reached the sheet."""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM entries WHERE seq = ?", [(s,) for s in seqs])
+
+    def fail(self, seqs: Sequence[int], error: str) -> None:
+        """Set entries aside as failed (they stop being pending)."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE entries SET error = ? WHERE seq = ?", [(error, s) for s in seqs]
+            )
+
+    def failed(self, sheet_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Entries set aside as failed: ``{"id", "sheet_id", "tab", "rows", "error"}``."""
+        sql = "SELECT seq, sheet_id, tab, rows, error FROM entries WHERE error IS NOT NULL"
+        args: Tuple[Any, ...] = ()
+        if sheet_id is not None:
+            sql, args = sql + " AND sheet_id = ?", (sheet_id,)
+        with self._lock:
+            found = self._conn.execute(sql + " ORDER BY seq", args).fetchall()
+        return [
+            {"id": seq, "sheet_id": sid, "tab": tab, "rows": json.loads(rows), "error": error}
+            for seq, sid, tab, rows, error in found
+        ]
+
+    def requeue(self, seqs: Optional[Sequence[int]] = None) -> int:
+        """Make failed entries (all, or just ``seqs``) pending again, e.g. after fixing
+        a permission. They go out with the next flush. Returns how many."""
+        with self._lock, self._conn:
+            if seqs is None:
+                cursor = self._conn.execute(
+                    "UPDATE entries SET error = NULL WHERE error IS NOT NULL"
+                )
+                return cursor.rowcount
+            return sum(
+                self._conn.execute("UPDATE entries SET error = NULL WHERE seq = ?", (s,)).rowcount
+                for s in seqs
+            )
+
+    def count(self, sheet_id: Optional[str] = None, tab: Optional[str] = None) -> int:
+        """Rows pending (not failed), overall or for one spreadsheet / tab."""
+        sql, args = "SELECT COALESCE(SUM(n), 0) FROM entries WHERE error IS NULL", []
+        if sheet_id is not None:
+            sql += " AND sheet_id = ?"
+            args.append(sheet_id)
+        if tab is not None:
+            sql += " AND tab = ?"
+            args.append(tab)
+        with self._lock:
+            return self._conn.execute(sql, args).fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,156 @@
+"""Serialize the writers of a tab, in this process and (optionally) across processes.
+
+Google Sheets has no conditional writes, so two read-check-writes on the same tab
+can interleave: both upserts of a new key insert it, or an update lands on a row a
+concurrent delete has just shifted. `SheetManager` therefore runs its writes to a
+(spreadsheet, tab) one at a time:
+
+- **In-process.** Every manager in the process shares one ``asyncio.Lock`` per
+  tab. Waiters are woken first come, first served, so the lock doubles as an
+  ordered write queue. It is always on.
+- **Across processes.** Pass a lock backend as ``SheetManager(..., write_lock=...)``
+  to also hold a lock shared with other workers. `FileLock` covers workers on one
+  host. Anything with a ``lock(key)`` async context manager also works, e.g. a
+  Redis or database advisory lock for workers on several hosts.
+
+Reads never take either lock: they see the tab before or after each write.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncContextManager, AsyncIterator, Dict, Optional, Protocol, Tuple, Union
+
+from platformdirs import user_cache_dir
+
+from ..exceptions.custom_exceptions import LockTimeoutError
+
+DEFAULT_DIR = Path(user_cache_dir("gsab")) / "locks"
+
+
+class LockBackend(Protocol):
+    """A cross-process lock provider: ``async with backend.lock(key):`` holds ``key``."""
+
+    def lock(self, key: str) -> AsyncContextManager[Any]: ...
+
+
+# One lock per (spreadsheet, tab), per event loop (an asyncio.Lock is loop-bound).
+_locks: "weakref.WeakKeyDictionary[Any, Dict[Tuple[str, str], asyncio.Lock]]"
+_locks = weakref.WeakKeyDictionary()
+
+
+def tab_lock(sheet_id: str, tab: str) -> asyncio.Lock:
+    """The in-process write lock of ``tab`` (for the running event loop)."""
+    locks = _locks.setdefault(asyncio.get_running_loop(), {})
+    lock = locks.get((sheet_id, tab))
+    if lock is None:
+        lock = locks[(sheet_id, tab)] = asyncio.Lock()
+    return lock
+
+
+@asynccontextmanager
+async def writing(
+    sheet_id: str, tab: str, backend: Optional[LockBackend] = None
+) -> AsyncIterator[None]:
+    """Hold the write lock of ``tab``: the in-process one, then ``backend``'s, if any.
+
+    Taking the in-process lock first means only one coroutine per process ever
+    waits on the shared backend.
+    """
+    async with tab_lock(sheet_id, tab):
+        if backend is None:
+            yield
+        else:
+            async with backend.lock(f"{sheet_id}/{tab}"):
+                yield
+
+
+def _try_lock(fd: int) -> bool:
+    """Take an exclusive, non-blocking OS lock on ``fd``; False if someone else has it."""
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        import msvcrt
+
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _unlock(fd: int) -> None:
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        import msvcrt
+
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        return
+    fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class FileLock:
+    """A `LockBackend` for workers on one host: an OS file lock per tab.
+
+    The operating system releases the lock if a worker dies holding it, so a
+    crash never wedges the other writers.
+
+    Args:
+        directory: where the lock files live (default: ``locks/`` in the gsab
+            cache dir). Every worker must use the same directory.
+        timeout: seconds to wait for the lock before raising `LockTimeoutError`.
+        poll: seconds between attempts while another process holds it.
+
+    Example:
+        db = SheetManager(conn, schema, write_lock=FileLock())
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        *,
+        timeout: float = 60.0,
+        poll: float = 0.05,
+    ):
+        self.directory = Path(directory) if directory else DEFAULT_DIR
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self.poll = poll
+
+    def path(self, key: str) -> Path:
+        """The lock file for ``key``."""
+        return self.directory / (hashlib.sha256(key.encode()).hexdigest()[:32] + ".lock")
+
+    @asynccontextmanager
+    async def lock(self, key: str) -> AsyncIterator[None]:
+        fd = os.open(self.path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            deadline = time.monotonic() + self.timeout
+            while not _try_lock(fd):
+                if time.monotonic() >= deadline:
+                    raise LockTimeoutError(
+                        f"Timed out after {self.timeout:g}s waiting for the write lock "
+                        f"{self.path(key)} (tab {key}), held by another process. "
+                        "Retry once that writer is done, or raise FileLock(timeout=...). "
+                        "If no gsab process is running, the holder is stuck: stop it."
+                    )
+                await asyncio.sleep(self.poll)
+            try:
+                yield
+            finally:
+                _unlock(fd)
+        finally:
+            os.close(fd)
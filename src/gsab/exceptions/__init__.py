@@ -3,11 +3,14 @@
 from .custom_exceptions import (
     APIError,
     AuthError,
+    CircuitOpenError,
+    ConflictError,
     ConnectionError,
     DuplicateKeyError,
     EncryptionError,
     GSABError,
     GSheetsDBException,
+    LockTimeoutError,
     NotFoundError,
     PermissionDeniedError,
     PolicyError,
@@ -20,11 +23,14 @@ __all__ = [
     "GSABError",
     "AuthError",
     "ConnectionError",
+    "CircuitOpenError",
     "NotFoundError",
     "PermissionDeniedError",
     "QuotaExceededError",
     "ValidationError",
     "DuplicateKeyError",
+    "ConflictError",
+    "LockTimeoutError",
     "EncryptionError",
     "APIError",
     "PolicyError",
@@ -22,6 +22,14 @@ class ConnectionError(GSABError):
     """Could not reach or build the Google Sheets API service."""
 
 
+class CircuitOpenError(ConnectionError):
+    """Google has been failing repeatedly, so the call was not sent (fail fast).
+
+    Raised while a retry policy's circuit breaker is open after a run of 5xx
+    responses or network failures. Wait for the reset timeout, then retry.
+    """
+
+
 class NotFoundError(GSABError):
     """The spreadsheet, tab or row does not exist."""
 
@@ -51,6 +59,24 @@ class DuplicateKeyError(GSABError):
     """
 
 
+class ConflictError(GSABError):
+    """A row changed between being read and being written (optimistic concurrency).
+
+    Raised by `update`/`upsert`/`delete` on a schema with a `version` field when
+    another writer keeps changing, moving or deleting the target rows, and the
+    operation has already been redone ``conflict_retries`` times. Retry later, or
+    serialize the writers.
+    """
+
+
+class LockTimeoutError(GSABError, TimeoutError):
+    """A cross-process write lock (e.g. `FileLock`) stayed held past its timeout.
+
+    Another worker is still writing the tab; nothing was read or written. Retry
+    later, or give the lock a longer ``timeout``. Also a ``TimeoutError``.
+    """
+
+
 class EncryptionError(GSABError):
     """An encryption or decryption operation failed."""
 
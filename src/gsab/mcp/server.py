@@ -25,14 +25,26 @@ _managers: Dict[str, SheetManager] = {}
 # The active AccessPolicy (set by build_server); guards every tool. Default = permissive.
 _policy = AccessPolicy()
 
+# One connection for every sheet: its Sheets client (pooled per credential) is
+# built once, so attaching another sheet costs only its header read.
+_connection: Optional[SheetConnection] = None
+
+
+def _conn() -> SheetConnection:
+    global _connection
+    if _connection is None:
+        _connection = SheetConnection()
+    return _connection
+
 
 async def _attach(sheet_id: str) -> SheetManager:
     """Bind a SheetManager to an existing sheet, inferring text columns from its header."""
     if sheet_id in _managers:
         return _managers[sheet_id]
     _policy.ensure_sheet_allowed(sheet_id)  # gate attaching to an external sheet
-    conn = SheetConnection()
-    await conn.connect()
+    conn = _conn()
+    if not conn.is_connected():
+        await conn.connect()
     meta = await execute(conn.service.spreadsheets().get(spreadsheetId=sheet_id), op="mcp_attach")
     tab = meta["sheets"][0]["properties"]["title"]
     res = await execute(
@@ -72,7 +84,7 @@ async def create_sheet(
         else Field(c, FieldType.STRING, required=False)
         for c in columns
     ]
-    db = SheetManager(SheetConnection(), Schema("data", fields), policy=_policy)
+    db = SheetManager(_conn(), Schema("data", fields), policy=_policy)
     sheet_id = await db.create_sheet(title)
     _managers[sheet_id] = db
     return {"sheet_id": sheet_id, "url": _url(sheet_id)}
@@ -0,0 +1,1019 @@
+"""An in-memory Google Sheets backend for tests, demos and load simulation.
+
+``FakeSheetsService`` stands in for the client ``googleapiclient`` builds, so any
+``SheetManager`` runs against it unchanged — no network, no credentials::
+
+    from gsab import SheetConnection, SheetManager
+    from gsab.testing import FakeSheetsService
+
+    fake = FakeSheetsService()
+    db = SheetManager(SheetConnection(service=fake), schema)
+    await db.create_sheet("Test DB")
+    await db.insert({"id": 1, "name": "Ada"})
+    await db.query("SELECT A, B WHERE A > 0")   # gviz, evaluated in memory
+
+It implements ``values().get / batchGet / append / update / batchUpdate / clear``,
+``spreadsheets().get / create / batchUpdate`` (``updateCells``, ``appendCells``,
+``deleteDimension``, ``addChart``, ``addSheet``, ``updateSheetProperties``,
+``updateSpreadsheetProperties``) and the gviz query endpoint (``SELECT`` with
+``WHERE``, ``GROUP BY`` + ``count/sum/avg/min/max``, ``ORDER BY``, ``LIMIT``,
+``OFFSET``). Cells keep the types they were written with, so ``RAW`` numbers stay
+numbers and gviz sees them as such — like the real thing.
+
+For load and failure testing: ``latency`` delays every request, ``quota_per_minute``
+answers requests over the limit with a 429, and ``fail()`` queues injected errors.
+``calls`` counts requests per method. Drive (sharing, versions) is not simulated.
+"""
+
+from __future__ import annotations
+
+import copy
+import itertools
+import json
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+from googleapiclient.errors import HttpError
+
+__all__ = ["FakeSheetsService"]
+
+Grid = List[List[Any]]
+
+_A1 = re.compile(
+    r"^(?:'(?P<quoted>(?:[^']|'')+)'|(?P<tab>[^!]+))"
+    r"(?:!(?P<c0>[A-Z]+)?(?P<r0>\d+)?(?::(?P<c1>[A-Z]+)?(?P<r1>\d+)?)?)?$"
+)
+
+
+def _col_index(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+
+def _col_letters(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _formatted(value: Any) -> str:
+    """A cell as ``values().get`` returns it by default (``FORMATTED_VALUE``)."""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return "" if value is None else str(value)
+
+
+def _user_entered(value: Any) -> Any:
+    """Parse a ``USER_ENTERED`` value the way the Sheets UI would (sans formulas)."""
+    if not isinstance(value, str):
+        return value
+    upper = value.strip().upper()
+    if upper in ("TRUE", "FALSE"):
+        return upper == "TRUE"
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() and "." not in value else number
+
+
+class _Error(Exception):
+    """An API-level failure, raised to the caller as an ``HttpError``."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class _Resp:
+    def __init__(self, status: int):
+        self.status = status
+        self.reason = {400: "Bad Request", 404: "Not Found", 429: "Too Many Requests"}.get(
+            status, "Error"
+        )
+
+
+def _http_error(status: int, message: str) -> HttpError:
+    content = json.dumps({"error": {"code": status, "message": message}}).encode("utf-8")
+    return HttpError(_Resp(status), content)
+
+
+class _Request:
+    def __init__(self, service: "FakeSheetsService", method: str, fn: Callable[[], Any]):
+        self._service, self.method, self._fn = service, method, fn
+
+    def execute(self, num_retries: int = 0):
+        return self._service._call(self.method, self._fn)
+
+
+class _Values:
+    def __init__(self, service: "FakeSheetsService"):
+        self._s = service
+
+    def get(self, *, spreadsheetId, range, valueRenderOption="FORMATTED_VALUE", **_):
+        return _Request(
+            self._s, "values.get", lambda: self._s._get(spreadsheetId, range, valueRenderOption)
+        )
+
+    def batchGet(self, *, spreadsheetId, ranges, valueRenderOption="FORMATTED_VALUE", **_):
+        if isinstance(ranges, str):
+            ranges = [ranges]
+        return _Request(
+            self._s,
+            "values.batchGet",
+            lambda: {
+                "spreadsheetId": spreadsheetId,
+                "valueRanges": [self._s._get(spreadsheetId, r, valueRenderOption) for r in ranges],
+            },
+        )
+
+    def append(self, *, spreadsheetId, range, valueInputOption, body, **_):
+        return _Request(
+            self._s,
+            "values.append",
+            lambda: self._s._append(spreadsheetId, range, valueInputOption, body["values"]),
+        )
+
+    def update(self, *, spreadsheetId, range, valueInputOption, body, **_):
+        return _Request(
+            self._s,
+            "values.update",
+            lambda: self._s._update(spreadsheetId, range, valueInputOption, body["values"]),
+        )
+
+    def batchUpdate(self, *, spreadsheetId, body):
+        def run():
+            option = body["valueInputOption"]
+            with self._s._atomic(spreadsheetId):
+                results = [
+                    self._s._update(spreadsheetId, d["range"], option, d["values"])
+                    for d in body.get("data", [])
+                ]
+            return {
+                "spreadsheetId": spreadsheetId,
+                "totalUpdatedRows": sum(r["updatedRows"] for r in results),
+                "totalUpdatedCells": sum(r["updatedCells"] for r in results),
+                "responses": results,
+            }
+
+        return _Request(self._s, "values.batchUpdate", run)
+
+    def clear(self, *, spreadsheetId, range, body=None):
+        return _Request(self._s, "values.clear", lambda: self._s._clear(spreadsheetId, range))
+
+
+class _Spreadsheets:
+    def __init__(self, service: "FakeSheetsService"):
+        self._s = service
+
+    def values(self) -> _Values:
+        return _Values(self._s)
+
+    def get(self, *, spreadsheetId, **_):
+        return _Request(self._s, "get", lambda: self._s._metadata(spreadsheetId))
+
+    def create(self, *, body, **_):
+        return _Request(self._s, "create", lambda: self._s._create(body))
+
+    def batchUpdate(self, *, spreadsheetId, body):
+        return _Request(
+            self._s, "batchUpdate", lambda: self._s._batch_update(spreadsheetId, body["requests"])
+        )
+
+
+class _Spreadsheet:
+    def __init__(self, title: str):
+        self.title = title
+        self.tabs: Dict[str, Grid] = {}
+        self.tab_ids: Dict[str, int] = {}
+        self.charts: List[Dict[str, Any]] = []
+        self._next_tab_id = itertools.count()
+
+    def add_tab(self, title: str, rows: Optional[Grid] = None) -> int:
+        if title in self.tabs:
+            raise _Error(400, f'A sheet with the name "{title}" already exists.')
+        self.tabs[title] = [list(r) for r in rows or []]
+        self.tab_ids[title] = next(self._next_tab_id)
+        return self.tab_ids[title]
+
+    def tab_by_id(self, sheet_id: int) -> str:
+        for title, tid in self.tab_ids.items():
+            if tid == sheet_id:
+                return title
+        raise _Error(400, f"No grid with id: {sheet_id}")
+
+
+class FakeGvizResponse:
+    """The bits of a ``requests.Response`` that ``run_gviz_query`` reads."""
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.reason = _Resp(status_code).reason if status_code >= 400 else "OK"
+
+
+class _GvizSession:
+    def __init__(self, service: "FakeSheetsService"):
+        self._s = service
+
+    def get(self, url: str, timeout: Optional[float] = None, **_) -> FakeGvizResponse:
+        parsed = urlparse(url)
+        match = re.search(r"/spreadsheets/d/([^/]+)/gviz/tq", parsed.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        try:
+            text = self._s._call(
+                "gviz",
+                lambda: self._s._gviz(
+                    match.group(1) if match else "", params.get("tq", ""), params.get("sheet")
+                ),
+                http=True,
+            )
+        except _Error as e:
+            return FakeGvizResponse(e.status, e.message)
+        return FakeGvizResponse(200, text)
+
+
+class FakeSheetsService:
+    """An in-memory Sheets v4 service — pass it as ``SheetConnection(service=...)``.
+
+    Args:
+        latency: seconds every request takes (blocking, like the real client).
+        quota_per_minute: answer requests past this many in a rolling minute with a
+            429, as Google's per-user quota does. ``None`` = unlimited.
+
+    Attributes:
+        calls: a ``Counter`` of requests per method (``"values.get"``, ``"batchUpdate"``,
+            ``"gviz"``, …), failed ones included.
+        rate_limited: how many requests were answered with a 429.
+    """
+
+    def __init__(self, *, latency: float = 0.0, quota_per_minute: Optional[int] = None):
+        self.latency = latency
+        self.quota_per_minute = quota_per_minute
+        self.calls: Counter = Counter()
+        self.rate_limited = 0
+        self._books: Dict[str, _Spreadsheet] = {}
+        self._failures: deque = deque()
+        self._window: deque = deque()
+        self._ids = itertools.count(1)
+        self._chart_ids = itertools.count(1000)
+        self._lock = threading.RLock()
+
+    # --- the googleapiclient surface ------------------------------------------
+
+    def spreadsheets(self) -> _Spreadsheets:
+        return _Spreadsheets(self)
+
+    def http_session(self) -> _GvizSession:
+        """An HTTP session for the gviz endpoint, answered from memory."""
+        return _GvizSession(self)
+
+    # --- seeding, inspection and fault injection ------------------------------
+
+    def add_spreadsheet(
+        self, tabs: Dict[str, Grid], *, title: str = "Fake", spreadsheet_id: Optional[str] = None
+    ) -> str:
+        """Create a spreadsheet holding ``tabs`` (``{name: rows}``, header row first).
+
+        Cells keep their Python types: ``1`` is a number, ``"1"`` is text.
+        Returns the spreadsheet id.
+        """
+        with self._lock:
+            sid = spreadsheet_id or f"fake-{next(self._ids)}"
+            book = _Spreadsheet(title)
+            for name, rows in tabs.items():
+                book.add_tab(name, rows)
+            self._books[sid] = book
+            return sid
+
+    def grid(self, spreadsheet_id: str, tab: str) -> Grid:
+        """The live cell grid of one tab (mutate it to simulate edits by others)."""
+        return self._book(spreadsheet_id).tabs[tab]
+
+    def charts(self, spreadsheet_id: str) -> List[Dict[str, Any]]:
+        """Charts added to a spreadsheet (their ``addChart`` specs)."""
+        return self._book(spreadsheet_id).charts
+
+    def fail(
+        self,
+        error: Union[int, BaseException] = 429,
+        *,
+        times: int = 1,
+        method: Optional[str] = None,
+    ) -> None:
+        """Make the next ``times`` requests (to ``method``, if given) fail.
+
+        ``error`` is an HTTP status — answered as Google would (an ``HttpError``, or
+        a gviz response with that status) — or an exception to raise instead, e.g.
+        ``ConnectionResetError()`` to simulate a dropped connection.
+        """
+        with self._lock:
+            for _ in range(times):
+                self._failures.append((error, method))
+
+    # --- request plumbing ------------------------------------------------------
+
+    def _call(self, method: str, fn: Callable[[], Any], *, http: bool = False) -> Any:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls[method] += 1
+            injected = self._take_failure(method)
+            if injected is None:
+                injected = self._over_quota()
+        try:
+            if isinstance(injected, BaseException):
+                raise injected
+            if injected == "quota":
+                raise _Error(
+                    429,
+                    "Quota exceeded for quota metric 'Requests' and limit "
+                    f"'Requests per minute per user' ({self.quota_per_minute}).",
+                )
+            if injected is not None:
+                raise _Error(injected, f"Injected failure ({injected}).")
+            with self._lock:
+                return fn()
+        except _Error as e:
+            if e.status == 429:
+                self.rate_limited += 1
+            if http:
+                raise
+            raise _http_error(e.status, e.message) from None
+
+    def _take_failure(self, method: str) -> Any:
+        for i, (error, only) in enumerate(self._failures):
+            if only is None or only == method:
+                del self._failures[i]
+                return error
+        return None
+
+    def _over_quota(self) -> Optional[str]:
+        if self.quota_per_minute is None:
+            return None
+        now = time.monotonic()
+        while self._window and now - self._window[0] >= 60:
+            self._window.popleft()
+        if len(self._window) >= self.quota_per_minute:
+            return "quota"
+        self._window.append(now)
+        return None
+
+    def _book(self, spreadsheet_id: str) -> _Spreadsheet:
+        try:
+            return self._books[spreadsheet_id]
+        except KeyError:
+            raise _Error(404, "Requested entity was not found.") from None
+
+    def _atomic(self, spreadsheet_id: str):
+        """Apply a batch all-or-nothing: restore the tabs if any request fails."""
+        service = self
+
+        class _Txn:
+            def __enter__(self):
+                book = service._book(spreadsheet_id)
+                self.saved = (
+                    {t: [row[:] for row in g] for t, g in book.tabs.items()},
+                    dict(book.tab_ids),
+                    list(book.charts),
+                    book.title,
+                )
+                return book
+
+            def __exit__(self, exc_type, exc, tb):
+                if exc_type is not None:
+                    book = service._books[spreadsheet_id]
+                    book.tabs, book.tab_ids, book.charts, book.title = self.saved
+                return False
+
+        return _Txn()
+
+    def _resolve(
+        self, spreadsheet_id: str, a1: str
+    ) -> Tuple[Grid, int, Optional[int], int, Optional[int]]:
+        """``(grid, row0, row1, col0, col1)`` for an A1 range; ends are exclusive, None = open."""
+        match = _A1.match(a1)
+        book = self._book(spreadsheet_id)
+        tab = match and (match["quoted"].replace("''", "'") if match["quoted"] else match["tab"])
+        if not match or tab not in book.tabs:
+            raise _Error(400, f"Unable to parse range: {a1}")
+        r0 = int(match["r0"]) - 1 if match["r0"] else 0
+        c0 = _col_index(match["c0"]) if match["c0"] else 0
+        if match["c1"] or match["r1"]:  # a span, e.g. "A:Z", "A2:Z10", "A2:Z"
+            r1 = int(match["r1"]) if match["r1"] else None
+            c1 = _col_index(match["c1"]) + 1 if match["c1"] else None
+        elif match["c0"] or match["r0"]:  # a single cell, e.g. "B3"
+            r1, c1 = r0 + 1, c0 + 1
+        else:  # the whole tab
+            r1 = c1 = None
+        return book.tabs[tab], r0, r1, c0, c1
+
+    # --- values ---------------------------------------------------------------
+
+    def _get(self, spreadsheet_id: str, a1: str, render: str) -> Dict[str, Any]:
+        grid, r0, r1, c0, c1 = self._resolve(spreadsheet_id, a1)
+        fmt = _formatted if render == "FORMATTED_VALUE" else (lambda v: v)
+        rows = []
+        for row in grid[r0:r1]:
+            cells = row[c0:c1]
+            while cells and cells[-1] in (None, ""):
+                cells.pop()  # Google trims trailing empty cells…
+            rows.append([fmt(c) for c in cells])
+        while rows and not rows[-1]:
+            rows.pop()  # …and trailing empty rows
+        result: Dict[str, Any] = {"range": a1, "majorDimension": "ROWS"}
+        if rows:
+            result["values"] = rows
+        return result
+
+    @staticmethod
+    def _input(values: Grid, option: str) -> Grid:
+        if option not in ("RAW", "USER_ENTERED"):
+            raise _Error(400, f"Invalid valueInputOption: {option}")
+        convert = _user_entered if option == "USER_ENTERED" else (lambda v: v)
+        return [["" if v is None else convert(v) for v in row] for row in values]
+
+    @staticmethod
+    def _last_row(grid: Grid) -> int:
+        end = len(grid)
+        while end and all(c in (None, "") for c in grid[end - 1]):
+            end -= 1
+        return end
+
+    def _write(self, grid: Grid, r0: int, c0: int, rows: Grid) -> None:
+        for offset, values in enumerate(rows):
+            while len(grid) <= r0 + offset:
+                grid.append([])
+            target = grid[r0 + offset]
+            if len(target) < c0 + len(values):
+                target.extend([""] * (c0 + len(values) - len(target)))
+            target[c0 : c0 + len(values)] = values
+
+    def _append(self, spreadsheet_id: str, a1: str, option: str, values: Grid) -> Dict[str, Any]:
+        grid, _, _, c0, _ = self._resolve(spreadsheet_id, a1)
+        rows = self._input(values, option)
+        start = self._last_row(grid)
+        del grid[start:]
+        self._write(grid, start, c0, rows)
+        last = _col_letters(c0 + max(map(len, rows), default=1) - 1)
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "updates": {
+                "updatedRange": f"{a1.split('!')[0]}!A{start + 1}:{last}{start + len(rows)}",
+                "updatedRows": len(rows),
+                "updatedCells": sum(len(r) for r in rows),
+            },
+        }
+
+    def _update(self, spreadsheet_id: str, a1: str, option: str, values: Grid) -> Dict[str, Any]:
+        grid, r0, _, c0, _ = self._resolve(spreadsheet_id, a1)
+        rows = self._input(values, option)
+        self._write(grid, r0, c0, rows)
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "updatedRange": a1,
+            "updatedRows": len(rows),
+            "updatedCells": sum(len(r) for r in rows),
+        }
+
+    def _clear(self, spreadsheet_id: str, a1: str) -> Dict[str, Any]:
+        grid, r0, r1, c0, c1 = self._resolve(spreadsheet_id, a1)
+        for row in grid[r0:r1]:
+            for i in range(c0, len(row) if c1 is None else min(c1, len(row))):
+                row[i] = ""
+        return {"spreadsheetId": spreadsheet_id, "clearedRange": a1}
+
+    # --- spreadsheets -----------------------------------------------------------
+
+    def _metadata(self, spreadsheet_id: str) -> Dict[str, Any]:
+        book = self._book(spreadsheet_id)
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "properties": {"title": book.title},
+            "sheets": [
+                {
+                    "properties": {
+                        "sheetId": book.tab_ids[title],
+                        "title": title,
+                        "index": index,
+                        "gridProperties": {
+                            "rowCount": max(len(grid), 1000),
+                            "columnCount": max((len(r) for r in grid), default=26) or 26,
+                        },
+                    }
+                }
+                for index, (title, grid) in enumerate(book.tabs.items())
+            ],
+            "spreadsheetUrl": f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit",
+        }
+
+    def _create(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        sid = f"fake-{next(self._ids)}"
+        book = _Spreadsheet(body.get("properties", {}).get("title", "Untitled spreadsheet"))
+        for sheet in body.get("sheets") or [{"properties": {"title": "Sheet1"}}]:
+            rows = [
+                [
+                    next(iter((c.get("userEnteredValue") or {"stringValue": ""}).values()))
+                    for c in r.get("values", [])
+                ]
+                for data in sheet.get("data", [])
+                for r in _row_data(data)
+            ]
+            book.add_tab(sheet["properties"]["title"], rows)
+        self._books[sid] = book
+        return self._metadata(sid)
+
+    def _batch_update(self, spreadsheet_id: str, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        replies = []
+        with self._atomic(spreadsheet_id) as book:
+            for i, request in enumerate(requests):
+                if len(request) != 1:
+                    raise _Error(400, f"Invalid requests[{i}]: expected exactly one kind.")
+                ((kind, spec),) = request.items()
+                handler = getattr(self, f"_req_{kind}", None)
+                if handler is None:
+                    raise _Error(
+                        400,
+                        f"Invalid requests[{i}]: '{kind}' is not supported by FakeSheetsService.",
+                    )
+                replies.append(handler(book, spec))
+        return {"spreadsheetId": spreadsheet_id, "replies": replies}
+
+    def _req_updateCells(self, book: _Spreadsheet, spec: Dict[str, Any]) -> Dict[str, Any]:
+        if "range" in spec:
+            rng = spec["range"]
+            grid = book.tabs[book.tab_by_id(rng.get("sheetId", 0))]
+            r0, c0 = rng.get("startRowIndex", 0), rng.get("startColumnIndex", 0)
+        else:
+            start = spec["start"]
+            grid = book.tabs[book.tab_by_id(start.get("sheetId", 0))]
+            r0, c0 = start.get("rowIndex", 0), start.get("columnIndex", 0)
+        self._write(grid, r0, c0, _cells(spec.get("rows", [])))
+        return {}
+
+    def _req_appendCells(self, book: _Spreadsheet, spec: Dict[str, Any]) -> Dict[str, Any]:
+        grid = book.tabs[book.tab_by_id(spec["sheetId"])]
+        start = self._last_row(grid)
+        del grid[start:]
+        self._write(grid, start, 0, _cells(spec.get("rows", [])))
+        return {}
+
+    def _req_deleteDimension(self, book: _Spreadsheet, spec: Dict[str, Any]) -> Dict[str, Any]:
+        rng = spec["range"]
+        grid = book.tabs[book.tab_by_id(rng["sheetId"])]
+        start, end = rng["startIndex"], rng.get("endIndex")
+        if rng["dimension"] == "ROWS":
+            del grid[start:end]
+        else:
+            for row in grid:
+                del row[start:end]
+        return {}
+
+    def _req_addChart(self, book: _Spreadsheet, spec: Dict[str, Any]) -> Dict[str, Any]:
+        chart = copy.deepcopy(spec["chart"])
+        chart["chartId"] = next(self._chart_ids)
+        book.charts.append(chart)
+        return {"addChart": {"chart": chart}}
+
+    def _req_addSheet(self, book: _Spreadsheet, spec: Dict[str, Any]) -> Dict[str, Any]:
+        title = spec.get("properties", {}).get("title") or f"Sheet{len(book.tabs) + 1}"
+        sheet_id = book.add_tab(title)
+        return {"addSheet": {"properties": {"sheetId": sheet_id, "title": title}}}
+
+    def _req_updateSheetProperties(
+        self, book: _Spreadsheet, spec: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        props = spec["properties"]
+        old = book.tab_by_id(props.get("sheetId", 0))
+        new = props.get("title", old)
+        book.tabs = {(new if t == old else t): g for t, g in book.tabs.items()}
+        book.tab_ids = {(new if t == old else t): i for t, i in book.tab_ids.items()}
+        return {}
+
+    def _req_updateSpreadsheetProperties(
+        self, book: _Spreadsheet, spec: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        book.title = spec["properties"].get("title", book.title)
+        return {}
+
+    # --- gviz ------------------------------------------------------------------
+
+    def _gviz(self, spreadsheet_id: str, tq: str, sheet: Optional[str]) -> str:
+        book = self._book(spreadsheet_id)
+        tab = sheet or next(iter(book.tabs), None)
+        if tab not in book.tabs:
+            raise _Error(400, f"Invalid sheet: {tab}")
+        try:
+            cols, rows = _GvizQuery(tq, book.tabs[tab]).run()
+        except _GvizError as e:
+            payload: Dict[str, Any] = {
+                "version": "0.6",
+                "status": "error",
+                "errors": [
+                    {
+                        "reason": "invalid_query",
+                        "message": "INVALID_QUERY",
+                        "detailed_message": str(e),
+                    }
+                ],
+            }
+        else:
+            payload = {
+                "version": "0.6",
+                "status": "ok",
+                "table": {
+                    "cols": cols,
+                    "rows": [{"c": [None if v is None else {"v": v} for v in r]} for r in rows],
+                    "parsedNumHeaders": 1,
+                },
+            }
+        return f"/*O_o*/\ngoogle.visualization.Query.setResponse({json.dumps(payload)});"
+
+
+def _row_data(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    row_data = data.get("rowData", [])
+    return row_data if isinstance(row_data, list) else [row_data]
+
+
+def _cells(rows: List[Dict[str, Any]]) -> Grid:
+    """``RowData`` → typed cells (``userEnteredValue`` keeps its kind)."""
+    out = []
+    for row in rows:
+        cells = []
+        for cell in row.get("values", []):
+            value = cell.get("userEnteredValue")
+            cells.append(next(iter(value.values())) if value else "")
+        out.append(cells)
+    return out
+
+
+# --- a small gviz query engine ---------------------------------------------------
+
+
+class _GvizError(ValueError):
+    pass
+
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<num>\d+(?:\.\d+)?|\.\d+)|(?P<str>'[^']*'|\"[^\"]*\")"
+    r"|(?P<op><=|>=|!=|<>|=|<|>|\(|\)|,|\*|-)|(?P<word>[A-Za-z_][A-Za-z0-9_]*))"
+)
+_AGGREGATES = ("count", "sum", "avg", "min", "max")
+_CLAUSES = (
+    "select",
+    "where",
+    "group",
+    "pivot",
+    "order",
+    "limit",
+    "offset",
+    "label",
+    "format",
+    "options",
+)
+
+
+def _tokenize(text: str) -> List[Tuple[str, Any]]:
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise _GvizError(f'Encountered "{text[pos : pos + 10]}" at column {pos + 1}.')
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "num":
+            tokens.append(("num", float(value)))
+        elif kind == "str":
+            tokens.append(("str", value[1:-1]))
+        elif kind == "word":
+            tokens.append(("word", value))
+        else:
+            tokens.append(("op", value))
+    return tokens
+
+
+def _cell_type(value: Any) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    return "string"
+
+
+class _GvizQuery:
+    """Parse and run one gviz query over a tab (header row first)."""
+
+    def __init__(self, tq: str, grid: Grid):
+        self.tokens = _tokenize(tq)
+        self.pos = 0
+        header = grid[0] if grid else []
+        width = max((len(r) for r in grid), default=0)
+        self.labels = [_formatted(header[i]) if i < len(header) else "" for i in range(width)]
+        self.types: List[str] = []
+        data = [
+            list(r) + [""] * (width - len(r))
+            for r in grid[1:]
+            if any(c not in (None, "") for c in r)
+        ]
+        for col in range(width):
+            seen = Counter(t for t in (_cell_type(r[col]) for r in data) if t)
+            kind = max(seen, key=lambda k: (seen[k], k == "string")) if seen else "string"
+            self.types.append(kind)
+            for row in data:  # a minority-typed cell reads as null, as in gviz
+                if _cell_type(row[col]) != kind:
+                    row[col] = None
+                elif kind == "number":
+                    row[col] = float(row[col])
+        self.rows = data
+
+    # token helpers
+    def _peek(self, offset: int = 0) -> Tuple[str, Any]:
+        i = self.pos + offset
+        return self.tokens[i] if i < len(self.tokens) else ("eof", None)
+
+    def _keyword(self, *words: str) -> bool:
+        for offset, word in enumerate(words):
+            kind, value = self._peek(offset)
+            if kind != "word" or value.lower() != word:
+                return False
+        self.pos += len(words)
+        return True
+
+    def _expect(self, kind: str, value: Any = None) -> Any:
+        tok = self._peek()
+        if tok[0] != kind or (value is not None and tok[1] != value):
+            raise _GvizError(f'Encountered "{tok[1]}" where {value or kind} was expected.')
+        self.pos += 1
+        return tok[1]
+
+    def _by(self) -> None:
+        if not self._keyword("by"):
+            raise _GvizError(f'Encountered "{self._peek()[1]}" where "by" was expected.')
+
+    def _column(self) -> int:
+        kind, value = self._peek()
+        if kind != "word" or not re.fullmatch(r"[A-Z]{1,3}", value):
+            raise _GvizError(f'Encountered "{value}" where a column id (A, B, …) was expected.')
+        self.pos += 1
+        index = _col_index(value)
+        if index >= len(self.labels):
+            raise _GvizError(f"Column [{value}] does not exist in table.")
+        return index
+
+    def _expr(self) -> Tuple:
+        kind, value = self._peek()
+        if kind == "word" and value.lower() in _AGGREGATES and self._peek(1) == ("op", "("):
+            self.pos += 2
+            col = self._column()
+            self._expect("op", ")")
+            return ("agg", value.lower(), col)
+        return ("col", self._column())
+
+    def _literal(self) -> Any:
+        kind, value = self._peek()
+        if kind == "op" and value == "-":
+            self.pos += 1
+            return -self._expect("num")
+        if kind in ("num", "str"):
+            self.pos += 1
+            return value
+        if kind == "word" and value.lower() in ("true", "false"):
+            self.pos += 1
+            return value.lower() == "true"
+        if kind == "word" and value.lower() in ("date", "datetime", "timestamp"):
+            self.pos += 1
+            text = self._expect("str")
+            try:
+                return (
+                    date.fromisoformat(text)
+                    if value.lower() == "date"
+                    else datetime.fromisoformat(text)
+                )
+            except ValueError:
+                raise _GvizError(f"Invalid {value} literal: '{text}'") from None
+        raise _GvizError(f'Encountered "{value}" where a value was expected.')
+
+    # WHERE
+    def _or(self) -> Callable[[List[Any]], bool]:
+        left = self._and()
+        while self._keyword("or"):
+            right, prev = self._and(), left
+            left = lambda r, a=prev, b=right: a(r) or b(r)  # noqa: E731
+        return left
+
+    def _and(self) -> Callable[[List[Any]], bool]:
+        left = self._not()
+        while self._keyword("and"):
+            right, prev = self._not(), left
+            left = lambda r, a=prev, b=right: a(r) and b(r)  # noqa: E731
+        return left
+
+    def _not(self) -> Callable[[List[Any]], bool]:
+        if self._keyword("not"):
+            inner = self._not()
+            return lambda r: not inner(r)
+        if self._peek() == ("op", "("):
+            self.pos += 1
+            inner = self._or()
+            self._expect("op", ")")
+            return inner
+        return self._comparison()
+
+    def _comparison(self) -> Callable[[List[Any]], bool]:
+        col = self._column()
+        if self._keyword("is", "not", "null"):
+            return lambda r: r[col] is not None
+        if self._keyword("is", "null"):
+            return lambda r: r[col] is None
+        for words, test in (
+            (("contains",), lambda a, b: b in a),
+            (("starts", "with"), lambda a, b: a.startswith(b)),
+            (("ends", "with"), lambda a, b: a.endswith(b)),
+            (("matches",), lambda a, b: re.fullmatch(b, a) is not None),
+            (("like",), lambda a, b: re.fullmatch(_like(b), a) is not None),
+        ):
+            if self._keyword(*words):
+                target = self._expect("str")
+                return lambda r, t=test: isinstance(r[col], str) and t(r[col], target)
+        op = self._expect("op")
+        compare = {
+            "=": lambda a, b: a == b,
+            "!=": lambda a, b: a != b,
+            "<>": lambda a, b: a != b,
+            "<": lambda a, b: a < b,
+            "<=": lambda a, b: a <= b,
+            ">": lambda a, b: a > b,
+            ">=": lambda a, b: a >= b,
+        }.get(op)
+        if compare is None:
+            raise _GvizError(f'Encountered "{op}" where a comparison was expected.')
+        target = self._literal()
+
+        def test(row: List[Any]) -> bool:
+            value = row[col]
+            if value is None:
+                return False
+            if isinstance(target, (date, datetime)) and isinstance(value, str):
+                try:
+                    value = type(target).fromisoformat(value)
+                except ValueError:
+                    return False
+            try:
+                return compare(value, target)
+            except TypeError:
+                return False
+
+        return test
+
+    def run(self) -> Tuple[List[Dict[str, Any]], List[List[Any]]]:
+        select: Optional[List[Tuple]] = None
+        where: Optional[Callable[[List[Any]], bool]] = None
+        group: List[int] = []
+        order: List[Tuple[Tuple, bool]] = []
+        limit: Optional[int] = None
+        offset = 0
+        seen = set()
+        while self._peek()[0] != "eof":
+            kind, value = self._peek()
+            clause = value.lower() if kind == "word" else None
+            if clause not in _CLAUSES or clause in seen:
+                raise _GvizError(f'Encountered "{value}" where a clause was expected.')
+            seen.add(clause)
+            self.pos += 1
+            if clause == "select":
+                if self._peek() == ("op", "*"):
+                    self.pos += 1
+                else:
+                    select = [self._expr()]
+                    while self._peek() == ("op", ","):
+                        self.pos += 1
+                        select.append(self._expr())
+            elif clause == "where":
+                where = self._or()
+            elif clause == "group":
+                self._by()
+                group = [self._column()]
+                while self._peek() == ("op", ","):
+                    self.pos += 1
+                    group.append(self._column())
+            elif clause == "order":
+                self._by()
+                while True:
+                    expr = self._expr()
+                    desc = self._keyword("desc")
+                    if not desc:
+                        self._keyword("asc")
+                    order.append((expr, desc))
+                    if self._peek() != ("op", ","):
+                        break
+                    self.pos += 1
+            elif clause in ("limit", "offset"):
+                number = self._expect("num")
+                if number != int(number) or number < 0:
+                    raise _GvizError(f"{clause.upper()} takes a non-negative integer.")
+                if clause == "limit":
+                    limit = int(number)
+                else:
+                    offset = int(number)
+            else:
+                raise _GvizError(f"'{clause}' is not supported by FakeSheetsService.")
+
+        exprs = select or [("col", i) for i in range(len(self.labels))]
+        rows = [r for r in self.rows if where is None or where(r)]
+        aggregated = bool(group) or any(e[0] == "agg" for e in exprs + [e for e, _ in order])
+        if aggregated:
+            for expr in exprs + [e for e, _ in order]:
+                if expr[0] == "col" and expr[1] not in group:
+                    raise _GvizError(f"ADD_COL_TO_GROUP_BY_OR_AGG: {_col_letters(expr[1])}")
+            buckets: Dict[Tuple, List[List[Any]]] = {}
+            for row in rows:
+                buckets.setdefault(tuple(row[c] for c in group), []).append(row)
+            if not group and not buckets:
+                buckets[()] = []
+            records = []
+            for key in sorted(buckets, key=lambda k: [_sort_key(v) for v in k]):
+                members = buckets[key]
+                record: Dict[Tuple, Any] = {("col", c): v for c, v in zip(group, key)}
+                for expr in exprs + [e for e, _ in order]:
+                    if expr[0] == "agg":
+                        record[expr] = _aggregate(expr[1], [m[expr[2]] for m in members])
+                records.append(record)
+            frames: List[Any] = records
+            value_of: Callable[[Any, Tuple], Any] = lambda rec, e: rec[e]  # noqa: E731
+        else:
+            frames = rows
+            value_of = lambda row, e: row[e[1]]  # noqa: E731
+        for expr, desc in reversed(order):
+            frames.sort(key=lambda f, e=expr: _sort_key(value_of(f, e)), reverse=desc)
+        frames = frames[offset:]
+        if limit is not None:
+            frames = frames[:limit]
+
+        cols = []
+        for expr in exprs:
+            if expr[0] == "col":
+                letter = _col_letters(expr[1])
+                cols.append(
+                    {"id": letter, "label": self.labels[expr[1]], "type": self.types[expr[1]]}
+                )
+            else:
+                fn, col = expr[1], expr[2]
+                kind = self.types[col] if fn in ("min", "max") else "number"
+                cols.append(
+                    {
+                        "id": f"{fn}-{_col_letters(col)}",
+                        "label": f"{fn} {self.labels[col]}".strip(),
+                        "type": kind,
+                    }
+                )
+        out = [[value_of(f, e) for e in exprs] for f in frames]
+        return cols, out
+
+
+def _like(pattern: str) -> str:
+    return "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern)
+
+
+def _sort_key(value: Any) -> Tuple:
+    """Nulls first, then values; mixed types never compare across kinds."""
+    if value is None:
+        return (0, 0, "")
+    if isinstance(value, bool):
+        return (1, 0, value)
+    if isinstance(value, (int, float)):
+        return (1, 1, value)
+    return (1, 2, str(value))
+
+
+def _aggregate(fn: str, values: List[Any]) -> Any:
+    present = [v for v in values if v is not None]
+    if fn == "count":
+        return float(len(present))
+    if not present:
+        return None
+    if fn == "min":
+        return min(present)
+    if fn == "max":
+        return max(present)
+    numbers = [v for v in present if isinstance(v, (int, float)) and not isinstance(v, bool)]
+    if fn == "sum":
+        return float(sum(numbers))
+    return float(sum(numbers) / len(numbers)) if numbers else None
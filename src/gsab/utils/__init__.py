@@ -1,6 +1,20 @@
 """GSAB utilities."""
 
-from .encryption import Encryptor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .encryption import Encryptor
+
+
+def __getattr__(name: str):
+    # Lazy so importing a light helper (``update_check``, ``metrics``) doesn't load
+    # ``cryptography``.
+    if name == "Encryptor":
+        from .encryption import Encryptor
+
+        return Encryptor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Note: `quota_monitor.QuotaMonitor` is intentionally not exported yet — it's an unused
 # seed for the planned rate-aware batching layer, not part of the public surface.
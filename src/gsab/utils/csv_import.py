@@ -0,0 +1,202 @@
+"""Streaming CSV import: infer a schema from a sample, then yield typed chunks.
+
+Backs ``gsab import``. Reads with the stdlib ``csv`` module, holding only the
+inference sample and one chunk in memory at a time — no pandas needed — and
+tracks the bytes consumed so the CLI can draw an honest progress bar.
+"""
+
+from __future__ import annotations
+
+import csv
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from ..core.schema import Field, FieldType, Schema
+from ..exceptions.custom_exceptions import ValidationError
+
+_INT = re.compile(r"^[+-]?\d+$")
+_FLOAT = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+_BOOLS = {"true": True, "false": False}
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_DATETIME = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+
+
+def _parse_int(text: str) -> int:
+    if not _INT.match(text):
+        raise ValueError(text)
+    return int(text)
+
+
+def _parse_float(text: str) -> float:
+    if not _FLOAT.match(text):
+        raise ValueError(text)
+    return float(text)
+
+
+def _parse_bool(text: str) -> bool:
+    try:
+        return _BOOLS[text.lower()]
+    except KeyError:
+        raise ValueError(text) from None
+
+
+def _parse_date(text: str) -> date:
+    if not _DATE.match(text):
+        raise ValueError(text)
+    return date.fromisoformat(text)
+
+
+def _parse_datetime(text: str) -> datetime:
+    if not _DATETIME.match(text):
+        raise ValueError(text)
+    return datetime.fromisoformat(text)
+
+
+# Narrowest first: a column is the first type every sampled value parses as.
+_PARSERS = {
+    FieldType.INTEGER: _parse_int,
+    FieldType.FLOAT: _parse_float,
+    FieldType.BOOLEAN: _parse_bool,
+    FieldType.DATE: _parse_date,
+    FieldType.DATETIME: _parse_datetime,
+}
+
+
+def infer_type(values: List[str]) -> FieldType:
+    """Infer a column's `FieldType` from sampled cell text (empty cells are ignored)."""
+    present = [v.strip() for v in values if v.strip() != ""]
+    if not present:
+        return FieldType.STRING
+    for ftype, parse in _PARSERS.items():
+        try:
+            for value in present:
+                parse(value)
+        except ValueError:
+            continue
+        return ftype
+    return FieldType.STRING
+
+
+def tab_name(path: Path) -> str:
+    """A tab name derived from a file name (non-identifier runs become ``_``)."""
+    return re.sub(r"[^A-Za-z0-9_]+", "_", path.stem) or "data"
+
+
+class CsvStream:
+    """Read a CSV file row by row with a sampled schema, in bounded memory.
+
+    Use as a context manager. The first ``sample_size`` rows are buffered to infer
+    column types, then replayed ahead of the rest of the file by ``chunks()``.
+
+    Example:
+        with CsvStream(Path("data.csv")) as stream:
+            schema = stream.schema("data")
+            for chunk in stream.chunks(500):
+                await db.bulk_insert(chunk)
+    """
+
+    def __init__(self, path: Path, *, sample_size: int = 1000):
+        self.path = Path(path)
+        self.sample_size = max(sample_size, 0)
+        self.size = self.path.stat().st_size
+        self.bytes_read = 0
+        self.header: List[str] = []
+        self._file = None
+        self._reader: Any = None  # a csv.reader; its ``line_num`` counts physical lines
+        # (first line number, cells) of each buffered row, so errors cite the file's line.
+        self._sample: List[Tuple[int, List[str]]] = []
+        self._types: List[FieldType] = []
+
+    def __enter__(self) -> "CsvStream":
+        self._file = self.path.open("rb")
+        self._reader = csv.reader(self._lines())
+        header = next(self._reader, None)
+        if not header:
+            self.close()
+            raise ValidationError(f"{self.path.name} is empty — it needs a header row.")
+        self.header = [h.strip() for h in header]
+        while len(self._sample) < self.sample_size:
+            start = self._reader.line_num + 1
+            row = next(self._reader, None)
+            if row is None:
+                break
+            if row:
+                self._sample.append((start, row))
+        self._types = [
+            infer_type([row[i] if i < len(row) else "" for _, row in self._sample])
+            for i in range(len(self.header))
+        ]
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _lines(self) -> Iterator[str]:
+        """Decode the file line by line, counting raw bytes for progress."""
+        first = True
+        for raw in self._file:
+            self.bytes_read += len(raw)
+            line = raw.decode("utf-8")
+            if first:
+                line = line.lstrip("\ufeff")  # tolerate a UTF-8 BOM (Excel exports)
+                first = False
+            yield line
+
+    def schema(self, name: str) -> Schema:
+        """A `Schema` of optional fields typed from the sample."""
+        return Schema(name, [Field(h, t, required=False) for h, t in zip(self.header, self._types)])
+
+    def _typed(self, row: List[str], line: int) -> Dict[str, Any]:
+        record: Dict[str, Any] = {}
+        for name, ftype, text in zip(self.header, self._types, row):
+            text = text.strip() if ftype is not FieldType.STRING else text
+            if text == "":
+                record[name] = None
+                continue
+            parse = _PARSERS.get(ftype)
+            if parse is None:
+                record[name] = text
+                continue
+            try:
+                record[name] = parse(text)
+            except ValueError:
+                raise ValidationError(
+                    f"Line {line}, column '{name}': {text!r} is not a valid {ftype.value} "
+                    f"(type inferred from the first {len(self._sample)} rows). "
+                    "Re-run with a larger --sample, or fix the value."
+                ) from None
+        return record
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Yield every data row as a typed record (sample rows first).
+
+        Errors cite the file line a row starts on, counting blank lines and the
+        line breaks inside quoted values.
+        """
+        for start, row in self._sample:
+            yield self._typed(row, start)
+        while True:
+            start = self._reader.line_num + 1
+            row = next(self._reader, None)
+            if row is None:
+                return
+            if row:  # skip blank lines
+                yield self._typed(row, start)
+
+    def chunks(self, size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Yield typed records in lists of at most ``size``."""
+        chunk: List[Dict[str, Any]] = []
+        for record in self.rows():
+            chunk.append(record)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
@@ -1,20 +1,196 @@
+import base64
 import json
-from typing import Any
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import repeat
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
 
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet
 
 from ..exceptions.custom_exceptions import EncryptionError
 
+# Batches smaller than this run inline: handing them to a pool costs more than it saves.
+PARALLEL_MIN = 2048
+# Cells per pool task.
+CHUNK_SIZE = 1024
+
+# Marks a deterministic (AES-SIV) token; Fernet tokens always start with "gAAAA".
+DETERMINISTIC_PREFIX = "siv1:"
+
+# A key set, newest first (raw Fernet key bytes).
+Keys = Tuple[bytes, ...]
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _shared_pool() -> ThreadPoolExecutor:
+    """The process-wide thread pool used by `encrypt_many` / `decrypt_many`."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=min(32, os.cpu_count() or 1), thread_name_prefix="gsab-crypto"
+                )
+    return _pool
+
+
+def _siv(key: bytes):
+    """The AES-SIV cipher for deterministic tokens, derived from the Fernet key."""
+    try:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.ciphers.aead import AESSIV
+        from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+    except ImportError as e:  # AESSIV arrived in cryptography 37
+        raise EncryptionError(
+            'Searchable fields need cryptography>=37. Upgrade it: pip install -U "cryptography>=37"'
+        ) from e
+    raw = base64.urlsafe_b64decode(key)
+    derived = HKDF(hashes.SHA256(), length=64, salt=None, info=b"gsab deterministic v1").derive(raw)
+    return AESSIV(derived)
+
+
+def _seal_deterministic(siv, value: Any) -> str:
+    token = siv.encrypt(json.dumps(value).encode(), None)
+    return DETERMINISTIC_PREFIX + base64.urlsafe_b64encode(token).decode()
+
+
+def _fernet(keys: Keys):
+    """A Fernet for one key, a MultiFernet (first key encrypts, any decrypts) for several."""
+    if len(keys) == 1:
+        return Fernet(keys[0])
+    return MultiFernet([Fernet(k) for k in keys])
+
+
+def _open(fernet, sivs: Callable[[], List[Any]], token: str) -> Any:
+    if token.startswith(DETERMINISTIC_PREFIX):
+        raw = base64.urlsafe_b64decode(token[len(DETERMINISTIC_PREFIX) :])
+        error: Optional[Exception] = None
+        for siv in sivs():
+            try:
+                return json.loads(siv.decrypt(raw, None).decode())
+            except Exception as e:  # InvalidTag: sealed under another key
+                error = e
+        raise error or ValueError("no key")
+    return json.loads(fernet.decrypt(token.encode()).decode())
+
+
+def _lazy_sivs(keys: Keys) -> Callable[[], List[Any]]:
+    cache: List[Any] = []
+
+    def sivs():
+        if not cache:
+            cache.extend(_siv(k) for k in keys)
+        return cache
+
+    return sivs
+
+
+class _Failed:
+    """A cell `decrypt_many` couldn't open (picklable, so process pools can return it)."""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+
+def _encrypt_chunk(keys: Keys, values: Sequence[Any], deterministic: bool) -> List[str]:
+    # Module-level (and keyed by raw key bytes) so a ProcessPoolExecutor can run it.
+    fernet = Fernet(keys[0])
+    siv = _siv(keys[0]) if deterministic else None
+    out = []
+    for value in values:
+        try:
+            if value is None:
+                raise ValueError("Cannot encrypt None value")
+            if siv is not None:
+                out.append(_seal_deterministic(siv, value))
+            else:
+                out.append(fernet.encrypt(json.dumps(value).encode()).decode())
+        except Exception as e:
+            raise EncryptionError(f"Encryption failed: {str(e)}") from e
+    return out
+
+
+def _decrypt_chunk(keys: Keys, tokens: Sequence[str], strict: bool) -> List[Any]:
+    fernet = _fernet(keys)
+    sivs = _lazy_sivs(keys)
+    out: List[Any] = []
+    for token in tokens:
+        if not token:
+            out.append("")
+            continue
+        try:
+            out.append(_open(fernet, sivs, token))
+        except Exception as e:
+            if strict:
+                raise EncryptionError(f"Decryption failed: {str(e)}") from e
+            out.append(_Failed(str(e)))
+    return out
+
+
+def _rotate_chunk(keys: Keys, tokens: Sequence[str]) -> List[str]:
+    fernet = _fernet(keys)
+    sivs = _lazy_sivs(keys)
+    out = []
+    for token in tokens:
+        try:
+            if not token:
+                out.append(token)
+            elif token.startswith(DETERMINISTIC_PREFIX):
+                out.append(_seal_deterministic(sivs()[0], _open(fernet, sivs, token)))
+            elif isinstance(fernet, MultiFernet):
+                out.append(fernet.rotate(token.encode()).decode())
+            else:
+                out.append(fernet.encrypt(fernet.decrypt(token.encode())).decode())
+        except Exception as e:
+            raise EncryptionError(f"Re-encryption failed: {str(e)}") from e
+    return out
+
 
 class Encryptor:
-    """Handles encryption and decryption of data."""
+    """Handles encryption and decryption of data.
+
+    `encrypt` / `decrypt` handle one value; `encrypt_many` / `decrypt_many` handle a
+    column of them, split across a thread pool once the batch is large enough (pass
+    ``executor=`` — e.g. a ``ProcessPoolExecutor`` — to use your own).
+
+    `encrypt_deterministic` seals with AES-SIV under a key derived from the same
+    Fernet key: equal values always give the same token, so tokens can be compared
+    without decrypting (at the cost of revealing which values are equal).
+    `decrypt` opens either kind of token.
 
-    def __init__(self, key: str):
-        """Initialize encryptor with key."""
+    ``key`` may be a list of keys (newest first), like ``MultiFernet``: the first
+    encrypts, any of them decrypts, and `rotate_many` re-seals tokens under the
+    first. That is how a key is rotated without an outage.
+    """
+
+    def __init__(
+        self,
+        key: Union[str, bytes, Sequence[Union[str, bytes]]],
+        *,
+        executor: Optional[Executor] = None,
+    ):
+        """Initialize encryptor with key (or keys, newest first)."""
+        keys = [key] if isinstance(key, (str, bytes)) else list(key)
         try:
-            self.fernet = Fernet(key.encode() if isinstance(key, str) else key)
+            if not keys:
+                raise ValueError("no key given")
+            self._keys = tuple(k.encode() if isinstance(k, str) else k for k in keys)
+            self.fernet = _fernet(self._keys)
         except Exception as e:
             raise EncryptionError(f"Failed to initialize encryptor: {str(e)}") from e
+        self.executor = executor
+        self._sivs = _lazy_sivs(self._keys)
+
+    @property
+    def key_count(self) -> int:
+        """How many keys can decrypt (more than one while a rotation is under way)."""
+        return len(self._keys)
+
+    def _siv_for(self):
+        return self._sivs()[0]
 
     def encrypt(self, data: Any) -> str:
         """Encrypt data."""
@@ -29,13 +205,75 @@ class Encryptor:
         except Exception as e:
             raise EncryptionError(f"Encryption failed: {str(e)}") from e
 
+    def encrypt_deterministic(self, data: Any) -> str:
+        """Encrypt data so that equal inputs give equal tokens (AES-SIV)."""
+        siv = self._siv_for()
+        try:
+            if data is None:
+                raise ValueError("Cannot encrypt None value")
+            return _seal_deterministic(siv, data)
+        except Exception as e:
+            raise EncryptionError(f"Encryption failed: {str(e)}") from e
+
     def decrypt(self, encrypted_data: str) -> Any:
-        """Decrypt data."""
+        """Decrypt data (a Fernet or a deterministic token)."""
         try:
             if not encrypted_data:
                 return ""
 
-            decrypted = self.fernet.decrypt(encrypted_data.encode())
-            return json.loads(decrypted.decode())
+            return _open(self.fernet, self._sivs, encrypted_data)
+        except EncryptionError:
+            raise
         except Exception as e:
             raise EncryptionError(f"Decryption failed: {str(e)}") from e
+
+    def equal_tokens(self, data: Any) -> List[str]:
+        """Every deterministic token ``data`` may be stored as — one per key."""
+        return [_seal_deterministic(siv, data) for siv in self._sivs()]
+
+    def encrypt_many(self, values: Sequence[Any], *, deterministic: bool = False) -> List[str]:
+        """Encrypt every value, in order — `encrypt` (or `encrypt_deterministic`) over a
+        whole column."""
+        return self._map(_encrypt_chunk, list(values), deterministic)
+
+    def decrypt_many(
+        self,
+        tokens: Sequence[str],
+        *,
+        on_error: Optional[Callable[[str, EncryptionError], Any]] = None,
+    ) -> List[Any]:
+        """Decrypt every token, in order — `decrypt` over a whole column.
+
+        A token that fails raises `EncryptionError`, unless ``on_error`` is given:
+        then its result is ``on_error(token, error)`` and the rest still decrypt.
+        """
+        tokens = list(tokens)
+        values = self._map(_decrypt_chunk, tokens, on_error is None)
+        if on_error is not None:
+            for i, value in enumerate(values):
+                if isinstance(value, _Failed):
+                    values[i] = on_error(
+                        tokens[i], EncryptionError(f"Decryption failed: {value.reason}")
+                    )
+        return values
+
+    def rotate_many(self, tokens: Sequence[str]) -> List[str]:
+        """Re-seal every token under the first key (empty cells stay empty).
+
+        Fernet tokens keep their original timestamp (``MultiFernet.rotate``);
+        deterministic tokens are re-sealed with the first key's AES-SIV.
+        """
+        return self._map(_rotate_chunk, list(tokens))
+
+    def _map(self, fn: Callable[..., List[Any]], items: List[Any], *args: Any) -> List[Any]:
+        """Run ``fn`` over ``items`` — inline for small batches, else chunked on a pool."""
+        executor = self.executor
+        if len(items) < PARALLEL_MIN or (executor is None and (os.cpu_count() or 1) < 2):
+            return fn(self._keys, items, *args)
+        pool = executor or _shared_pool()
+        chunks = [items[i : i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+        extra = [repeat(a, len(chunks)) for a in args]
+        out: List[Any] = []
+        for part in pool.map(fn, repeat(self._keys, len(chunks)), chunks, *extra):
+            out.extend(part)
+        return out
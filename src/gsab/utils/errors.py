@@ -1,7 +1,8 @@
 """Translate Google API errors into friendly GSAB exceptions, with retry/backoff.
 
 ``execute()`` wraps a Google API request: it retries transient failures (429 and
-5xx) with exponential backoff, then maps any remaining error to a GSAB exception
+5xx) as a `RetryPolicy` allows — jittered backoff, ``Retry-After``, a retry budget
+and a circuit breaker — then maps any remaining error to a GSAB exception
 whose message tells the user — or an LLM agent — what to do next.
 """
 
@@ -11,6 +12,7 @@ import asyncio
 import json
 import logging
 import socket
+from typing import Optional
 
 from google.auth.exceptions import RefreshError, TransportError
 from googleapiclient.errors import HttpError
@@ -25,6 +27,8 @@ from ..exceptions.custom_exceptions import (
     ValidationError,
 )
 from ..exceptions.custom_exceptions import ConnectionError as GSABConnectionError
+from . import metrics
+from .retry import DEFAULT_POLICY, RetryPolicy, parse_retry_after, retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -84,41 +88,81 @@ def to_gsab_error(error: HttpError) -> GSABError:
     return error_for_status(_status(error), _detail(error))
 
 
-async def _backoff(op: str, why: object, attempt: int, retries: int, base_delay: float) -> None:
-    delay = base_delay * 2**attempt
+def _hint(error: HttpError) -> Optional[float]:
+    """How long Google asked us to wait: ``Retry-After``, or a ``RetryInfo`` in the body."""
+    seconds = retry_after(getattr(error, "resp", None))
+    if seconds is not None:
+        return seconds
+    try:
+        body = json.loads(error.content.decode("utf-8"))
+        for detail in body["error"].get("details") or ():
+            if str(detail.get("@type", "")).endswith("google.rpc.RetryInfo"):
+                return parse_retry_after(str(detail["retryDelay"]).rstrip("s"))
+    except (ValueError, KeyError, AttributeError, TypeError, UnicodeDecodeError):
+        pass
+    return None
+
+
+async def _backoff(op: str, why: object, attempt: int, retries: int, delay: float) -> None:
     logger.warning(
         "Google API %s failed (%s); retry %d/%d in %.1fs", op, why, attempt + 1, retries, delay
     )
+    m = metrics.current()
+    if m is not None:
+        m.retries += 1
+        m.backoff_s += delay
     await asyncio.sleep(delay)
 
 
-async def execute(request, *, op: str = "request", retries: int = 5, base_delay: float = 0.5):
-    """Run a Google API request, retrying transient errors with exponential backoff.
+async def execute(
+    request,
+    *,
+    op: str = "request",
+    retries: Optional[int] = None,
+    base_delay: Optional[float] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+):
+    """Run a Google API request, retrying transient errors with backoff.
 
     Retries 429/5xx responses and transient network failures (dropped connection,
-    timeout). Maps anything that finally fails to a friendly GSAB exception, and a
-    failed token refresh to ``AuthError``.
+    timeout) as ``retry_policy`` allows — jittered exponential backoff, at least as long
+    as any ``Retry-After`` Google sent, within the retry budget, and not at all
+    while the circuit breaker is open (see ``gsab.utils.retry``). Maps anything
+    that finally fails to a friendly GSAB exception, and a failed token refresh to
+    ``AuthError``.
 
     Args:
         request: a built Google API request (anything with ``.execute()``).
         op: short label for logs, e.g. ``"read"`` or ``"insert"``.
-        retries: max retry attempts for transient failures.
-        base_delay: first backoff delay in seconds (doubles each attempt).
+        retries: max retry attempts for transient failures (default: the policy's).
+        base_delay: first backoff cap in seconds (default: the policy's).
+        retry_policy: the `RetryPolicy` to follow (default: the process-wide one).
 
     Returns:
         The request's parsed response.
 
     Raises:
+        CircuitOpenError: Google has been failing repeatedly; the request wasn't sent.
         GSABError: a friendly, mapped exception on non-retryable or final failure.
     """
-    for attempt in range(retries + 1):
+    policy = (retry_policy or DEFAULT_POLICY).with_overrides(retries=retries, base_delay=base_delay)
+    m = metrics.current()
+    attempt = 0
+    while True:
+        policy.admit(op)
         try:
-            return request.execute()
+            result = request.execute() if m is None else metrics.run_request(request, m)
         except HttpError as e:
             status = _status(e)
-            if status in RETRYABLE_STATUSES and attempt < retries:
-                await _backoff(op, status, attempt, retries, base_delay)
-                continue
+            if status == 429 and m is not None:
+                m.rate_limited += 1
+            policy.record(outage=status >= 500)
+            if status in RETRYABLE_STATUSES:
+                delay = policy.next_delay(op, attempt, _hint(e))
+                if delay is not None:
+                    await _backoff(op, status, attempt, policy.retries, delay)
+                    attempt += 1
+                    continue
             raise to_gsab_error(e) from e
         except RefreshError as e:
             raise AuthError(
@@ -126,9 +170,14 @@ async def execute(request, *, op: str = "request", retries: int = 5, base_delay:
                 "Run `gsab auth login` to sign in again."
             ) from e
         except _RETRYABLE_NETWORK as e:
-            if attempt < retries:
-                await _backoff(op, type(e).__name__, attempt, retries, base_delay)
+            policy.record(outage=True)
+            delay = policy.next_delay(op, attempt)
+            if delay is not None:
+                await _backoff(op, type(e).__name__, attempt, policy.retries, delay)
+                attempt += 1
                 continue
             raise GSABConnectionError(
                 f"Network error during {op} ({e}). Check your connection and try again."
             ) from e
+        policy.record(outage=False)
+        return result
@@ -0,0 +1,157 @@
+"""Incremental writers behind ``SheetManager.export()`` and ``gsab export``.
+
+Each writer takes decoded records a page at a time and writes them straight
+through to a file or stream, so an export never holds more than one page.
+Parquet uses the optional ``pyarrow`` dependency (``pip install "gsab[parquet]"``).
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..core.schema import FieldType, Schema
+from ..exceptions.custom_exceptions import ValidationError
+
+FORMATS = ("csv", "ndjson", "parquet")
+_SUFFIXES = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet"}
+
+
+def resolve_format(dest: Any, fmt: Optional[str]) -> str:
+    """The export format: ``fmt`` if given, else the path's extension, else ``csv``."""
+    if fmt:
+        fmt = fmt.lower()
+        if fmt not in FORMATS:
+            raise ValidationError(
+                f"Unknown export format '{fmt}'. Use one of: {', '.join(FORMATS)}."
+            )
+        return fmt
+    if isinstance(dest, (str, Path)):
+        return _SUFFIXES.get(Path(dest).suffix.lower(), "csv")
+    return "csv"
+
+
+def _text(value: Any) -> Any:
+    """A JSON/CSV-safe form of a decoded cell (dates as ISO text, None kept)."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+class _CsvWriter:
+    def __init__(self, stream, schema: Schema):
+        self._names = [f.name for f in schema.fields]
+        self._writer = csv.writer(stream)
+        self._writer.writerow(self._names)
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        rows = []
+        for record in records:
+            row = []
+            for name in self._names:
+                value = _text(record.get(name))
+                if isinstance(value, (dict, list)):
+                    value = json.dumps(value, default=str)
+                row.append("" if value is None else value)
+            rows.append(row)
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        pass
+
+
+class _NdjsonWriter:
+    def __init__(self, stream, schema: Schema):
+        self._stream = stream
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        self._stream.write(
+            "".join(json.dumps(r, default=_text, ensure_ascii=False) + "\n" for r in records)
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class _ParquetWriter:
+    def __init__(self, stream, schema: Schema):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('Parquet export needs pyarrow: pip install "gsab[parquet]"') from None
+        self._pa = pa
+        types = {
+            FieldType.INTEGER: (pa.int64(), int),
+            FieldType.FLOAT: (pa.float64(), (int, float)),
+            FieldType.BOOLEAN: (pa.bool_(), bool),
+            FieldType.DATE: (pa.date32(), date),
+            FieldType.DATETIME: (pa.timestamp("us"), datetime),
+        }
+        self._columns = []
+        arrow_fields = []
+        for field in schema.fields:
+            arrow_type, expected = types.get(field.field_type, (pa.string(), None))
+            self._columns.append((field.name, field.field_type, expected))
+            arrow_fields.append(pa.field(field.name, arrow_type))
+        self._schema = pa.schema(arrow_fields)
+        self._writer = pq.ParquetWriter(stream, self._schema)
+
+    @staticmethod
+    def _coerce(value: Any, ftype: FieldType, expected: Any) -> Any:
+        if value is None or value == "":
+            return None
+        if expected is None:  # a string column
+            if isinstance(value, (dict, list)):
+                return json.dumps(value, default=str)
+            return str(_text(value))
+        if ftype in (FieldType.INTEGER, FieldType.FLOAT) and isinstance(value, bool):
+            return None
+        if ftype is FieldType.DATE and isinstance(value, datetime):
+            return value.date()
+        # A cell that didn't decode to its field type becomes null, not a crash.
+        return value if isinstance(value, expected) else None
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        columns = {
+            name: [self._coerce(r.get(name), ftype, expected) for r in records]
+            for name, ftype, expected in self._columns
+        }
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+_WRITERS = {"csv": _CsvWriter, "ndjson": _NdjsonWriter, "parquet": _ParquetWriter}
+
+
+@contextmanager
+def open_writer(dest: Any, schema: Schema, fmt: Optional[str] = None) -> Iterator[Any]:
+    """Open an incremental writer for ``dest`` (a path or an open file object).
+
+    Paths are opened (and closed) here; a passed-in stream is left open so
+    ``sys.stdout`` keeps working after the export.
+    """
+    fmt = resolve_format(dest, fmt)
+    binary = fmt == "parquet"
+    if isinstance(dest, (str, Path)):
+        stream = open(dest, "wb") if binary else open(dest, "w", encoding="utf-8", newline="")
+        owned = True
+    else:
+        stream, owned = dest, False
+    try:
+        writer = _WRITERS[fmt](stream, schema)
+        try:
+            yield writer
+        finally:
+            writer.close()
+    finally:
+        if owned:
+            stream.close()
+        else:
+            stream.flush()
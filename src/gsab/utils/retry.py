@@ -0,0 +1,293 @@
+"""How failed Google API calls are retried: jittered backoff, Retry-After, budget, breaker.
+
+A `RetryPolicy` decides, for each failed attempt, whether to retry and how long
+to wait first:
+
+- **Full jitter.** The wait is drawn uniformly from ``[0, min(max_delay,
+  base_delay * 2**attempt)]``, so coroutines rate-limited together don't all come
+  back together and get rate-limited again.
+- **Server hints.** A ``Retry-After`` header (seconds or an HTTP date) — or a
+  quota-reset hint — sets the minimum wait. A hint longer than ``max_retry_after``
+  isn't worth waiting for: the call fails straight away instead.
+- **Retry budget.** A `RetryBudget` caps retries at a fraction of recent requests
+  (plus a small floor), so a struggling API sees a bounded amount of extra load
+  instead of every caller multiplying its traffic by ``retries``.
+- **Circuit breaker.** After ``failure_threshold`` consecutive outage failures
+  (5xx or a network error — not 429, which means "slow down", not "down") a
+  `CircuitBreaker` opens and calls fail fast with `CircuitOpenError` for
+  ``reset_timeout`` seconds. Then one probe call goes through; its success closes
+  the breaker.
+
+The default policy's budget and breaker are shared by the whole process. Give a
+`SheetConnection` its own ``retry_policy=`` to tune any of it::
+
+    conn = SheetConnection(retry_policy=RetryPolicy(retries=8, max_delay=60))
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Optional
+
+from ..exceptions.custom_exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# Headers that say when to come back, checked in order.
+_HINT_HEADERS = ("retry-after", "x-ratelimit-reset")
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After``-style value, or None if unusable.
+
+    Accepts delta-seconds (``"30"``), an HTTP date, or an epoch timestamp.
+    """
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        seconds = float(text)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(text).timestamp() - time.time()
+        except (TypeError, ValueError, IndexError):
+            return None
+    else:
+        if seconds > 1e9:  # an absolute reset time, not a delay
+            seconds -= time.time()
+    return max(0.0, seconds)
+
+
+def retry_after(headers: Any) -> Optional[float]:
+    """The server's requested wait from response ``headers`` (any mapping), if any."""
+    if not headers:
+        return None
+    get = getattr(headers, "get", None)
+    if get is None:
+        return None
+    for name in _HINT_HEADERS:
+        value = get(name)
+        if value is None:
+            value = get(name.title())
+        seconds = parse_retry_after(value)
+        if seconds is not None:
+            return seconds
+    return None
+
+
+class RetryBudget:
+    """Allows retries up to ``ratio`` of the requests made in the last ``window`` seconds.
+
+    ``min_retries`` more are always allowed per window, so a quiet process can
+    still ride out a blip. Thread-safe; one budget is usually shared process-wide.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, window: float = 10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._lock = threading.Lock()
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self.window
+        for times in (self._requests, self._retries):
+            while times and times[0] < horizon:
+                times.popleft()
+
+    def record_request(self) -> None:
+        """Count one request (first attempts and retries alike)."""
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            self._requests.append(now)
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False when it's used up."""
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+                return False
+            self._retries.append(now)
+            return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._retries.clear()
+
+
+class CircuitBreaker:
+    """Fails calls fast after ``failure_threshold`` consecutive outage failures.
+
+    Open for ``reset_timeout`` seconds, then half-open: one probe call is let
+    through, and its outcome closes the breaker or opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 10, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """``"closed"``, ``"open"`` or ``"half_open"``."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return "open"
+            return "half_open"
+
+    def allow(self) -> Optional[float]:
+        """None if a call may go ahead, else the seconds until the breaker half-opens."""
+        now = time.monotonic()
+        with self._lock:
+            if self._opened_at is None:
+                return None
+            remaining = self._opened_at + self.reset_timeout - now
+            if remaining > 0:
+                return remaining
+            # Half-open: one probe at a time (a probe that never reports back
+            # frees its slot after another reset_timeout).
+            if self._probe_at is not None and now - self._probe_at < self.reset_timeout:
+                return self._probe_at + self.reset_timeout - now
+            self._probe_at = now
+            return None
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = self._probe_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            probing = self._probe_at is not None
+            # Stragglers failing while already open don't push the reopening back.
+            if probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+                logger.warning(
+                    "Google API failed %d times in a row; failing fast for %.0fs",
+                    self._failures,
+                    self.reset_timeout,
+                )
+                self._opened_at = time.monotonic()
+                self._probe_at = None
+
+    def reset(self) -> None:
+        self.record_success()
+
+
+_PROCESS_BUDGET = RetryBudget()
+_PROCESS_BREAKER = CircuitBreaker()
+
+
+@dataclass
+class RetryPolicy:
+    """When and how long to wait before retrying a failed Google API call.
+
+    Args:
+        retries: max retry attempts per call.
+        base_delay: backoff cap for the first retry, in seconds (doubles each attempt).
+        max_delay: ceiling on the backoff cap.
+        jitter: draw each wait uniformly from ``[0, cap]`` (full jitter); off waits
+            exactly the cap.
+        respect_retry_after: wait at least as long as the server's ``Retry-After``.
+        max_retry_after: a server hint longer than this fails the call instead.
+        budget: the `RetryBudget` retries draw from (None: unlimited). Defaults to
+            the process-wide budget.
+        breaker: the `CircuitBreaker` guarding calls (None: never fail fast).
+            Defaults to the process-wide breaker.
+    """
+
+    retries: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 32.0
+    jitter: bool = True
+    respect_retry_after: bool = True
+    max_retry_after: float = 120.0
+    budget: Optional[RetryBudget] = field(default_factory=lambda: _PROCESS_BUDGET)
+    breaker: Optional[CircuitBreaker] = field(default_factory=lambda: _PROCESS_BREAKER)
+
+    def with_overrides(
+        self, *, retries: Optional[int] = None, base_delay: Optional[float] = None
+    ) -> "RetryPolicy":
+        """This policy with per-call ``retries`` / ``base_delay`` (same budget and breaker)."""
+        if retries is None and base_delay is None:
+            return self
+        return dataclasses.replace(
+            self,
+            retries=self.retries if retries is None else retries,
+            base_delay=self.base_delay if base_delay is None else base_delay,
+        )
+
+    def admit(self, op: str) -> None:
+        """Count a request about to be sent; raise `CircuitOpenError` if the breaker is open."""
+        if self.breaker is not None:
+            wait = self.breaker.allow()
+            if wait is not None:
+                raise CircuitOpenError(
+                    f"Google Sheets has been failing repeatedly, so {op} was not sent. "
+                    f"Calls resume in {wait:.0f}s — wait, then retry "
+                    "(status: https://www.google.com/appsstatus)."
+                )
+        if self.budget is not None:
+            self.budget.record_request()
+
+    def record(self, *, outage: bool) -> None:
+        """Report how an attempt ended: ``outage`` for a 5xx or a network failure."""
+        if self.breaker is None:
+            return
+        if outage:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def backoff(self, attempt: int) -> float:
+        """The wait before retry ``attempt`` (0-based), before any server hint."""
+        cap = min(self.max_delay, self.base_delay * 2**attempt)
+        return random.uniform(0, cap) if self.jitter else cap
+
+    def next_delay(self, op: str, attempt: int, hint: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait before retrying, or None to give up now.
+
+        Gives up when ``attempt`` has used every retry, the server asked for a
+        longer wait than ``max_retry_after``, or the retry budget is spent.
+        """
+        if attempt >= self.retries:
+            return None
+        delay = self.backoff(attempt)
+        if hint is not None and self.respect_retry_after:
+            if hint > self.max_retry_after:
+                logger.warning(
+                    "Google asked to retry %s after %.0fs (over max_retry_after); giving up",
+                    op,
+                    hint,
+                )
+                return None
+            delay = max(delay, hint)
+        if self.budget is not None and not self.budget.try_spend():
+            logger.warning("Retry budget exhausted; not retrying %s", op)
+            return None
+        return delay
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+def reset() -> None:
+    """Forget the process-wide budget and breaker state (e.g. between tests)."""
+    _PROCESS_BUDGET.reset()
+    _PROCESS_BREAKER.reset()
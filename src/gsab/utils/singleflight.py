@@ -0,0 +1,84 @@
+"""Single-flight: concurrent identical calls share one in-flight call.
+
+When fifty request handlers ask for the same tab at the same moment, only the
+first one calls Google; the other forty-nine wait for that call and share its
+result. Nothing is kept once the call finishes — this is stampede protection,
+not a cache::
+
+    flights = SingleFlight()
+    rows = await flights.do(("read", tab), fetch, copy=copy_rows)
+
+Each caller awaits the shared call through ``asyncio.shield``, so a caller that
+is cancelled doesn't cancel it for the others. When a call was shared, every
+caller gets ``copy(result)`` rather than the one object, so one caller mutating
+its rows can't change another's.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("task", "callers")
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.callers = 0
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with that key share it."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        copy: Optional[Callable[[T], T]] = None,
+    ) -> T:
+        """``await fn()`` — or join the identical call already in flight under ``key``.
+
+        ``copy`` is applied to the result for every caller of a shared call (a
+        call nobody joined returns its result as-is).
+        """
+        loop = asyncio.get_running_loop()
+        call = self._calls.get(key)
+        if call is None or call.task.get_loop() is not loop:
+            call = _Call(loop.create_task(fn()))
+            self._calls[key] = call
+            # Registered before any waiter: the key is gone before anyone resumes,
+            # so nobody can join a call whose result was already handed out.
+            call.task.add_done_callback(functools.partial(self._finished, key, call))
+        call.callers += 1
+        result = await asyncio.shield(call.task)
+        return copy(result) if copy is not None and call.callers > 1 else result
+
+    def _finished(self, key: Hashable, call: _Call, task: "asyncio.Task[Any]") -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller was cancelled
+
+    def forget(self) -> None:
+        """Let calls made from now on start afresh instead of joining one in flight.
+
+        Call after a write: a read that began before it must not answer a read
+        that begins after it.
+        """
+        self._calls.clear()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+def copy_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """A new list of new row dicts (values themselves are shared)."""
+    return [dict(row) for row in rows]
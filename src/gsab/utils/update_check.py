@@ -12,8 +12,13 @@ import os
 import sys
 import time
 import urllib.request
+from pathlib import Path
 
-from ..auth.resolver import CONFIG_DIR
+from platformdirs import user_config_dir
+
+# The same directory as ``auth.resolver.CONFIG_DIR``, computed here so the check that
+# runs before every CLI command doesn't import google-auth.
+CONFIG_DIR = Path(user_config_dir("gsab"))
 
 _CACHE = CONFIG_DIR / "update_check.json"
 _INTERVAL = 86400  # seconds — check PyPI at most once a day
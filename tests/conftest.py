@@ -1,4 +1,15 @@
 import os
 
+import pytest
+
 # Never reach out to PyPI for the "update available" notice during tests.
 os.environ.setdefault("GSAB_NO_UPDATE_CHECK", "1")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_retry_state():
+    """Start every test with an empty process-wide retry budget and a closed breaker."""
+    from gsab.utils import retry
+
+    retry.reset()
+    yield
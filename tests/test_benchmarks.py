@@ -0,0 +1,19 @@
+"""Smoke test: the benchmark runner and its fake Sheets API still work end to end."""
+
+import json
+
+from benchmarks.run import main
+
+
+def test_benchmark_runner_writes_json(tmp_path):
+    before, after = tmp_path / "before.json", tmp_path / "after.json"
+    main(["-k", "bulk_upsert_1k", "--repeat", "1", "-o", str(before)])
+    main(["-k", "bulk_upsert_1k", "--repeat", "1", "-o", str(after), "--compare", str(before)])
+
+    report = json.loads(after.read_text())
+    assert set(report["meta"]) == {"commit", "python", "platform", "timestamp"}
+    [result] = report["results"]
+    assert result["name"] == "bulk_upsert_1k" and result["rows"] == 1000
+    # one read, one append, one values().batchUpdate of the changed cells
+    assert result["api_calls"] == 3 and result["retries"] == 0
+    assert result["seconds"] > 0
@@ -1,5 +1,6 @@
 """CLI smoke tests — notably that `gsab help` works like `gsab --help`."""
 
+import pytest
 from typer.testing import CliRunner
 
 from gsab.cli import app
@@ -93,3 +94,132 @@ def test_cookbook_list_and_show(tmp_path):
 
     r = runner.invoke(app, ["cookbook", "show", "nope"])
     assert r.exit_code == 1
+
+
+def test_csv_stream_infers_types_and_chunks(tmp_path):
+    from gsab.core.schema import FieldType
+    from gsab.utils.csv_import import CsvStream
+
+    src = tmp_path / "laptops.csv"
+    src.write_text(
+        "\ufeffbrand,ram,price,ok\nacme,8,999.5,true\nzed,,1200,FALSE\n\nnova,16,1e3,true\n",
+        encoding="utf-8",
+    )
+    with CsvStream(src, sample_size=2) as stream:
+        schema = stream.schema("laptops")
+        types = {f.name: f.field_type for f in schema.fields}
+        assert types == {
+            "brand": FieldType.STRING,
+            "ram": FieldType.INTEGER,
+            "price": FieldType.FLOAT,
+            "ok": FieldType.BOOLEAN,
+        }
+        chunks = list(stream.chunks(2))
+        assert stream.bytes_read == src.stat().st_size
+    assert [len(c) for c in chunks] == [2, 1]  # blank line skipped
+    assert chunks[0][1] == {"brand": "zed", "ram": None, "price": 1200.0, "ok": False}
+    assert chunks[1][0]["price"] == 1000.0
+
+
+def test_csv_stream_infers_iso_dates_and_datetimes(tmp_path):
+    from datetime import date, datetime
+
+    from gsab.core.schema import FieldType
+    from gsab.utils.csv_import import CsvStream
+
+    src = tmp_path / "orders.csv"
+    src.write_text(
+        "id,day,at,code\n1,2024-03-01,2024-03-01T09:30:00,2024\n2,,2024-03-02 18:05,2025\n",
+        encoding="utf-8",
+    )
+    with CsvStream(src) as stream:
+        types = {f.name: f.field_type for f in stream.schema("orders").fields}
+        rows = list(stream.rows())
+    assert types == {
+        "id": FieldType.INTEGER,
+        "day": FieldType.DATE,
+        "at": FieldType.DATETIME,
+        "code": FieldType.INTEGER,
+    }
+    assert rows[0]["day"] == date(2024, 3, 1)
+    assert rows[1] == {"id": 2, "day": None, "at": datetime(2024, 3, 2, 18, 5), "code": 2025}
+
+
+def test_csv_stream_rejects_value_outside_sampled_type(tmp_path):
+    from gsab.exceptions import ValidationError
+    from gsab.utils.csv_import import CsvStream
+
+    src = tmp_path / "d.csv"
+    src.write_text("n\n1\n2\nthree\n", encoding="utf-8")
+    with CsvStream(src, sample_size=2) as stream:
+        with pytest.raises(ValidationError) as exc:
+            list(stream.chunks(10))
+    assert "--sample" in str(exc.value)
+
+
+@pytest.mark.parametrize("bad_in_sample", [False, True])
+def test_csv_stream_errors_cite_the_file_line(tmp_path, bad_in_sample):
+    from gsab.core.schema import FieldType
+    from gsab.exceptions import ValidationError
+    from gsab.utils.csv_import import CsvStream
+
+    src = tmp_path / "d.csv"
+    # line 1 header, 2 a row, 3 blank, 4-5 one quoted two-line row, 6 blank, 7 the bad row
+    src.write_text('n,note\n1,a\n\n2,"two\nlines"\n\nthree,b\n', encoding="utf-8")
+    with CsvStream(src, sample_size=3 if bad_in_sample else 2) as stream:
+        stream._types[0] = FieldType.INTEGER  # as if the sample said so
+        with pytest.raises(ValidationError, match="Line 7, column 'n'"):
+            list(stream.rows())
+
+
+def test_import_streams_chunks_without_pandas(tmp_path, monkeypatch):
+    uploads = []
+
+    class _FakeManager:
+        def __init__(self, connection, schema):
+            self.schema = schema
+
+        async def create_sheet(self, title):
+            return "SHEET"
+
+        async def bulk_insert(self, records):
+            uploads.append(records)
+            return len(records)
+
+    monkeypatch.setattr("gsab.core.sheet_manager.SheetManager", _FakeManager)
+    monkeypatch.setattr("gsab.core.connection.SheetConnection", lambda: None)
+    src = tmp_path / "people.csv"
+    src.write_text("id,name\n" + "".join(f"{i},p{i}\n" for i in range(5)), encoding="utf-8")
+
+    r = runner.invoke(app, ["import", str(src), "--chunk-size", "2"])
+    assert r.exit_code == 0, r.output
+    assert [len(c) for c in uploads] == [2, 2, 1]
+    assert uploads[0][0] == {"id": 0, "name": "p0"}
+    assert "Imported 5 rows" in r.output
+
+
+def test_export_writes_to_stdout_and_reports_on_stderr(monkeypatch):
+    calls = {}
+
+    class _FakeManager:
+        async def export(self, dest, *, format, page_size):
+            calls.update(format=format, page_size=page_size)
+            dest.write("id\n1\n")
+            return 1
+
+    async def _attach(sheet_id, tab):
+        calls["sheet"] = (sheet_id, tab)
+        return _FakeManager()
+
+    monkeypatch.setattr("gsab.cli._attach", _attach)
+
+    r = runner.invoke(app, ["export", "SHEET", "--tab", "users", "--page-size", "50"])
+    assert r.exit_code == 0, r.output
+    assert calls == {"sheet": ("SHEET", "users"), "format": "csv", "page_size": 50}
+    assert "id\n1\n" in r.stdout
+    assert "Exported 1 rows" in r.stderr
+
+
+def test_export_rejects_unknown_format():
+    r = runner.invoke(app, ["export", "SHEET", "--format", "xlsx"])
+    assert r.exit_code == 1
@@ -5,6 +5,8 @@ without touching a live spreadsheet — notably the `delete()` row-index fix (#1
 and native chart spec (#14).
 """
 
+import re
+
 import pytest
 
 from gsab.core.schema import Field, FieldType, Schema
@@ -24,14 +26,28 @@ class _Values:
         self.conn = conn
 
     def get(self, *, spreadsheetId, range):
+        self.conn.ranges.append(range)
         # column-only range (e.g. "t!A:A") is the chart extent probe
-        rows = self.conn.col_a if range.endswith("!A:A") else self.conn.grid
-        return _Request({"values": rows})
+        if range.endswith("!A:A"):
+            return _Request({"values": self.conn.col_a})
+        # bounded row range (e.g. "t!A2:Z3") is a paged read; 1-based, inclusive
+        bounded = re.search(r"!A(\d+):Z(\d+)$", range)
+        if bounded:
+            start, end = int(bounded.group(1)), int(bounded.group(2))
+            rows = self.conn.grid[start - 1 : end]
+            while rows and not rows[-1]:  # the API trims trailing blank rows
+                rows = rows[:-1]
+            return _Request({"values": rows} if rows else {})
+        return _Request({"values": self.conn.grid})
 
     def append(self, *, spreadsheetId, range, valueInputOption, body):
         self.conn.appended.append(body["values"])
         return _Request({})
 
+    def batchUpdate(self, *, spreadsheetId, body):
+        self.conn.written.append(body)
+        return _Request({})
+
 
 class _Spreadsheets:
     def __init__(self, conn):
@@ -59,11 +75,23 @@ class _Service:
 class FakeConnection:
     def __init__(self, grid, *, col_a=None, batch_reply=None, tab="t", sheet_id=7, connected=True):
         self.grid = grid
-        self.col_a = col_a or [[r[0]] for r in grid]
-        self.metadata = {"sheets": [{"properties": {"title": tab, "sheetId": sheet_id}}]}
+        self.col_a = col_a or [r[:1] for r in grid]
+        self.metadata = {
+            "sheets": [
+                {
+                    "properties": {
+                        "title": tab,
+                        "sheetId": sheet_id,
+                        "gridProperties": {"rowCount": len(grid)},
+                    }
+                }
+            ]
+        }
         self.batch_reply = batch_reply or {}
         self.batched = []
         self.appended = []
+        self.written = []  # values().batchUpdate bodies
+        self.ranges = []
         self.credentials = None
         self.service = _Service(self)
         self.connected = connected
@@ -76,6 +104,11 @@ class FakeConnection:
         self.connected = True
         self.connect_calls += 1
 
+    def drive(self):
+        from gsab.exceptions import ConnectionError
+
+        raise ConnectionError("no Drive client")  # like an injected service: no versions
+
 
 def _schema():
     return Schema(
@@ -253,10 +286,38 @@ async def test_upsert_updates_existing_row_and_merges():
     status = await db.upsert({"id": 2, "age": 99})
     assert status == "updated"
     assert conn.appended == []  # nothing inserted
-    req = conn.batched[0]["requests"][0]["updateCells"]
-    assert (req["range"]["startRowIndex"], req["range"]["endRowIndex"]) == (2, 3)  # id=2 row
-    written = [c["userEnteredValue"] for c in req["rows"][0]["values"]]
-    assert written == [{"numberValue": 2}, {"numberValue": 99}]
+    assert conn.batched == []  # no full-row updateCells
+    [body] = conn.written
+    # Only the changed cell: B3 is age on the id=2 row (sheet row 3).
+    assert body == {"valueInputOption": "RAW", "data": [{"range": "t!B3:B3", "values": [[99]]}]}
+
+
+async def test_update_merges_adjacent_rows_and_skips_unchanged_cells():
+    grid = [["id", "age"]] + [[str(i), "20" if i != 3 else "30"] for i in range(1, 7)]
+    conn = FakeConnection(grid)
+    db = SheetManager(conn, _schema())
+    db.sheet_id = "SHEET"
+
+    # ids 1-6; id=3 already has age 30, so rows 2-3 and 5-7 change.
+    assert await db.update({"id": {"$ne": 99}}, {"age": 30}) == 6
+    [body] = conn.written
+    assert body["data"] == [
+        {"range": "t!B2:B3", "values": [[30], [30]]},
+        {"range": "t!B5:B7", "values": [[30], [30], [30]]},
+    ]
+
+    conn.written.clear()
+    assert await db.update({"id": 1}, {"age": 20, "id": 1}) == 1
+    assert conn.written == []  # nothing changed, nothing sent
+
+
+async def test_update_of_several_columns_writes_one_rectangle():
+    schema = Schema("t", [Field(n, FieldType.INTEGER) for n in ("id", "a", "b")])
+    conn = FakeConnection([["id", "a", "b"], ["1", "0", "0"], ["2", "0", "0"], ["3", "0", "0"]])
+    db = SheetManager(conn, schema)
+    db.sheet_id = "SHEET"
+    assert await db.update({"id": {"$in": [1, 2]}}, {"a": 9, "b": 8}) == 2
+    assert conn.written[0]["data"] == [{"range": "t!B2:C3", "values": [[9, 8], [9, 8]]}]
 
 
 async def test_bulk_upsert_counts_and_last_write_wins():
@@ -271,6 +332,19 @@ async def test_bulk_upsert_counts_and_last_write_wins():
     assert conn.appended == [[[7, 77]]]  # last value wins, one row
 
 
+async def test_bulk_upsert_with_an_invalid_new_record_writes_nothing():
+    from gsab.exceptions import ValidationError
+
+    conn = FakeConnection([["id", "age"], ["1", "20"]])
+    db = SheetManager(conn, _pk_schema())
+    db.sheet_id = "SHEET"
+    # id=1 would update; id=2 is new and misses the required age.
+    with pytest.raises(ValidationError):
+        await db.bulk_upsert([{"id": 1, "age": 99}, {"id": 2}])
+    assert conn.written == [] and conn.batched == [] and conn.appended == []
+    assert conn.grid == [["id", "age"], ["1", "20"]]
+
+
 async def test_upsert_without_key_raises():
     conn = FakeConnection([["id", "age"], ["1", "20"]])
     db = SheetManager(conn, _schema())  # no primary key
@@ -586,3 +660,60 @@ async def test_query_coerces_field_columns_to_schema_types(monkeypatch):
     assert isinstance(out[0]["id"], int) and out[0]["id"] == 1
     assert isinstance(out[0]["age"], int) and out[0]["age"] == 20
     assert out[0]["avg age"] == 25.0  # unknown label stays gviz-native
+
+
+async def test_export_pages_through_tab_to_csv_and_ndjson():
+    import io
+    import json
+
+    grid = [["id", "age"], ["1", "20"], ["2", "30"], ["3"]]
+    conn = FakeConnection(grid)
+    db = SheetManager(conn, _schema())
+    db.sheet_id = "SHEET"
+
+    out = io.StringIO()
+    assert await db.export(out, page_size=2) == 3
+    assert out.getvalue().splitlines() == ["id,age", "1,20", "2,30", "3,"]
+    # header, then two pages down to the grid's last row (4)
+    assert conn.ranges == ["t!A1:Z1", "t!A2:Z3", "t!A4:Z4"]
+
+    out = io.StringIO()
+    await db.export(out, format="ndjson", page_size=10)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert lines[0] == {"id": 1, "age": 20}
+    assert len(lines) == 3
+
+
+async def test_export_reads_past_a_block_of_blank_rows():
+    import io
+
+    gap = [[] for _ in range(5)]  # more blank rows than a page
+    conn = FakeConnection([["id", "age"], ["1", "20"], *gap, ["2", "30"]])
+    db = SheetManager(conn, _schema())
+    db.sheet_id = "SHEET"
+    out = io.StringIO()
+    assert await db.export(out, page_size=2) == 2
+    assert out.getvalue().splitlines() == ["id,age", "1,20", "2,30"]
+
+
+async def test_export_parquet_keeps_schema_types(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    conn = FakeConnection([["id", "age"], ["1", "20"], ["2", ""]])
+    db = SheetManager(conn, _schema())
+    db.sheet_id = "SHEET"
+    path = tmp_path / "t.parquet"
+    assert await db.export(str(path)) == 2  # format from the extension
+    table = pq.read_table(path)
+    assert str(table.schema.field("id").type) == "int64"
+    assert table.to_pydict() == {"id": [1, 2], "age": [20, None]}
+
+
+async def test_export_rejects_unknown_format():
+    import io
+
+    from gsab.exceptions import ValidationError
+
+    db = SheetManager(FakeConnection([["id", "age"]]), _schema())
+    db.sheet_id = "SHEET"
+    with pytest.raises(ValidationError):
+        await db.export(io.StringIO(), format="xlsx")
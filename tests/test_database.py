@@ -0,0 +1,173 @@
+"""Offline tests for `Database`: one batchGet per read, hashed joins, one-call transactions."""
+
+import pytest
+
+from gsab.core.database import Database
+from gsab.core.schema import Field, FieldType, Schema
+from gsab.exceptions import DuplicateKeyError, ValidationError
+
+from .test_crud import _Request
+
+
+class _Values:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def batchGet(self, *, spreadsheetId, ranges):
+        self.conn.batch_gets.append(ranges)
+        return _Request(
+            {"valueRanges": [{"values": self.conn.tabs[r.split("!")[0]]} for r in ranges]}
+        )
+
+
+class _Spreadsheets:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def values(self):
+        return _Values(self.conn)
+
+    def get(self, *, spreadsheetId):
+        self.conn.metadata_calls += 1
+        return _Request(
+            {
+                "sheets": [
+                    {"properties": {"title": t, "sheetId": i}}
+                    for i, t in enumerate(self.conn.tabs, start=10)
+                ]
+            }
+        )
+
+    def create(self, *, body):
+        self.conn.created.append(body)
+        return _Request({"spreadsheetId": "NEW"})
+
+    def batchUpdate(self, *, spreadsheetId, body):
+        self.conn.batched.append(body)
+        return _Request({})
+
+
+class _Service:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def spreadsheets(self):
+        return _Spreadsheets(self.conn)
+
+
+class MultiTabConnection:
+    def __init__(self, tabs):
+        self.tabs = tabs
+        self.batch_gets = []
+        self.batched = []
+        self.created = []
+        self.metadata_calls = 0
+        self.service = _Service(self)
+
+    def is_connected(self):
+        return True
+
+    async def connect(self):
+        pass
+
+
+def _schemas():
+    users = Schema(
+        "users",
+        [Field("id", FieldType.INTEGER, primary_key=True), Field("name", FieldType.STRING)],
+    )
+    orders = Schema(
+        "orders",
+        [
+            Field("id", FieldType.INTEGER, primary_key=True),
+            Field("user_id", FieldType.INTEGER, required=True),
+            Field("total", FieldType.INTEGER),
+        ],
+    )
+    return [users, orders]
+
+
+def _db():
+    conn = MultiTabConnection(
+        {
+            "users": [["id", "name"], ["1", "ann"], ["2", "bob"]],
+            "orders": [
+                ["id", "user_id", "total"],
+                ["10", "1", "5"],
+                ["11", "1", "7"],
+                ["12", "3", "9"],
+            ],
+        }
+    )
+    db = Database(conn, _schemas())
+    db.sheet_id = "SHEET"
+    return db, conn
+
+
+async def test_read_fetches_every_tab_in_one_batch_get():
+    db, conn = _db()
+    data = await db.read()
+    assert conn.batch_gets == [["users!A:Z", "orders!A:Z"]]
+    assert data["users"] == [{"id": 1, "name": "ann"}, {"id": 2, "name": "bob"}]
+    assert len(data["orders"]) == 3
+    filtered = await db.read("orders", filters={"orders": {"total": {"$gt": 6}}})
+    assert [o["id"] for o in filtered["orders"]] == [11, 12]
+
+
+async def test_join_and_lookup():
+    db, conn = _db()
+    inner = await db.join("orders", "users", on=("user_id", "id"))
+    assert [(r["id"], r["name"], r["users.id"]) for r in inner] == [(10, "ann", 1), (11, "ann", 1)]
+    left = await db.join("orders", "users", on=("user_id", "id"), how="left")
+    assert [r["id"] for r in left] == [10, 11, 12] and "name" not in left[2]
+    assert len(conn.batch_gets) == 2  # one round-trip per join
+
+    index = await db.lookup("users")
+    assert index[2]["name"] == "bob"
+    with pytest.raises(ValidationError, match="Unknown field"):
+        await db.join("orders", "users", on="nope")
+
+
+async def test_create_makes_one_spreadsheet_with_all_tabs():
+    db, conn = _db()
+    assert await db.create("Shop") == "NEW"
+    titles = [s["properties"]["title"] for s in conn.created[0]["sheets"]]
+    assert titles == ["users", "orders"]
+    assert db["orders"].sheet_id == "NEW"
+
+
+async def test_transaction_sends_one_batch_update_across_tabs():
+    db, conn = _db()
+    async with db.transaction() as tx:
+        tx.insert("users", {"id": 3, "name": "cy"})
+        tx.update("orders", {"user_id": 1}, {"total": 0})
+        tx.delete("orders", {"id": 12})
+    assert len(conn.batched) == 1
+    assert conn.metadata_calls == 1
+    requests = conn.batched[0]["requests"]
+    kinds = [next(iter(r)) for r in requests]
+    assert kinds == ["updateCells", "updateCells", "deleteDimension", "appendCells"]
+    assert requests[0]["updateCells"]["range"]["sheetId"] == 11  # orders
+    assert requests[2]["deleteDimension"]["range"]["startIndex"] == 3
+    assert requests[3]["appendCells"]["sheetId"] == 10  # users
+    assert requests[3]["appendCells"]["rows"][0]["values"][0] == {
+        "userEnteredValue": {"numberValue": 3}
+    }
+
+
+async def test_transaction_rejects_duplicates_and_discards_on_error():
+    db, conn = _db()
+    tx = db.transaction()
+    tx.insert("users", {"id": 1, "name": "dup"})
+    with pytest.raises(DuplicateKeyError):
+        await tx.commit()
+    assert conn.batched == []
+
+    with pytest.raises(RuntimeError):
+        async with db.transaction() as tx:
+            tx.insert("users", {"id": 9, "name": "zed"})
+            raise RuntimeError("boom")
+    assert conn.batched == []
+
+    with pytest.raises(ValidationError):
+        db.transaction().insert("orders", {"id": 20})  # user_id is required
@@ -80,3 +80,210 @@ def test_encryption_errors(encryption_key):
     # Test invalid data format
     with pytest.raises(EncryptionError):
         encryptor.decrypt("not-base64-encoded==")
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    """Make every batch of 3+ cells go through the pool, in chunks of 2."""
+    from gsab.core import sheet_manager
+    from gsab.utils import encryption
+
+    monkeypatch.setattr(encryption, "PARALLEL_MIN", 3)
+    monkeypatch.setattr(encryption, "CHUNK_SIZE", 2)
+    monkeypatch.setattr(sheet_manager, "PARALLEL_MIN", 3)
+
+
+def test_encrypt_many_round_trips_through_a_pool(encryption_key, small_batches):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from gsab.utils.encryption import Encryptor
+
+    values = ["a", 1, 2.5, True, {"k": [1, 2]}, "", "z" * 100]
+    with ThreadPoolExecutor(2) as pool:
+        encryptor = Encryptor(encryption_key, executor=pool)
+        tokens = encryptor.encrypt_many(values)
+        assert [encryptor.decrypt(t) for t in tokens] == values
+        assert encryptor.decrypt_many(tokens + [""]) == values + [""]
+        with pytest.raises(EncryptionError):
+            encryptor.encrypt_many(["ok", None, "ok"])
+
+
+def test_decrypt_many_on_error_keeps_going(encryption_key, small_batches):
+    from gsab.utils.encryption import Encryptor
+
+    encryptor = Encryptor(encryption_key)
+    tokens = encryptor.encrypt_many(["a", "b", "c"])
+    tokens[1] = "garbage"
+    with pytest.raises(EncryptionError):
+        encryptor.decrypt_many(tokens)
+    failures = []
+    out = encryptor.decrypt_many(tokens, on_error=lambda t, e: failures.append(e) or t)
+    assert out == ["a", "garbage", "c"]
+    assert isinstance(failures[0], EncryptionError)
+
+
+async def test_encrypted_columns_round_trip_in_batches(encryption_key, small_batches):
+    from gsab import Field, FieldType, Schema, SheetConnection, SheetManager
+    from gsab.testing import FakeSheetsService
+
+    schema = Schema(
+        "secrets",
+        [
+            Field("id", FieldType.INTEGER, primary_key=True),
+            Field("note", FieldType.STRING, encrypted=True, required=False),
+            Field("score", FieldType.FLOAT, encrypted=True, required=False),
+        ],
+    )
+    fake = FakeSheetsService()
+    db = SheetManager(SheetConnection(service=fake), schema, encryption_key)
+    db.sheet_id = fake.add_spreadsheet({"secrets": [["id", "note", "score"]]})
+    records = [{"id": i, "note": f"n{i}" if i % 2 else None} for i in range(5)]
+    records[1]["score"] = 2.5
+
+    assert await db.bulk_insert(records) == 5
+    grid = fake.grid(db.sheet_id, "secrets")
+    assert grid[2][1] not in ("", "n1") and grid[1][1] == ""
+
+    rows = await db.read()
+    assert [r["note"] for r in rows] == ["", "n1", "", "n3", ""]
+    assert rows[1]["score"] == 2.5
+
+
+def test_deterministic_tokens_compare_equal(encryption_key):
+    from gsab.utils.encryption import DETERMINISTIC_PREFIX, Encryptor
+
+    encryptor = Encryptor(encryption_key)
+    a, b = encryptor.encrypt_deterministic("x@y.z"), encryptor.encrypt_deterministic("x@y.z")
+    assert a == b and a.startswith(DETERMINISTIC_PREFIX)
+    assert a != encryptor.encrypt_deterministic("other")
+    assert encryptor.encrypt_many(["x@y.z"], deterministic=True) == [a]
+    assert encryptor.decrypt(a) == "x@y.z"
+    assert encryptor.decrypt_many([a, encryptor.encrypt(1)]) == ["x@y.z", 1]
+    assert Encryptor(Fernet.generate_key().decode()).encrypt_deterministic("x@y.z") != a
+
+
+async def test_searchable_field_filters_and_unique_checks_without_decrypting(encryption_key):
+    from gsab import Field, FieldType, Schema, SheetConnection, SheetManager
+    from gsab.exceptions import DuplicateKeyError, ValidationError
+    from gsab.testing import FakeSheetsService
+
+    schema = Schema(
+        "users",
+        [
+            Field("id", FieldType.INTEGER, primary_key=True),
+            Field("email", FieldType.STRING, unique=True, searchable=True),
+            Field("note", FieldType.STRING, encrypted=True, required=False),
+        ],
+    )
+    assert schema.get_field("email").encrypted
+    fake = FakeSheetsService()
+    db = SheetManager(SheetConnection(service=fake), schema, encryption_key)
+    db.sheet_id = fake.add_spreadsheet({"users": [["id", "email", "note"]]})
+    await db.bulk_insert([{"id": i, "email": f"u{i}@x.io", "note": f"n{i}"} for i in range(6)])
+
+    opened = []
+    decrypt_many = db.encryptor.decrypt_many
+
+    def counting(tokens, **kw):
+        opened.extend(tokens)
+        return decrypt_many(tokens, **kw)
+
+    db.encryptor.decrypt_many = counting
+    rows = await db.read({"email": "u4@x.io"})
+    assert [(r["id"], r["note"]) for r in rows] == [(4, "n4")]
+    assert len(opened) == 2  # one row's email + note, not the whole tab
+    assert [r["id"] for r in await db.read({"email": {"$in": ["u1@x.io", "u2@x.io"]}})] == [1, 2]
+
+    opened.clear()
+    with pytest.raises(DuplicateKeyError, match="u3@x.io"):
+        await db.insert({"id": 99, "email": "u3@x.io"})
+    assert opened == []  # the email column was compared sealed
+
+    email = db.column("email")
+    hits = await db.query(f"SELECT A, B WHERE {email} = '{db.seal('email', 'u5@x.io')}'")
+    assert hits == [{"id": 5, "email": "u5@x.io"}]
+    with pytest.raises(ValidationError, match="searchable"):
+        db.seal("note", "n1")
+
+
+def test_key_set_decrypts_old_tokens_and_rotates_them(encryption_key):
+    from gsab.utils.encryption import Encryptor
+
+    old = Encryptor(encryption_key)
+    tokens = [old.encrypt("a"), old.encrypt_deterministic("b"), ""]
+    new_key = Fernet.generate_key().decode()
+    both = Encryptor([new_key, encryption_key])
+    assert both.key_count == 2
+    assert both.decrypt_many(tokens) == ["a", "b", ""]
+
+    rotated = both.rotate_many(tokens)
+    only_new = Encryptor(new_key)
+    assert only_new.decrypt_many(rotated) == ["a", "b", ""]
+    assert rotated[1] == only_new.encrypt_deterministic("b")
+    with pytest.raises(EncryptionError):
+        only_new.decrypt(tokens[0])
+
+
+async def test_rotate_encryption_key_rewrites_encrypted_columns_in_pages(encryption_key):
+    from gsab import Field, FieldType, Schema, SheetConnection, SheetManager
+    from gsab.testing import FakeSheetsService
+
+    schema = Schema(
+        "secrets",
+        [
+            Field("id", FieldType.INTEGER, primary_key=True),
+            Field("note", FieldType.STRING, encrypted=True, required=False),
+            Field("email", FieldType.STRING, searchable=True),
+        ],
+    )
+    fake = FakeSheetsService()
+    db = SheetManager(SheetConnection(service=fake), schema, encryption_key)
+    db.sheet_id = fake.add_spreadsheet({"secrets": [["id", "note", "email"]]})
+    records = [{"id": i, "note": f"n{i}" if i % 3 else None, "email": f"u{i}@x"} for i in range(7)]
+    await db.bulk_insert(records)
+    ids_before = [row[0] for row in fake.grid(db.sheet_id, "secrets")]
+    fake.calls.clear()
+
+    new_key = Fernet.generate_key().decode()
+    # With both keys, lookups find rows still sealed under the old one.
+    mixed = SheetManager(SheetConnection(service=fake), schema, [new_key, encryption_key])
+    mixed.sheet_id = db.sheet_id
+    assert [r["id"] for r in await mixed.read({"email": "u2@x"})] == [2]
+    fake.calls.clear()
+
+    assert await db.rotate_encryption_key(new_key, page_size=3) == 7 + 4
+
+    assert fake.calls["values.batchUpdate"] == 3  # one write per page of 3 rows
+    assert fake.calls["batchUpdate"] == 0
+    assert [row[0] for row in fake.grid(db.sheet_id, "secrets")] == ids_before
+
+    fresh = SheetManager(SheetConnection(service=fake), schema, new_key)
+    fresh.sheet_id = db.sheet_id
+    rows = await fresh.read()
+    assert [(r["note"], r["email"]) for r in rows][:2] == [("", "u0@x"), ("n1", "u1@x")]
+    assert [r["id"] for r in await fresh.read({"email": "u5@x"})] == [5]
+
+
+async def test_rotation_reaches_rows_below_a_blank_gap(encryption_key):
+    from gsab import Field, FieldType, Schema, SheetConnection, SheetManager
+    from gsab.testing import FakeSheetsService
+
+    schema = Schema(
+        "secrets",
+        [
+            Field("id", FieldType.INTEGER, primary_key=True),
+            Field("note", FieldType.STRING, encrypted=True),
+        ],
+    )
+    fake = FakeSheetsService()
+    db = SheetManager(SheetConnection(service=fake), schema, encryption_key)
+    db.sheet_id = fake.add_spreadsheet({"secrets": [["id", "note"]]})
+    await db.bulk_insert([{"id": 1, "note": "above"}, {"id": 2, "note": "below"}])
+    grid = fake.grid(db.sheet_id, "secrets")
+    grid[2:2] = [[] for _ in range(5)]  # more blank rows than a page, between the two
+
+    new_key = Fernet.generate_key().decode()
+    assert await db.rotate_encryption_key(new_key, page_size=2) == 2
+    fresh = SheetManager(SheetConnection(service=fake), schema, new_key)
+    fresh.sheet_id = db.sheet_id
+    assert [r["note"] for r in await fresh.read({"id": {"$in": [1, 2]}})] == ["above", "below"]
@@ -1,4 +1,4 @@
-"""Offline tests for the error-mapping + retry layer (#7)."""
+"""Offline tests for the error-mapping + retry layer (#7) and retry policies."""
 
 import json
 
@@ -8,6 +8,7 @@ from googleapiclient.errors import HttpError
 from gsab.exceptions import (
     APIError,
     AuthError,
+    CircuitOpenError,
     GSABError,
     NotFoundError,
     PermissionDeniedError,
@@ -15,6 +16,13 @@ from gsab.exceptions import (
     ValidationError,
 )
 from gsab.utils.errors import error_for_status, execute, to_gsab_error
+from gsab.utils.retry import (
+    CircuitBreaker,
+    RetryBudget,
+    RetryPolicy,
+    parse_retry_after,
+    retry_after,
+)
 
 
 class _Resp:
@@ -139,3 +147,149 @@ async def test_execute_maps_refresh_error_to_auth():
     with pytest.raises(AuthError):
         await execute(req, retries=3)
     assert req.calls == 1  # refresh failure is not retryable
+
+
+class _HeaderResp(dict):
+    """An httplib2-style response: a dict of lower-case headers with a status."""
+
+    def __init__(self, status, **headers):
+        super().__init__(headers)
+        self.status = status
+        self.reason = "test"
+
+
+class _Recorded:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def execute(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"ok": True}
+
+
+@pytest.fixture
+def slept(monkeypatch):
+    delays = []
+
+    async def _record(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr("gsab.utils.errors.asyncio.sleep", _record)
+    return delays
+
+
+async def test_backoff_is_fully_jittered_under_a_capped_exponential(slept):
+    policy = RetryPolicy(retries=6, base_delay=1.0, max_delay=4.0, budget=None)
+    await execute(_FlakyRequest(fails=6, status=503), retry_policy=policy)
+    caps = [1.0, 2.0, 4.0, 4.0, 4.0, 4.0]
+    assert len(slept) == 6
+    assert all(0 <= d <= cap for d, cap in zip(slept, caps))
+    assert len(set(slept)) > 1  # not lockstep
+
+
+async def test_retry_after_header_sets_the_minimum_wait(slept):
+    error = HttpError(_HeaderResp(429, **{"retry-after": "7"}), b"{}")
+    assert await execute(_Recorded([error]), retry_policy=RetryPolicy(budget=None)) == {"ok": True}
+    assert slept[0] == pytest.approx(7.0)
+
+
+async def test_retry_info_in_the_error_body_is_honored(slept):
+    body = {
+        "error": {
+            "message": "quota",
+            "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "12s"}],
+        }
+    }
+    error = HttpError(_Resp(429), json.dumps(body).encode())
+    await execute(_Recorded([error]), retry_policy=RetryPolicy(budget=None))
+    assert slept[0] == pytest.approx(12.0)
+
+
+async def test_retry_after_beyond_the_limit_fails_at_once(slept):
+    error = HttpError(_HeaderResp(429, **{"retry-after": "600"}), b"{}")
+    req = _Recorded([error])
+    with pytest.raises(QuotaExceededError):
+        await execute(req, retry_policy=RetryPolicy(max_retry_after=60))
+    assert (req.calls, slept) == (1, [])
+
+
+def test_parse_retry_after_forms():
+    assert parse_retry_after("30") == 30.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+    assert parse_retry_after("soon") is None
+    assert retry_after({"Retry-After": "5"}) == 5.0
+
+
+async def test_retry_budget_caps_retries_across_calls(slept):
+    policy = RetryPolicy(retries=5, budget=RetryBudget(ratio=0.0, min_retries=3), breaker=None)
+    first = _FlakyRequest(fails=10, status=503)
+    with pytest.raises(APIError):
+        await execute(first, retry_policy=policy)
+    assert first.calls == 4  # 1 + the 3 retries the budget allows
+    second = _FlakyRequest(fails=1, status=503)
+    with pytest.raises(APIError):
+        await execute(second, retry_policy=policy)
+    assert second.calls == 1  # budget spent: no retry
+
+
+async def test_circuit_breaker_fails_fast_then_probes(slept):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    policy = RetryPolicy(retries=5, budget=None, breaker=breaker)
+    req = _FlakyRequest(fails=10, status=503)
+    with pytest.raises(CircuitOpenError, match="failing repeatedly"):
+        await execute(req, retry_policy=policy)
+    assert req.calls == 3 and breaker.state == "open"
+
+    other = _FlakyRequest(fails=0, status=503)
+    with pytest.raises(CircuitOpenError):
+        await execute(other, retry_policy=policy)
+    assert other.calls == 0  # never sent
+
+    breaker.reset_timeout = 0  # time's up: half-open, the next call is a probe
+    assert await execute(other, retry_policy=policy) == {"ok": True}
+    assert breaker.state == "closed"
+
+
+async def test_rate_limiting_does_not_open_the_breaker(slept):
+    breaker = CircuitBreaker(failure_threshold=2)
+    policy = RetryPolicy(retries=4, budget=None, breaker=breaker)
+    assert await execute(_FlakyRequest(fails=4, status=429), retry_policy=policy) == {"ok": True}
+    assert breaker.state == "closed"
+
+
+async def test_connection_retry_policy_reaches_every_call():
+    from gsab import Field, FieldType, Schema, SheetConnection, SheetManager
+    from gsab.testing import FakeSheetsService
+
+    fake = FakeSheetsService()
+    conn = SheetConnection(service=fake, retry_policy=RetryPolicy(retries=0))
+    db = SheetManager(conn, Schema("t", [Field("id", FieldType.INTEGER)]))
+    db.sheet_id = fake.add_spreadsheet({"t": [["id"]]})
+    fake.fail(503, times=1)
+    with pytest.raises(APIError):
+        await db.read()
+
+
+def test_gviz_query_follows_the_policy_and_retry_after(monkeypatch):
+    from gsab.core.query import run_gviz_query
+
+    class _Resp:
+        def __init__(self, status, text="", headers=None):
+            self.status_code, self.text, self.reason = status, text, "x"
+            self.headers = headers or {}
+            self.content = text.encode()
+
+    ok = 'x({"status":"ok","table":{"cols":[{"id":"A","label":"id"}],"rows":[{"c":[{"v":1}]}]}})'
+    responses = [_Resp(429, headers={"Retry-After": "4"}), _Resp(200, ok)]
+
+    class _Session:
+        def get(self, url, timeout):
+            return responses.pop(0)
+
+    delays = []
+    monkeypatch.setattr("gsab.core.query.time.sleep", delays.append)
+    rows = run_gviz_query(None, "S", "SELECT A", session=_Session(), retry_policy=RetryPolicy())
+    assert rows == [{"id": 1}] and delays == [pytest.approx(4.0)]
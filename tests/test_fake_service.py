@@ -0,0 +1,152 @@
+"""Tests for the in-memory Sheets backend in ``gsab.testing``."""
+
+import pytest
+
+from gsab import Database, SheetConnection, SheetManager
+from gsab.core.schema import Field, FieldType, Schema
+from gsab.exceptions import NotFoundError, QuotaExceededError, ValidationError
+from gsab.testing import FakeSheetsService
+
+
+def _schema():
+    return Schema(
+        "users",
+        [
+            Field("id", FieldType.INTEGER, primary_key=True),
+            Field("name", FieldType.STRING),
+            Field("plan", FieldType.STRING),
+            Field("spend", FieldType.FLOAT),
+        ],
+    )
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    async def _sleep(_):
+        pass
+
+    monkeypatch.setattr("gsab.utils.errors.asyncio.sleep", _sleep)
+
+
+async def _seeded(fake=None):
+    fake = fake or FakeSheetsService()
+    db = SheetManager(SheetConnection(service=fake), _schema())
+    await db.create_sheet("Test DB")
+    await db.bulk_insert(
+        [
+            {"id": 1, "name": "ann", "plan": "pro", "spend": 120.5},
+            {"id": 2, "name": "bob", "plan": "free", "spend": 0},
+            {"id": 3, "name": "cy", "plan": "pro", "spend": 80},
+        ]
+    )
+    return db, fake
+
+
+async def test_crud_round_trip_keeps_cell_types():
+    db, fake = await _seeded()
+    assert fake.grid(db.sheet_id, "users")[1] == [1, "ann", "pro", 120.5]  # RAW keeps numbers
+
+    assert await db.update({"id": 2}, {"plan": "pro"}) == 1
+    assert await db.upsert({"id": 4, "name": "dee", "plan": "free", "spend": 5}) == "inserted"
+    assert await db.delete({"name": "cy"}) == 1
+
+    rows = await db.read()
+    assert [(r["id"], r["plan"]) for r in rows] == [(1, "pro"), (2, "pro"), (4, "free")]
+    assert fake.calls["create"] == 1 and fake.calls["batchUpdate"] == 1  # the delete
+    assert fake.calls["values.batchUpdate"] == 1  # the update: changed cells only
+
+
+async def test_gviz_queries_run_in_memory():
+    db, _ = await _seeded()
+    rows = await db.query("SELECT A, B WHERE C = 'pro' AND D > 100 OR A = 2 ORDER BY A DESC")
+    assert rows == [{"id": 2, "name": "bob"}, {"id": 1, "name": "ann"}]
+
+    page = await db.query("SELECT B ORDER BY D DESC LIMIT 1 OFFSET 1")
+    assert page == [{"name": "cy"}]
+
+    totals = await db.query("SELECT C, COUNT(A), SUM(D) GROUP BY C")
+    assert totals == [
+        {"plan": "free", "count id": 1.0, "sum spend": 0.0},
+        {"plan": "pro", "count id": 2.0, "sum spend": 200.5},
+    ]
+    assert await db.query("SELECT B WHERE B starts with 'a' OR B contains 'y'") == [
+        {"name": "ann"},
+        {"name": "cy"},
+    ]
+
+    with pytest.raises(ValidationError, match="does not exist"):
+        await db.query("SELECT Q")
+    with pytest.raises(ValidationError, match="ADD_COL_TO_GROUP_BY_OR_AGG"):
+        await db.query("SELECT B, COUNT(A)")
+
+
+async def test_injected_failures_and_quota(no_sleep):
+    db, fake = await _seeded()
+    fake.fail(429, times=2, method="values.get")
+    assert len(await db.read()) == 3  # retried through both 429s
+    assert fake.rate_limited == 2
+
+    fake.fail(ConnectionResetError("dropped"))
+    assert len(await db.read()) == 3  # transient network errors are retried too
+
+    fake.fail(404)
+    with pytest.raises(NotFoundError):
+        await db.read()
+
+    limited = FakeSheetsService(quota_per_minute=4)
+    db, _ = await _seeded(limited)  # create, unique check, append: 3 requests
+    await db.read()
+    with pytest.raises(QuotaExceededError, match="Requests per minute"):
+        await db.read()
+
+
+async def test_batch_update_is_all_or_nothing():
+    db, fake = await _seeded()
+    service = SheetConnection(service=fake).service
+    bad = {
+        "requests": [
+            {
+                "deleteDimension": {
+                    "range": {"sheetId": 0, "dimension": "ROWS", "startIndex": 1, "endIndex": 2}
+                }
+            },
+            {"noSuchRequest": {}},
+        ]
+    }
+    with pytest.raises(Exception, match="not supported"):
+        service.spreadsheets().batchUpdate(spreadsheetId=db.sheet_id, body=bad).execute()
+    assert len(fake.grid(db.sheet_id, "users")) == 4  # the delete was rolled back
+
+
+async def test_values_batch_update_clear_and_charts():
+    db, fake = await _seeded()
+    values = fake.spreadsheets().values()
+    values.batchUpdate(
+        spreadsheetId=db.sheet_id,
+        body={
+            "valueInputOption": "USER_ENTERED",
+            "data": [{"range": "users!C2:D2", "values": [["team", "7"]]}],
+        },
+    ).execute()
+    assert fake.grid(db.sheet_id, "users")[1] == [1, "ann", "team", 7]
+    values.clear(spreadsheetId=db.sheet_id, range="users!A4:D4").execute()
+    assert [r["id"] for r in await db.read()] == [1, 2]
+
+    chart_id = await db.chart(x="name", y="spend", kind="column")
+    assert fake.charts(db.sheet_id)[0]["chartId"] == chart_id
+
+
+async def test_database_transaction_on_the_fake():
+    fake = FakeSheetsService()
+    orders = Schema(
+        "orders",
+        [Field("id", FieldType.INTEGER, primary_key=True), Field("user_id", FieldType.INTEGER)],
+    )
+    db = Database(SheetConnection(service=fake), [_schema(), orders])
+    await db.create("Shop")
+    async with db.transaction() as tx:
+        tx.insert("users", {"id": 1, "name": "ann", "plan": "pro", "spend": 1})
+        tx.insert("orders", {"id": 10, "user_id": 1})
+    joined = await db.join("orders", "users", on=("user_id", "id"))
+    assert joined[0]["name"] == "ann"
+    assert fake.calls["batchUpdate"] == 1
@@ -0,0 +1,50 @@
+"""Startup budget: ``import gsab`` and the CLI must not load the heavy dependencies.
+
+Measured with ``python -X importtime`` in a fresh interpreter. The budgets are a few
+times what a warm import takes, so they catch an eager import of googleapiclient /
+cryptography / keyring (hundreds of ms) without being flaky on a slow CI runner.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("googleapiclient", "google.auth", "cryptography", "keyring", "pandas")
+
+
+def _import(module: str):
+    """Import ``module`` in a fresh interpreter; return (cumulative µs, loaded heavy modules)."""
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = None
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative = int(parts[1])
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return cumulative, loaded
+
+
+@pytest.mark.parametrize("module, budget_ms", [("gsab", 100), ("gsab.cli", 250)])
+def test_startup_stays_within_budget(module, budget_ms):
+    cumulative, loaded = _import(module)
+    assert loaded == [], f"`import {module}` eagerly loads {loaded}"
+    assert cumulative is not None
+    assert cumulative / 1000 < budget_ms, f"`import {module}` took {cumulative / 1000:.0f} ms"
+
+
+def test_lazy_exports_still_resolve():
+    import gsab
+
+    assert set(gsab.__all__) <= set(dir(gsab))
+    for name in gsab.__all__:
+        assert getattr(gsab, name) is not None
+    with pytest.raises(AttributeError):
+        gsab.NotAThing  # noqa: B018
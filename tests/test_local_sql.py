@@ -0,0 +1,117 @@
+"""Offline tests for LocalSQL / SheetManager.sql() over fake tab data."""
+
+from datetime import date
+
+import pytest
+
+from gsab.core.local_sql import LocalSQL
+from gsab.core.schema import Field, FieldType, Schema
+from gsab.core.sheet_manager import SheetManager
+from gsab.exceptions import ValidationError
+
+from .test_crud import FakeConnection
+from .test_snapshot import _FakeDrive
+
+
+def _users():
+    schema = Schema(
+        "users",
+        [
+            Field("id", FieldType.INTEGER, primary_key=True),
+            Field("name", FieldType.STRING),
+            Field("price", FieldType.FLOAT, required=False),
+        ],
+    )
+    grid = [["id", "name", "price"], ["1", "Ada", "10"], ["2", "Ada", "5.5"], ["3", "Lin", ""]]
+    db = SheetManager(FakeConnection(grid, tab="users"), schema)
+    db.sheet_id = "S"
+    return db
+
+
+def _orders():
+    schema = Schema(
+        "orders",
+        [
+            Field("user_id", FieldType.INTEGER),
+            Field("placed", FieldType.DATE),
+        ],
+    )
+    grid = [["user_id", "placed"], ["1", "2026-01-02"], ["3", "2026-02-03"], ["3", "2026-03-04"]]
+    db = SheetManager(FakeConnection(grid, tab="orders"), schema)
+    db.sheet_id = "S"
+    return db
+
+
+@pytest.fixture(params=["sqlite", "duckdb"])
+def engine(request):
+    if request.param == "duckdb":
+        pytest.importorskip("duckdb")
+    return request.param
+
+
+async def test_sql_groups_by_field_name(engine):
+    rows = await _users().sql(
+        "SELECT name, SUM(price) AS total FROM users GROUP BY name ORDER BY name",
+        engine=engine,
+    )
+    assert rows == [{"name": "Ada", "total": 15.5}, {"name": "Lin", "total": None}]
+
+
+async def test_sql_joins_tabs_with_params(engine):
+    rows = await _users().sql(
+        "SELECT u.name, COUNT(*) AS n FROM users u JOIN orders o ON o.user_id = u.id "
+        "WHERE o.placed >= ? GROUP BY u.name",
+        _orders(),
+        params=["2026-02-01" if engine == "sqlite" else date(2026, 2, 1)],
+        engine=engine,
+    )
+    assert rows == [{"name": "Lin", "n": 2}]
+
+
+async def test_loaded_engine_queries_without_api_calls():
+    users = _users()
+    local = await LocalSQL(users, engine="sqlite").load()
+    calls = len(users.connection.ranges)
+    for _ in range(3):
+        assert local.query("SELECT COUNT(*) AS n FROM users") == [{"n": 3}]
+    assert len(users.connection.ranges) == calls
+    local.close()
+
+
+async def test_sql_reuses_the_loaded_tab_until_a_write_or_an_edit():
+    users = _users()
+    drive = _FakeDrive("1")
+    users._drive = lambda: drive
+    query = "SELECT COUNT(*) AS n FROM users"
+    assert await users.sql(query, engine="sqlite") == [{"n": 3}]
+    assert await users.sql(query, engine="sqlite") == [{"n": 3}]
+    assert users.connection.ranges == ["users!A:Z"]  # downloaded once
+    assert drive.checks == 2
+
+    users.connection.grid.append(["4", "Eve", "1"])
+    drive.version = "2"  # edited elsewhere
+    assert await users.sql(query, engine="sqlite") == [{"n": 4}]
+    await users.insert({"id": 5, "name": "Bo"})  # a write through the manager
+    users.connection.grid.append(["5", "Bo", ""])
+    assert await users.sql(query, engine="sqlite") == [{"n": 5}]
+    assert users.connection.ranges.count("users!A:Z") == 4  # 3 loads + the unique check
+
+
+async def test_sql_downloads_every_time_without_drive_versions():
+    users = _users()  # FakeConnection has no Drive client
+    for _ in range(2):
+        await users.sql("SELECT 1", engine="sqlite")
+    assert users.connection.ranges == ["users!A:Z"] * 2
+    assert users._local == {}
+
+
+async def test_bad_sql_is_validation_error(engine):
+    with pytest.raises(ValidationError):
+        await _users().sql("SELEC nope", engine=engine)
+
+
+def test_rejects_unknown_engine_and_duplicate_tables():
+    with pytest.raises(ValidationError):
+        LocalSQL(_users(), engine="oracle")
+    with pytest.raises(ValidationError):
+        LocalSQL(_users(), _users())
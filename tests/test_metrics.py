@@ -0,0 +1,148 @@
+"""Offline tests for per-operation metrics and the Prometheus / OpenTelemetry hooks."""
+
+import json
+
+import pytest
+from googleapiclient.errors import HttpError
+
+from gsab.core.sheet_manager import SheetManager
+from gsab.exceptions import ValidationError
+from gsab.utils import metrics
+from gsab.utils.errors import execute
+from gsab.utils.metrics import OpenTelemetryHook, OpMetrics, PrometheusExporter
+from gsab.utils.retry import RetryPolicy
+
+from .test_crud import FakeConnection, _schema
+
+
+class _Resp:
+    status = 429
+    reason = "test"
+
+
+class _Flaky:
+    """Fails with a 429 ``fails`` times, then parses ``content`` via ``postproc``."""
+
+    def __init__(self, fails, content=b'{"ok": true}'):
+        self.fails = fails
+        self.content = content
+        self.postproc = lambda resp, content: json.loads(content)
+
+    def execute(self):
+        if self.fails:
+            self.fails -= 1
+            raise HttpError(_Resp(), b'{"error": {"message": "slow down"}}')
+        return self.postproc(None, self.content)
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    async def _sleep(_):
+        pass
+
+    monkeypatch.setattr("gsab.utils.errors.asyncio.sleep", _sleep)
+
+
+async def test_read_reports_one_event():
+    events = []
+    conn = FakeConnection([["id", "age"], ["1", "20"], ["2", "30"]])
+    db = SheetManager(conn, _schema(), metrics=events.append)
+    db.sheet_id = "SHEET"
+
+    await db.read()
+
+    [m] = events
+    assert (m.op, m.sheet_id, m.api_calls, m.rows, m.error) == ("read", "SHEET", 1, 2, None)
+    assert m.wall_s >= m.network_s >= 0 and m.codec_s > 0
+
+
+async def test_nested_operations_roll_up_and_errors_are_reported():
+    events = []
+    conn = FakeConnection([["id", "age"], ["1", "20"]])
+    db = SheetManager(conn, _schema(), metrics=events.append)
+    db.sheet_id = "SHEET"
+
+    assert await db.upsert({"id": 1, "age": 21}, key="id") == "updated"
+    assert [m.op for m in events] == ["upsert"]  # the inner update() doesn't report twice
+
+    with pytest.raises(ValidationError):
+        await db.insert({"id": "nope"})
+    assert events[-1].op == "insert" and events[-1].error == "ValidationError"
+
+
+async def test_execute_counts_retries_bytes_and_backoff(no_sleep):
+    m = OpMetrics("read")
+    token = metrics._current.set(m)
+    try:
+        exact = RetryPolicy(base_delay=0.5, jitter=False)
+        assert await execute(_Flaky(2), op="read", retry_policy=exact) == {"ok": True}
+    finally:
+        metrics._current.reset(token)
+    assert (m.api_calls, m.retries, m.rate_limited) == (3, 2, 2)
+    assert m.backoff_s == pytest.approx(0.5 + 1.0)
+    assert m.response_bytes == len(b'{"ok": true}')
+
+
+async def test_broken_hook_never_breaks_the_operation():
+    def hook(_):
+        raise RuntimeError("boom")
+
+    conn = FakeConnection([["id", "age"], ["1", "20"]])
+    db = SheetManager(conn, _schema(), metrics=hook)
+    db.sheet_id = "SHEET"
+    assert len(await db.read()) == 1
+
+
+def test_prometheus_exporter_renders_openmetrics():
+    exporter = PrometheusExporter()
+    exporter(OpMetrics("read", api_calls=2, rows=10, network_s=0.25))
+    exporter(OpMetrics("read", api_calls=1, rows=5, error="APIError"))
+    text = exporter.render()
+    assert "# TYPE gsab_api_calls counter" in text
+    assert 'gsab_api_calls_total{op="read"} 3' in text
+    assert 'gsab_rows_total{op="read"} 15' in text
+    assert 'gsab_errors_total{op="read"} 1' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_prometheus_exporter_writes_large_counters_exactly():
+    exporter = PrometheusExporter()
+    exporter(OpMetrics("read", rows=1234567, response_bytes=98765432101, network_s=0.1))
+    exporter(OpMetrics("read", network_s=0.2))
+    text = exporter.render()
+    assert 'gsab_rows_total{op="read"} 1234567\n' in text
+    assert 'gsab_response_bytes_total{op="read"} 98765432101\n' in text
+    assert f'gsab_network_seconds_total{{op="read"}} {0.1 + 0.2!r}\n' in text
+
+
+def test_opentelemetry_hook_records_a_span():
+    pytest.importorskip("opentelemetry")
+
+    class _Span:
+        def __init__(self, name, start_time):
+            self.name, self.start, self.attrs, self.status = name, start_time, {}, None
+
+        def set_attribute(self, key, value):
+            self.attrs[key] = value
+
+        def set_status(self, status):
+            self.status = status
+
+        def end(self, end_time):
+            self.end_time = end_time
+
+    class _Tracer:
+        spans = []
+
+        def start_span(self, name, start_time):
+            span = _Span(name, start_time)
+            self.spans.append(span)
+            return span
+
+    tracer = _Tracer()
+    OpenTelemetryHook(tracer)(OpMetrics("query", started=10.0, wall_s=0.5, api_calls=1))
+    [span] = tracer.spans
+    assert span.name == "gsab.query"
+    assert span.attrs["gsab.api_calls"] == 1
+    assert span.end_time - span.start == 500_000_000
+    assert span.status is None
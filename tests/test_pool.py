@@ -0,0 +1,129 @@
+"""Offline tests for the process-wide client pool."""
+
+import pytest
+
+from gsab.core import pool
+from gsab.core.connection import SheetConnection
+
+
+class _Creds:
+    def __init__(self, client_id="app", refresh_token="r1", scopes=("s",)):
+        self.client_id = client_id
+        self.refresh_token = refresh_token
+        self.scopes = list(scopes)
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls = []
+
+    def fake_build(api, version, **kwargs):
+        calls.append((api, version, kwargs))
+        return object()
+
+    monkeypatch.setattr("googleapiclient.discovery.build", fake_build)
+    pool.clear()
+    yield calls
+    pool.clear()
+
+
+def test_same_login_shares_one_client_per_api(builds):
+    a = pool.service("sheets", "v4", _Creds())
+    b = pool.service("sheets", "v4", _Creds())  # an equal credential, different object
+    assert a is b
+    assert pool.service("drive", "v3", _Creds()) is not a
+    assert [c[:2] for c in builds] == [("sheets", "v4"), ("drive", "v3")]
+    # discovery documents come from the bundled copies, never the network
+    assert all(c[2]["static_discovery"] is True for c in builds)
+
+
+def test_new_grant_or_account_gets_its_own_client(builds):
+    base = pool.service("sheets", "v4", _Creds())
+    assert pool.service("sheets", "v4", _Creds(refresh_token="r2")) is not base
+    assert pool.service("sheets", "v4", _Creds(client_id="other")) is not base
+    pool.clear()
+    assert pool.service("sheets", "v4", _Creds()) is not base
+    assert len(builds) == 4
+
+
+def test_delegated_subjects_get_their_own_clients(builds):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from google.oauth2 import service_account
+
+    pem = (
+        rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        .private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        .decode()
+    )
+    robot = service_account.Credentials.from_service_account_info(
+        {
+            "client_email": "robot@proj.iam.gserviceaccount.com",
+            "private_key": pem,
+            "token_uri": "https://oauth2.googleapis.com/token",
+        },
+        scopes=["s"],
+    )
+    alice = pool.service("sheets", "v4", robot.with_subject("alice@corp.com"))
+    bob = pool.service("sheets", "v4", robot.with_subject("bob@corp.com"))
+    assert alice is not bob
+    assert pool.service("sheets", "v4", robot.with_subject("alice@corp.com")) is alice
+    billed = pool.service("sheets", "v4", robot.with_quota_project("other"))
+    assert billed is not pool.service("sheets", "v4", robot)
+
+
+def test_unrecognised_credentials_are_keyed_by_object(builds):
+    tokenless = _Creds(refresh_token=None)
+    client = pool.service("sheets", "v4", tokenless)
+    assert pool.service("sheets", "v4", _Creds(refresh_token=None)) is not client
+    assert pool.service("sheets", "v4", tokenless) is client
+
+
+async def test_connections_reuse_the_pooled_service(builds):
+    creds = _Creds()
+    one, two = SheetConnection(credentials=creds), SheetConnection(credentials=_Creds())
+    await one.connect()
+    await two.connect()
+    assert one.service is two.service
+    assert one.drive() is two.drive()
+    assert len(builds) == 2
+
+
+def test_connection_prefers_the_services_own_session():
+    from gsab.testing import FakeSheetsService
+
+    fake = FakeSheetsService()
+    session = SheetConnection(service=fake).http_session()
+    assert type(session).__name__ == "_GvizSession"
+
+
+def test_managers_use_the_connections_drive_client(builds):
+    from gsab import ConnectionError, Field, FieldType, Schema, SheetManager
+    from gsab.testing import FakeSheetsService
+
+    schema = Schema("t", [Field("a", FieldType.STRING)])
+    db = SheetManager(SheetConnection(service=FakeSheetsService()), schema)
+    with pytest.raises(ConnectionError, match="Drive"):
+        db._drive()
+    drive = object()
+    fake = FakeSheetsService()
+    fake.drive = lambda: drive
+    assert SheetManager(SheetConnection(service=fake), schema)._drive() is drive
+    assert builds == []  # never a real client built with credentials=None
+
+
+def test_each_thread_gets_its_own_client(builds):
+    import threading
+
+    mine = pool.service("sheets", "v4", _Creds())
+    seen = []
+    worker = threading.Thread(target=lambda: seen.append(pool.service("sheets", "v4", _Creds())))
+    worker.start()
+    worker.join()
+    assert seen[0] is not mine  # httplib2 connections are never shared across threads
+    assert pool.service("sheets", "v4", _Creds()) is mine
+    assert len(builds) == 2
@@ -1,8 +1,18 @@
 """Offline tests for the query layer (filter operators + gviz parsing)."""
 
+import asyncio
+from datetime import date
+from itertools import islice
+
 import pytest
 
-from gsab.core.query import build_gviz_url, parse_gviz_response
+from gsab.core.query import (
+    GvizTable,
+    build_gviz_url,
+    gviz_pages,
+    parse_gviz_response,
+    parse_gviz_table,
+)
 from gsab.core.sheet_manager import _match_op
 
 
@@ -103,3 +113,105 @@ def test_encode_row_preserves_native_types():
     assert db._user_entered(fields["price"], 9.5) == {"numberValue": 9.5}
     assert db._user_entered(fields["active"], True) == {"boolValue": True}
     assert db._user_entered(fields["note"], "=cmd") == {"stringValue": "=cmd"}
+
+
+def test_parse_gviz_table_is_columnar_and_handles_nulls_and_ragged_rows():
+    payload = (
+        b'x({"status":"ok","table":{"cols":[{"id":"A","label":"id"},{"id":"B","label":""}],'
+        b'"rows":[{"c":[{"v":1.0},null]},{"c":[{"v":2.0}]},{"c":[{"v":3.0},{"v":"z","f":"z"}]}]'
+        b"}});"
+    )
+    table = parse_gviz_table(payload)
+    assert table.labels == ["id", "B"]  # an empty label falls back to the column id
+    assert table.columns == [[1.0, 2.0, 3.0], [None, None, "z"]]
+    assert len(table) == 3 and table.nbytes == len(payload)
+    assert table.to_columns() == {"id": [1.0, 2.0, 3.0], "B": [None, None, "z"]}
+    assert table.rows()[2] == {"id": 3.0, "B": "z"}
+    assert GvizTable.from_rows(table.rows()).columns == table.columns
+
+
+def test_parse_gviz_table_without_orjson(monkeypatch):
+    import sys
+
+    monkeypatch.setitem(sys.modules, "orjson", None)  # import orjson -> ImportError
+    payload = '/*O_o*/\nx({"status":"ok","table":{"cols":[{"id":"A"}],"rows":[{"c":[{"v":1}]}]}});'
+    assert parse_gviz_table(payload).rows() == [{"A": 1}]
+
+
+async def test_query_columnar_decodes_each_column_once():
+    from gsab import SheetConnection, SheetManager
+    from gsab.core.schema import Field, FieldType, Schema
+    from gsab.testing import FakeSheetsService
+
+    fake = FakeSheetsService()
+    schema = Schema(
+        "t",
+        [
+            Field("id", FieldType.INTEGER),
+            Field("qty", FieldType.INTEGER, required=False),
+            Field("day", FieldType.DATE),
+        ],
+    )
+    db = SheetManager(SheetConnection(service=fake), schema)
+    grid = [["id", "qty", "day"], [1, 5, "2024-01-02"], [2, "n/a", "2024-01-03"], [3, None, ""]]
+    db.sheet_id = fake.add_spreadsheet({"t": grid})
+
+    columns = await db.query("SELECT A, B, C ORDER BY A", columnar=True)
+    assert columns["id"] == [1, 2, 3] and all(type(v) is int for v in columns["id"])
+    assert columns["day"][0] == date(2024, 1, 2)
+    rows = await db.query("SELECT A, B, C ORDER BY A")
+    assert [r["id"] for r in rows] == columns["id"]
+    assert [r["qty"] for r in rows] == columns["qty"]
+
+
+def test_gviz_pages_rewrite_limit_and_offset():
+    sql = "SELECT A WHERE B = 'limit 3' ORDER BY A"
+    assert list(islice(gviz_pages(sql, 2), 2)) == [
+        ("SELECT A WHERE B = 'limit 3' ORDER BY A LIMIT 2", 2),
+        ("SELECT A WHERE B = 'limit 3' ORDER BY A LIMIT 2 OFFSET 2", 2),
+    ]
+    bounded = "SELECT A LIMIT 5 OFFSET 2 LABEL A 'n'"
+    assert list(gviz_pages(bounded, 2)) == [
+        ("SELECT A LIMIT 2 OFFSET 2 LABEL A 'n'", 2),
+        ("SELECT A LIMIT 2 OFFSET 4 LABEL A 'n'", 2),
+        ("SELECT A LIMIT 1 OFFSET 6 LABEL A 'n'", 1),
+    ]
+    assert list(gviz_pages("SELECT A LIMIT 0", 2)) == []
+
+
+def _paged_db(n):
+    from gsab import SheetConnection, SheetManager
+    from gsab.core.schema import Field, FieldType, Schema
+    from gsab.testing import FakeSheetsService
+
+    fake = FakeSheetsService()
+    db = SheetManager(SheetConnection(service=fake), Schema("t", [Field("id", FieldType.INTEGER)]))
+    db.sheet_id = fake.add_spreadsheet({"t": [["id"]] + [[i] for i in range(n)]})
+    return fake, db
+
+
+async def test_iter_query_pages_through_the_result():
+    fake, db = _paged_db(10)
+    rows = [r async for r in db.iter_query("SELECT A WHERE A >= 2 ORDER BY A", page_size=3)]
+    assert [r["id"] for r in rows] == list(range(2, 10))
+    assert fake.calls["gviz"] == 3  # 3 + 3 + a short page of 2
+    rows = [r async for r in db.iter_query("SELECT A ORDER BY A LIMIT 4 OFFSET 5", page_size=3)]
+    assert [r["id"] for r in rows] == [5, 6, 7, 8]
+
+
+async def test_iter_query_prefetches_the_next_page():
+    _, db = _paged_db(10)
+    sent = []
+    query = db.query
+
+    async def recording(sql, **kw):
+        sent.append(sql)
+        return await query(sql, **kw)
+
+    db.query = recording
+    stream = db.iter_query("SELECT A ORDER BY A", page_size=4)
+    assert (await stream.__anext__())["id"] == 0
+    await asyncio.sleep(0)
+    assert sent == ["SELECT A ORDER BY A LIMIT 4", "SELECT A ORDER BY A LIMIT 4 OFFSET 4"]
+    await stream.aclose()
+    assert len(sent) == 2
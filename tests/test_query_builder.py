@@ -0,0 +1,122 @@
+"""Offline tests for the field-name gviz query builder."""
+
+from datetime import date
+
+import pytest
+from cryptography.fernet import Fernet
+
+from gsab import Field, FieldType, Schema, SheetConnection, SheetManager
+from gsab.core import query_builder
+from gsab.exceptions import ValidationError
+from gsab.testing import FakeSheetsService
+
+
+def _db():
+    fake = FakeSheetsService()
+    schema = Schema(
+        "items",
+        [
+            Field("id", FieldType.INTEGER),
+            Field("name", FieldType.STRING),
+            Field("price", FieldType.FLOAT),
+            Field("added", FieldType.DATE),
+            Field("sold", FieldType.BOOLEAN, required=False),
+        ],
+    )
+    db = SheetManager(SheetConnection(service=fake), schema)
+    db.sheet_id = fake.add_spreadsheet(
+        {
+            "items": [
+                ["id", "name", "price", "added", "sold"],
+                [1, "lamp", 1500.0, "2024-01-05", True],
+                [2, "O'Neil mug", 12.5, "2024-03-01", False],
+                [3, "desk", 2400.0, "2023-11-30", ""],
+                [4, "chair", 800.0, "2024-02-10", True],
+            ]
+        }
+    )
+    return fake, db
+
+
+def test_compiles_field_names_to_columns():
+    _, db = _db()
+    q = db.select("name", "price").where(price__gt=1000).order_by("-price").limit(10)
+    assert q.compile() == "SELECT B, C WHERE C > 1000.0 ORDER BY C desc LIMIT 10"
+    assert (
+        db.select("name", "avg(price)").group_by("name").order_by("-avg(price)").compile()
+        == "SELECT B, avg(C) GROUP BY B ORDER BY avg(C) desc"
+    )
+
+
+def test_values_are_typed_and_quoted():
+    _, db = _db()
+    q = db.select().where(
+        name="O'Neil mug",
+        id__in=[1, "2"],
+        added__gte=date(2024, 1, 1),
+        sold=True,
+        price__ne=None,
+    )
+    assert q.compile() == (
+        "SELECT * WHERE B = \"O'Neil mug\" and (A = 1 or A = 2) and D >= '2024-01-01' "
+        "and E = true and C is not null"
+    )
+    with pytest.raises(ValidationError, match="both"):
+        db.select().where(name='it\'s "x"').compile()
+    with pytest.raises(ValidationError, match="price"):
+        db.select().where(price__gt="lots")
+
+
+@pytest.mark.parametrize(
+    "where",
+    [{"nope": 1}, {"price__gtt": 1}, {"id__in": []}],
+)
+def test_bad_conditions_are_rejected(where):
+    _, db = _db()
+    with pytest.raises(ValidationError):
+        db.select().where(**where)
+
+
+async def test_runs_against_the_sheet_and_pages():
+    _, db = _db()
+    rows = await db.select("name", "price").where(price__gt=1000).order_by("-price").limit(10)
+    assert rows == [{"name": "desk", "price": 2400.0}, {"name": "lamp", "price": 1500.0}]
+    assert await db.select("id").where(added__lt=date(2024, 1, 1)) == [{"id": 3}]
+    assert await db.select("id").where(sold__isnull=True) == [{"id": 3}]
+
+    page = db.select("id").order_by("id").limit(2)
+    assert [r["id"] for r in await page.offset(2)] == [3, 4]
+    columns = await page.fetch(columnar=True)
+    assert columns == {"id": [1, 2]}
+
+
+def test_builders_are_immutable_and_share_templates():
+    _, db = _db()
+    base = db.select("id").order_by("id").limit(2)
+    query_builder._template.cache_clear()
+    pages = [base.offset(n).compile() for n in (2, 4, 6)]
+    assert base.compile() == "SELECT A ORDER BY A LIMIT 2"
+    assert pages[-1] == "SELECT A ORDER BY A LIMIT 2 OFFSET 6"
+    assert query_builder._template.cache_info().misses == 2  # base + every page
+
+
+async def test_searchable_fields_compare_sealed_values():
+    key = Fernet.generate_key().decode()
+    fake = FakeSheetsService()
+    schema = Schema(
+        "users",
+        [
+            Field("id", FieldType.INTEGER),
+            Field("email", FieldType.STRING, searchable=True),
+            Field("note", FieldType.STRING, encrypted=True, required=False),
+        ],
+    )
+    db = SheetManager(SheetConnection(service=fake), schema, key)
+    db.sheet_id = fake.add_spreadsheet({"users": [["id", "email", "note"]]})
+    await db.bulk_insert([{"id": i, "email": f"u{i}@x.io"} for i in range(3)])
+    assert await db.select("id").where(email="u1@x.io") == [{"id": 1}]
+    assert await db.select("id").where(email__nin=["u0@x.io", "u2@x.io"]) == [{"id": 1}]
+    with pytest.raises(ValidationError, match="encrypted"):
+        db.select().where(email__contains="x.io")
+    with pytest.raises(ValidationError, match="encrypted"):
+        db.select().where(note="hi")
@@ -0,0 +1,96 @@
+"""Offline tests for the gviz query result cache."""
+
+import pytest
+
+from gsab import Field, FieldType, QueryCache, Schema, SheetConnection, SheetManager
+from gsab.testing import FakeSheetsService
+
+from .test_snapshot import _FakeDrive
+
+
+def _db(cache):
+    fake = FakeSheetsService()
+    schema = Schema("items", [Field("id", FieldType.INTEGER), Field("price", FieldType.FLOAT)])
+    db = SheetManager(SheetConnection(service=fake), schema, query_cache=cache)
+    db.sheet_id = fake.add_spreadsheet({"items": [["id", "price"], [1, 2.0], [2, 4.0]]})
+    return fake, db
+
+
+async def test_repeat_queries_are_served_from_memory():
+    fake, db = _db(QueryCache())
+    first = await db.query("SELECT AVG(B)")
+    first[0]["avg price"] = "mutated"  # the cache keeps its own copy
+    assert await db.query("SELECT AVG(B)") == [{"avg price": 3.0}]
+    assert fake.calls["gviz"] == 1
+    await db.query("SELECT A")
+    assert fake.calls["gviz"] == 2
+
+
+async def test_writes_through_the_manager_invalidate():
+    cache = QueryCache()
+    fake, db = _db(cache)
+    await db.query("SELECT SUM(B)")
+    await db.insert({"id": 3, "price": 6.0})
+    assert await db.query("SELECT SUM(B)") == [{"sum price": 12.0}]
+    await db.update({"id": 3}, {"price": 1.0})
+    assert await db.query("SELECT SUM(B)") == [{"sum price": 7.0}]
+    assert fake.calls["gviz"] == 3
+
+
+async def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("gsab.core.query_cache.time.monotonic", lambda: now[0])
+    fake, db = _db(QueryCache(ttl=10))
+    await db.query("SELECT A")
+    now[0] += 9
+    await db.query("SELECT A")
+    assert fake.calls["gviz"] == 1
+    now[0] += 2
+    await db.query("SELECT A")
+    assert fake.calls["gviz"] == 2
+
+
+async def test_drive_version_catches_edits_made_elsewhere():
+    fake, db = _db(QueryCache(validate=True))
+    drive = _FakeDrive("1")
+    db._drive = lambda: drive
+    await db.query("SELECT SUM(B)")
+    assert await db.query("SELECT SUM(B)") == [{"sum price": 6.0}]
+    fake.grid(db.sheet_id, "items").append([3, 10.0])  # someone edits in the web UI
+    drive.version = "2"
+    assert await db.query("SELECT SUM(B)") == [{"sum price": 16.0}]
+    assert (fake.calls["gviz"], drive.checks) == (2, 3)
+
+
+def test_lru_and_byte_budget_evict_oldest_first():
+    cache = QueryCache(max_entries=2)
+    for sql in ("a", "b"):
+        cache.put("S", "t", sql, [{"x": sql}], generation=0)
+    assert cache.get("S", "t", "a") is not None  # "a" is now the most recent
+    cache.put("S", "t", "c", [{"x": "c"}], generation=0)
+    assert cache.get("S", "t", "b") is None and len(cache) == 2
+
+    small = QueryCache(max_bytes=200)
+    small.put("S", "t", "big", [{"x": "y" * 500}], generation=0)
+    assert len(small) == 0  # over budget on its own: never cached
+    for i in range(5):
+        small.put("S", "t", str(i), [{"x": i}], generation=0)
+    assert small.size_bytes <= 200 and small.get("S", "t", "4") is not None
+
+
+def test_a_result_fetched_across_an_invalidation_is_not_stored():
+    cache = QueryCache()
+    generation = cache.generation("S")
+    cache.invalidate("S")  # a write landed while the query was running
+    cache.put("S", "t", "q", [{"x": 1}], generation=generation)
+    assert cache.get("S", "t", "q") is None
+    cache.put("S", "t", "q", [{"x": 1}], generation=cache.generation("S"))
+    cache.invalidate()
+    assert cache.get("S", "t", "q") is None
+
+
+@pytest.mark.parametrize("version", [None, "2"])
+def test_version_tagged_entries(version):
+    cache = QueryCache()
+    cache.put("S", "t", "q", [{"x": 1}], generation=0, version="1")
+    assert (cache.get("S", "t", "q", version=version) is None) == (version == "2")
@@ -0,0 +1,125 @@
+"""Offline tests for row versions (optimistic concurrency on update / upsert / delete)."""
+
+import pytest
+
+from gsab import ConflictError, Field, FieldType, Schema, SheetConnection, SheetManager
+from gsab.testing import FakeSheetsService
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    async def _instant(_delay):
+        return None
+
+    monkeypatch.setattr("gsab.core.sheet_manager.asyncio.sleep", _instant)
+
+
+def _schema():
+    return Schema(
+        "items",
+        [
+            Field("id", FieldType.INTEGER, primary_key=True),
+            Field("price", FieldType.FLOAT),
+            Field("rev", FieldType.STRING, version=True),
+        ],
+    )
+
+
+async def _db(**kwargs):
+    fake = FakeSheetsService()
+    db = SheetManager(SheetConnection(service=fake), _schema(), **kwargs)
+    db.sheet_id = fake.add_spreadsheet({"items": [["id", "price", "rev"]]})
+    await db.bulk_insert([{"id": i, "price": float(i)} for i in range(1, 5)])
+    return fake, db
+
+
+def _revs(fake, db):
+    return {row[0]: row[2] for row in fake.grid(db.sheet_id, "items")[1:]}
+
+
+async def test_writes_stamp_and_bump_versions():
+    fake, db = await _db()
+    before = _revs(fake, db)
+    assert len(set(before.values())) == 4 and all(before.values())
+    await db.update({"id": 2}, {"price": 20.0, "rev": "mine"})
+    after = _revs(fake, db)
+    assert after[2] not in (before[2], "mine")  # a new version, never the caller's
+    assert {k: v for k, v in after.items() if k != 2} == {k: before[k] for k in (1, 3, 4)}
+    await db.update({"id": 3}, {"price": 3.0})  # nothing changes: no write, no bump
+    assert _revs(fake, db)[3] == before[3]
+
+
+async def test_a_concurrent_write_is_detected_and_the_update_redone():
+    fake, db = await _db()
+    read = db._read_indexed
+    meddled = []
+
+    async def racing(*args):
+        rows = await read(*args)
+        if not meddled:  # another writer changes row 2 right after our read
+            meddled.append(1)
+            grid = fake.grid(db.sheet_id, "items")
+            grid[2][1:] = [99.0, "theirs"]
+        return rows
+
+    db._read_indexed = racing
+    assert await db.update({"id": 2}, {"price": 5.0}) == 1
+    assert fake.calls["values.batchGet"] == 2
+    row = fake.grid(db.sheet_id, "items")[2]
+    assert row[:2] == [2, 5.0] and row[2] != "theirs"
+
+
+async def test_rows_shifted_by_a_delete_are_not_overwritten():
+    fake, db = await _db()
+    read = db._read_indexed
+    shifted = []
+
+    async def racing(*args):
+        rows = await read(*args)
+        if not shifted:  # row 1 is deleted above the target, moving it up
+            shifted.append(1)
+            del fake.grid(db.sheet_id, "items")[1]
+        return rows
+
+    db._read_indexed = racing
+    await db.upsert({"id": 3, "price": 30.0})
+    assert [row[:2] for row in fake.grid(db.sheet_id, "items")[1:]] == [
+        [2, 2.0],
+        [3, 30.0],
+        [4, 4.0],
+    ]
+
+
+async def test_persistent_conflicts_raise_after_the_retries():
+    fake, db = await _db(conflict_retries=2)
+    read = db._read_indexed
+
+    async def always_racing(*args):
+        rows = await read(*args)
+        fake.grid(db.sheet_id, "items")[1][2] = f"other-{fake.calls['values.get']}"
+        return rows
+
+    db._read_indexed = always_racing
+    with pytest.raises(ConflictError, match="Row 2"):
+        await db.delete({"id": 1})
+    assert fake.calls["values.batchGet"] == 3
+    assert len(fake.grid(db.sheet_id, "items")) == 5  # nothing deleted
+
+
+async def test_the_read_version_in_filters_makes_a_compare_and_set():
+    fake, db = await _db()
+    (row,) = await db.read({"id": 1})
+    await db.update({"id": 1}, {"price": 10.0})  # someone else, in between
+    assert await db.update({"id": 1, "rev": row["rev"]}, {"price": 11.0}) == 0
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        [Field("rev", FieldType.INTEGER, version=True)],
+        [Field("a", FieldType.STRING, version=True), Field("b", FieldType.STRING, version=True)],
+    ],
+)
+def test_bad_version_fields_are_rejected(fields):
+    with pytest.raises(ValueError, match="ersion field"):
+        Schema("t", fields)
@@ -0,0 +1,106 @@
+"""Offline tests for ShardedTable: key placement, routing, fan-out and growth."""
+
+import pytest
+
+from gsab import Field, FieldType, Schema, ShardedTable, SheetConnection
+from gsab.exceptions import ValidationError
+from gsab.testing import FakeSheetsService
+
+_SCHEMA = Schema(
+    "users",
+    [
+        Field("id", FieldType.INTEGER, primary_key=True),
+        Field("plan", FieldType.STRING),
+    ],
+)
+
+
+def _table(n=3):
+    fake = FakeSheetsService()
+    ids = [fake.add_spreadsheet({"users": [["id", "plan"]]}) for _ in range(n)]
+    return fake, ShardedTable(SheetConnection(service=fake), _SCHEMA, ids)
+
+
+def _keys(fake, shard):
+    return [row[0] for row in fake.grid(shard.sheet_id, shard.schema.name)[1:]]
+
+
+async def test_rows_are_spread_by_key_and_found_again():
+    fake, users = _table()
+    records = [{"id": i, "plan": "pro" if i % 2 else "free"} for i in range(60)]
+    assert await users.bulk_insert(records) == 60
+    assert fake.calls["values.append"] == 3  # one append per shard
+    placed = {key: shard for shard in users.shards for key in _keys(fake, shard)}
+    assert sorted(placed) == list(range(60))
+    assert all(len(_keys(fake, shard)) > 5 for shard in users.shards)
+    assert all(users.shard_for(k) is shard for k, shard in placed.items())
+    assert users.shard_for("7") is users.shard_for(7)
+
+    before = fake.calls["values.get"]
+    assert await users.get(7) == {"id": 7, "plan": "pro"}
+    assert await users.get(1000) is None
+    assert fake.calls["values.get"] - before == 2  # each lookup read one shard
+
+    rows = await users.read({"plan": "pro"})
+    assert sorted(r["id"] for r in rows) == list(range(1, 60, 2))
+
+
+def test_placement_is_stable_and_independent_of_shard_order():
+    _, users = _table()
+    flipped = ShardedTable(users.connection, _SCHEMA, [s.sheet_id for s in reversed(users.shards)])
+    for key in range(50):
+        assert users.shard_for(key).sheet_id == flipped.shard_for(key).sheet_id
+
+
+async def test_key_filters_touch_only_the_owning_shards():
+    fake, users = _table()
+    await users.bulk_insert([{"id": i, "plan": "free"} for i in range(30)])
+    owners = {users.shard_for(k).sheet_id for k in (3, 4)}
+
+    before = fake.calls["values.get"]
+    assert await users.update({"id": {"$in": [3, 4]}}, {"plan": "pro"}) == 2
+    assert fake.calls["values.get"] - before == len(owners)
+    assert await users.upsert({"id": 3, "plan": "team"}) == "updated"
+    assert await users.bulk_upsert([{"id": 4, "plan": "x"}, {"id": 99, "plan": "y"}]) == {
+        "inserted": 1,
+        "updated": 1,
+    }
+    assert await users.delete({"id": 3}) == 1
+    assert sorted(r["id"] for r in await users.read({"plan": {"$ne": "free"}})) == [4, 99]
+    with pytest.raises(ValidationError, match="key field"):
+        await users.update({"id": 4}, {"id": 5})
+
+
+async def test_adding_a_shard_moves_only_the_rows_it_now_owns():
+    fake, users = _table(2)
+    await users.bulk_insert([{"id": i, "plan": "free"} for i in range(90)])
+    before = {k: users.shard_for(k).sheet_id for k in range(90)}
+
+    new = await users.add_shard(title="Users 3")
+    assert len(users.shards) == 3 and users.shards[-1] is new
+    after = {k: users.shard_for(k).sheet_id for k in range(90)}
+    moved = [k for k in range(90) if before[k] != after[k]]
+    assert moved and all(after[k] == new.sheet_id for k in moved)  # nothing else moves
+    assert sorted(_keys(fake, new)) == moved
+    assert sorted(r["id"] for r in await users.read()) == list(range(90))
+    assert await users.rebalance() == 0
+
+
+async def test_shards_it_creates_pass_a_created_only_policy():
+    from gsab import AccessPolicy
+
+    fake = FakeSheetsService()
+    users = ShardedTable(
+        SheetConnection(service=fake), _SCHEMA, policy=AccessPolicy(allowed_sheets=[])
+    )
+    await users.add_shard(title="Users 1", migrate=False)
+    await users.add_shard(title="Users 2")
+    await users.bulk_insert([{"id": i, "plan": "free"} for i in range(10)])
+    assert sorted(r["id"] for r in await users.read()) == list(range(10))
+
+
+def test_a_key_is_required():
+    with pytest.raises(ValidationError, match="primary_key"):
+        ShardedTable(None, Schema("t", [Field("a", FieldType.STRING)]), ["S"])
+    with pytest.raises(ValidationError, match="no shards"):
+        ShardedTable(None, _SCHEMA).shard_for(1)
@@ -0,0 +1,117 @@
+"""Offline tests for single-flight coalescing of concurrent reads and queries."""
+
+import asyncio
+
+import pytest
+
+from gsab import Field, FieldType, Schema, SheetConnection, SheetManager
+from gsab.testing import FakeSheetsService
+from gsab.utils.singleflight import SingleFlight, copy_rows
+
+
+def _db():
+    fake = FakeSheetsService()
+    schema = Schema("items", [Field("id", FieldType.INTEGER), Field("price", FieldType.FLOAT)])
+    db = SheetManager(SheetConnection(service=fake), schema)
+    db.sheet_id = fake.add_spreadsheet({"items": [["id", "price"], [1, 2.5], [2, 4.0]]})
+    return fake, db
+
+
+async def test_concurrent_reads_share_one_request():
+    fake, db = _db()
+    results = await asyncio.gather(*(db.read() for _ in range(50)))
+    assert fake.calls["values.get"] == 1
+    assert all(r == [{"id": 1, "price": 2.5}, {"id": 2, "price": 4.0}] for r in results)
+    results[0][0]["price"] = 99.0  # each caller owns its rows
+    assert results[1][0]["price"] == 2.5
+
+
+async def test_concurrent_reads_with_different_filters_share_the_fetch():
+    fake, db = _db()
+    cheap, pricey = await asyncio.gather(
+        db.read({"price": {"$lt": 3}}), db.read({"price": {"$gte": 3}})
+    )
+    assert fake.calls["values.get"] == 1
+    assert [r["id"] for r in cheap] == [1] and [r["id"] for r in pricey] == [2]
+
+
+async def test_identical_queries_coalesce_distinct_ones_do_not():
+    fake, db = _db()
+    same = await asyncio.gather(*(db.query("SELECT AVG(B)") for _ in range(10)))
+    assert fake.calls["gviz"] == 1
+    assert all(rows == same[0] for rows in same)
+    await asyncio.gather(db.query("SELECT A"), db.query("SELECT B"))
+    assert fake.calls["gviz"] == 3
+
+
+async def test_sequential_reads_and_reads_after_a_write_refetch():
+    fake, db = _db()
+    await db.read()
+    await db.insert({"id": 3, "price": 1.0})
+    assert len(await db.read()) == 3
+    assert fake.calls["values.get"] == 2
+
+
+async def test_a_write_detaches_later_reads_from_the_flight_in_progress():
+    flights = SingleFlight()
+    gate = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await gate.wait()
+        return len(calls)
+
+    before = asyncio.create_task(flights.do("k", fetch))
+    await asyncio.sleep(0)
+    flights.forget()  # a write landed
+    after = asyncio.create_task(flights.do("k", fetch))
+    await asyncio.sleep(0)
+    gate.set()
+    assert await asyncio.gather(before, after) == [2, 2] and len(calls) == 2
+
+
+async def test_a_cancelled_caller_does_not_cancel_the_shared_call():
+    flights = SingleFlight()
+    gate = asyncio.Event()
+
+    async def fetch():
+        await gate.wait()
+        return [{"x": 1}]
+
+    leader = asyncio.create_task(flights.do("k", fetch, copy=copy_rows))
+    follower = asyncio.create_task(flights.do("k", fetch, copy=copy_rows))
+    await asyncio.sleep(0)
+    leader.cancel()
+    gate.set()
+    assert await follower == [{"x": 1}]
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert len(flights) == 0
+
+
+async def test_errors_reach_every_caller_and_nothing_is_kept():
+    flights = SingleFlight()
+    calls = []
+
+    async def boom():
+        calls.append(1)
+        raise RuntimeError("down")
+
+    results = await asyncio.gather(
+        flights.do("k", boom), flights.do("k", boom), return_exceptions=True
+    )
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError] and len(calls) == 1
+    with pytest.raises(RuntimeError):
+        await flights.do("k", boom)
+    assert len(calls) == 2
+
+
+async def test_an_unshared_result_is_not_copied():
+    flights = SingleFlight()
+    rows = [{"x": 1}]
+
+    async def fetch():
+        return rows
+
+    assert await flights.do("k", fetch, copy=copy_rows) is rows
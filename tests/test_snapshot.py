@@ -0,0 +1,108 @@
+"""Offline tests for the on-disk snapshot store and snapshot-backed reads."""
+
+from gsab.core.sheet_manager import SheetManager
+from gsab.core.snapshot import SnapshotStore
+
+from .test_crud import FakeConnection, _Request, _schema
+
+
+class _FakeDrive:
+    def __init__(self, version="1"):
+        self.version = version
+        self.checks = 0
+
+    def files(self):
+        return self
+
+    def get(self, *, fileId, fields):
+        self.checks += 1
+        return _Request({"version": self.version})
+
+
+def _manager(conn, store, drive):
+    db = SheetManager(conn, _schema(), snapshot=store)
+    db.sheet_id = "SHEET"
+    db._drive = lambda: drive
+    return db
+
+
+def test_store_round_trip_and_version_tag(tmp_path):
+    store = SnapshotStore(tmp_path / "s.sqlite3")
+    store.put("S", "t", "3", [["id"], ["1"]])
+    assert store.get("S", "t", "3") == [["id"], ["1"]]
+    assert store.get("S", "t", "4") is None  # stale version
+    assert store.get("S", "other", "3") is None
+    store.drop("S")
+    assert store.get("S", "t", "3") is None
+
+
+async def test_read_serves_current_snapshot_from_disk(tmp_path):
+    store = SnapshotStore(tmp_path / "s.sqlite3")
+    drive = _FakeDrive("1")
+    conn = FakeConnection([["id", "age"], ["1", "20"]])
+    assert await _manager(conn, store, drive).read() == [{"id": 1, "age": 20}]
+    assert conn.ranges == ["t!A:Z"]
+
+    # A fresh manager (a new process) with the version unchanged reads from disk.
+    conn2 = FakeConnection([["id", "age"], ["9", "99"]])
+    assert await _manager(conn2, store, drive).read() == [{"id": 1, "age": 20}]
+    assert conn2.ranges == []
+    assert drive.checks == 2  # one cheap metadata call per read
+
+
+async def test_read_refetches_when_version_moves(tmp_path):
+    store = SnapshotStore(tmp_path / "s.sqlite3")
+    drive = _FakeDrive("1")
+    conn = FakeConnection([["id", "age"], ["1", "20"]])
+    db = _manager(conn, store, drive)
+    await db.read()
+    conn.grid = [["id", "age"], ["1", "21"]]
+    drive.version = "2"
+    assert await db.read() == [{"id": 1, "age": 21}]
+    assert store.get("SHEET", "t", "2") == conn.grid
+
+
+async def test_fresh_snapshots_skip_the_version_check_until_a_write(tmp_path, monkeypatch):
+    import threading
+
+    store = SnapshotStore(tmp_path / "s.sqlite3", ttl=60)
+    threads = set()
+    for name in ("fresh", "get", "put"):
+        method = getattr(store, name)
+
+        def spy(*args, _method=method):
+            threads.add(threading.current_thread())
+            return _method(*args)
+
+        monkeypatch.setattr(store, name, spy)
+    drive = _FakeDrive("1")
+    conn = FakeConnection([["id", "age"], ["1", "20"]])
+    db = _manager(conn, store, drive)
+    await db.read()
+    assert await db.read() == [{"id": 1, "age": 20}]
+    assert drive.checks == 1 and conn.ranges == ["t!A:Z"]  # inside the ttl: disk only
+    assert threading.main_thread() not in threads  # sqlite I/O stays off the event loop
+
+    await db.update({"id": 1}, {"age": 21})  # a write's read always checks the version
+    assert drive.checks == 2
+    conn.grid = [["id", "age"], ["1", "21"]]
+    drive.version = "2"
+    assert await db.read() == [{"id": 1, "age": 21}]  # the write ended the window
+    assert drive.checks == 3
+
+    monkeypatch.setattr("gsab.core.snapshot.time.time", lambda: 10**10)  # ttl ran out
+    await db.read()
+    assert drive.checks == 4
+
+
+async def test_read_falls_back_when_drive_check_fails(tmp_path):
+    from gsab.exceptions import PermissionDeniedError
+
+    class _DeniedDrive(_FakeDrive):
+        def get(self, *, fileId, fields):
+            raise PermissionDeniedError("no drive scope")
+
+    store = SnapshotStore(tmp_path / "s.sqlite3")
+    conn = FakeConnection([["id", "age"], ["1", "20"]])
+    assert await _manager(conn, store, _DeniedDrive()).read() == [{"id": 1, "age": 20}]
+    assert conn.ranges == ["t!A:Z"]
@@ -0,0 +1,141 @@
+"""Offline tests for the compiled schema validator and DataFrame validation."""
+
+from datetime import date
+
+import pytest
+
+from gsab import SheetConnection, SheetManager
+from gsab.core.schema import Field, FieldType, Schema, ValidationRule
+from gsab.exceptions import ValidationError
+from gsab.testing import FakeSheetsService
+
+
+def _schema():
+    return Schema(
+        "people",
+        [
+            Field("id", FieldType.INTEGER, primary_key=True, min_value=1),
+            Field("name", FieldType.STRING, min_length=2, max_length=5, pattern=r"[A-Z]"),
+            Field("score", FieldType.FLOAT, min_value=0, max_value=10, required=False),
+            Field("active", FieldType.BOOLEAN, default=True),
+            Field("born", FieldType.DATE, required=False, min_value=0),
+            Field(
+                "tag",
+                FieldType.STRING,
+                required=False,
+                validation_rules=[ValidationRule(lambda x: x != "bad", "no bad tags")],
+            ),
+        ],
+    )
+
+
+def _reference(schema, data):
+    """The original per-rule validation, evaluated through each field's rule lambdas."""
+    errors = []
+    for field in schema.fields:
+        value = data.get(field.name)
+        if value is None:
+            if field.required and field.default is None:
+                errors.append(f"Field {field.name} is required")
+            continue
+        ft = field.field_type
+        if ft in (FieldType.INTEGER, FieldType.FLOAT):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                errors.append(f"Invalid value for type {ft}: {value}")
+                continue
+        elif ft == FieldType.BOOLEAN and not isinstance(value, bool):
+            errors.append(f"Invalid value for type {ft}: {value}")
+            continue
+        elif ft == FieldType.STRING and not isinstance(value, str):
+            errors.append(f"Invalid value for type {ft}: {value}")
+            continue
+        elif ft == FieldType.DATE:
+            try:
+                schema._convert_value(value, ft)
+            except ValueError as e:
+                errors.append(str(e))
+                continue
+        for rule in field.validation_rules:
+            try:
+                if not rule.condition(value):
+                    errors.append(rule.error_message)
+            except Exception as e:
+                errors.append(f"Validation error: {str(e)}")
+    return errors
+
+
+RECORDS = [
+    {"id": 1, "name": "Ada"},
+    {"id": 0, "name": "a", "score": 11.5},
+    {"id": True, "name": "Abcdef", "active": "yes"},
+    {"name": 7, "score": -1, "tag": "bad"},
+    {"id": 3.0, "name": "Bo", "born": "2024-01-01", "tag": "ok"},
+    {"id": 2, "name": "Cy", "born": date(2024, 1, 1)},
+    {"id": 2, "name": "Cy", "born": "not a date", "active": False},
+    {"id": "4", "name": None, "score": "x"},
+    {"id": 5, "name": "Di", "born": "2024-13-01"},
+    {"id": 6, "name": "Ed", "born": "2024-1-5"},
+    {},
+]
+
+
+@pytest.mark.parametrize("record", RECORDS)
+def test_compiled_validator_matches_the_per_rule_messages(record):
+    schema = _schema()
+    assert schema.validate(record) == _reference(schema, record)
+
+
+def test_validate_value_and_unknown_field():
+    schema = _schema()
+    assert schema.validate_value("id", 5) == []
+    assert schema.validate_value("id", None) == ["Field id is required"]
+    assert schema.validate_value("active", None) == []  # has a default
+    with pytest.raises(ValueError, match="Unknown field"):
+        schema.validate_value("nope", 1)
+
+
+def test_validator_is_compiled_once_per_schema():
+    schema = _schema()
+    assert schema.validator is schema.validator
+    assert schema.fields[5].custom_rules[0].error_message == "no bad tags"
+    assert len(schema.fields[1].custom_rules) == 0
+
+
+def test_validate_frame_reports_failing_rows():
+    pd = pytest.importorskip("pandas")
+    schema = _schema()
+    df = pd.DataFrame(
+        {
+            "id": [1, 2, 0, 4],
+            "name": ["Ada", "Bob", "Cy", "dave"],
+            "score": [1.5, 11.0, 2.0, float("nan")],
+            "tag": ["x", "y", "bad", "z"],
+        }
+    )
+    failures = schema.validator.validate_frame(df)
+    records = df.to_dict("records")
+    expected = {i: _reference(schema, r) for i, r in enumerate(records) if _reference(schema, r)}
+    assert failures == expected
+    assert sorted(failures) == [1, 2, 3]
+
+
+def test_validate_frame_missing_required_column_fails_every_row():
+    pd = pytest.importorskip("pandas")
+    failures = _schema().validator.validate_frame(pd.DataFrame({"name": ["Ada", "Bo"]}))
+    assert failures == {0: ["Field id is required"], 1: ["Field id is required"]}
+
+
+async def test_from_dataframe_validates_columns_then_inserts():
+    pd = pytest.importorskip("pandas")
+    fake = FakeSheetsService()
+    db = SheetManager(SheetConnection(service=fake), _schema())
+    db.sheet_id = fake.add_spreadsheet({"people": [[f.name for f in db.schema.fields]]})
+
+    good = pd.DataFrame({"id": [1, 2], "name": ["Ada", "Bo"], "score": [1.0, 2.5]})
+    assert await db.from_dataframe(good) == 2
+    assert [r["name"] for r in await db.read()] == ["Ada", "Bo"]
+
+    bad = pd.DataFrame({"id": [3, 4], "name": ["Cy", "x"]})
+    with pytest.raises(ValidationError, match="row 1"):
+        await db.from_dataframe(bad)
+    assert len(await db.read()) == 2
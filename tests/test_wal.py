@@ -0,0 +1,98 @@
+"""Offline tests for the local write-ahead log and its background flusher."""
+
+import pytest
+
+from gsab import (
+    Field,
+    FieldType,
+    QuotaExceededError,
+    Schema,
+    SheetConnection,
+    SheetManager,
+    WriteAheadLog,
+)
+from gsab.core.write_lock import tab_lock
+from gsab.testing import FakeSheetsService
+
+_SCHEMA = Schema(
+    "events", [Field("id", FieldType.INTEGER, primary_key=True), Field("kind", FieldType.STRING)]
+)
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    async def _instant(_delay):
+        return None
+
+    monkeypatch.setattr("gsab.utils.errors.asyncio.sleep", _instant)
+
+
+def _db(fake, wal, sheet_id=None):
+    db = SheetManager(SheetConnection(service=fake), _SCHEMA, wal=wal)
+    db.sheet_id = sheet_id or fake.add_spreadsheet({"events": [["id", "kind"]]})
+    return db
+
+
+def _ids(fake, db):
+    return [row[0] for row in fake.grid(db.sheet_id, "events")[1:]]
+
+
+async def test_inserts_are_logged_then_appended_in_one_batch(tmp_path):
+    fake = FakeSheetsService()
+    wal = WriteAheadLog(tmp_path / "wal.sqlite3")
+    db = _db(fake, wal)
+    async with tab_lock(db.sheet_id, "events"):  # the flusher waits, as behind a slow batch
+        for i in range(5):
+            await db.insert({"id": i, "kind": "click"})
+    assert wal.count() == 5 and fake.calls["values.append"] == 0  # acknowledged locally
+    await db._flusher  # queued first on the tab lock, it sends the backlog in one append
+    assert _ids(fake, db) == [0, 1, 2, 3, 4] and fake.calls["values.append"] == 1
+    assert len(wal) == 0 and await db.flush() == 0
+
+
+async def test_flush_writes_out_whatever_is_pending(tmp_path):
+    fake = FakeSheetsService()
+    db = _db(fake, WriteAheadLog(tmp_path / "wal.sqlite3"))
+    await db.bulk_insert([{"id": 1, "kind": "a"}, {"id": 2, "kind": "b"}])
+    await db.flush()
+    assert _ids(fake, db) == [1, 2] and db.wal.count(db.sheet_id) == 0
+
+
+async def test_rows_survive_an_outage_and_a_restart(tmp_path):
+    fake = FakeSheetsService()
+    wal = WriteAheadLog(tmp_path / "wal.sqlite3")
+    db = _db(fake, wal)
+    fake.fail(429, times=99, method="values.append")  # Google keeps rate-limiting
+    await db.insert({"id": 1, "kind": "a"})
+    with pytest.raises(QuotaExceededError):
+        await db.flush()
+    assert wal.count() == 1 and _ids(fake, db) == []
+    db._flusher.cancel()
+    wal.close()
+
+    fake._failures.clear()  # back up — and this process restarted
+    revived = _db(fake, WriteAheadLog(tmp_path / "wal.sqlite3"), db.sheet_id)
+    assert await revived.flush() == 1 and _ids(fake, revived) == [1]
+
+
+async def test_unwritable_rows_are_set_aside_without_blocking_the_rest(tmp_path):
+    fake = FakeSheetsService()
+    wal = WriteAheadLog(tmp_path / "wal.sqlite3")
+    db = _db(fake, wal)
+    fake.grid(db.sheet_id, "events").append([2, "old"])
+    async with tab_lock(db.sheet_id, "events"):
+        for i in (1, 2, 3):
+            await db.insert({"id": i, "kind": "new"})
+    await db._flusher
+    assert _ids(fake, db) == [2, 1, 3]
+    (failed,) = wal.failed()
+    assert failed["rows"] == [[2, "new"]] and "DuplicateKeyError" in failed["error"]
+    assert wal.requeue() == 1 and wal.count() == 1
+
+
+async def test_updates_see_logged_inserts(tmp_path):
+    fake = FakeSheetsService()
+    db = _db(fake, WriteAheadLog(tmp_path / "wal.sqlite3"))
+    await db.insert({"id": 1, "kind": "a"})
+    assert await db.update({"id": 1}, {"kind": "b"}) == 1
+    assert fake.grid(db.sheet_id, "events")[1] == [1, "b"]
@@ -0,0 +1,99 @@
+"""Offline tests for per-tab write serialization and cross-process lock backends."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from gsab import (
+    ConflictError,
+    Database,
+    Field,
+    FieldType,
+    FileLock,
+    LockTimeoutError,
+    Schema,
+    SheetConnection,
+    SheetManager,
+)
+from gsab.core.write_lock import tab_lock
+from gsab.testing import FakeSheetsService
+
+_SCHEMA = Schema(
+    "items", [Field("id", FieldType.INTEGER, primary_key=True), Field("price", FieldType.FLOAT)]
+)
+
+
+class _Recording:
+    """A lock backend that records the keys it was asked to hold."""
+
+    def __init__(self):
+        self.keys = []
+
+    @asynccontextmanager
+    async def lock(self, key):
+        self.keys.append(key)
+        yield
+
+
+def _setup(**kwargs):
+    fake = FakeSheetsService(latency=0.001)
+    sheet_id = fake.add_spreadsheet({"items": [["id", "price"]]})
+    managers = []
+    for _ in range(2):  # two managers (think: two request handlers) on one tab
+        db = SheetManager(SheetConnection(service=fake), _SCHEMA, **kwargs)
+        db.sheet_id = sheet_id
+        managers.append(db)
+    return fake, managers
+
+
+async def test_concurrent_upserts_of_a_new_key_insert_it_once():
+    fake, (a, b) = _setup()
+    calls = [db.upsert({"id": 7, "price": float(i)}) for i in range(5) for db in (a, b)]
+    await asyncio.gather(*calls)
+    rows = fake.grid(a.sheet_id, "items")[1:]
+    assert len(rows) == 1 and rows[0][1] == 4.0  # the last call wins: writes ran in order
+
+
+async def test_reads_are_never_blocked_by_a_write():
+    _, (db, _) = _setup()
+    await db.insert({"id": 1, "price": 1.0})
+    async with tab_lock(db.sheet_id, "items"):  # a write in progress
+        rows = await asyncio.wait_for(db.read(), timeout=2)
+    assert rows == [{"id": 1, "price": 1.0}]
+
+
+async def test_writes_hold_the_backend_lock():
+    backend = _Recording()
+    _, (db, _) = _setup(write_lock=backend)
+    await db.insert({"id": 1, "price": 1.0})
+    await db.update({"id": 1}, {"price": 2.0})
+    await db.read()
+    assert backend.keys == [f"{db.sheet_id}/items"] * 2
+
+
+async def test_transactions_lock_every_tab_in_name_order():
+    fake = FakeSheetsService()
+    backend = _Recording()
+    orders = Schema("orders", [Field("id", FieldType.INTEGER)])
+    db = Database(SheetConnection(service=fake), [_SCHEMA, orders], write_lock=backend)
+    db.sheet_id = fake.add_spreadsheet({"items": [["id", "price"]], "orders": [["id"]]})
+    async with db.transaction() as tx:
+        tx.insert("items", {"id": 1, "price": 1.0})
+        tx.insert("orders", {"id": 1})
+    assert backend.keys == [f"{db.sheet_id}/items", f"{db.sheet_id}/orders"]
+
+
+async def test_file_lock_excludes_other_holders_and_times_out(tmp_path):
+    ours, theirs = FileLock(tmp_path), FileLock(tmp_path, timeout=0.1, poll=0.01)
+    async with ours.lock("S/items"):
+        with pytest.raises(LockTimeoutError, match="write lock") as exc:
+            async with theirs.lock("S/items"):
+                pass
+        assert str(theirs.path("S/items")) in str(exc.value)
+        assert isinstance(exc.value, TimeoutError)
+        assert not isinstance(exc.value, ConflictError)
+        async with theirs.lock("S/other"):  # a different tab isn't blocked
+            pass
+    async with theirs.lock("S/items"):  # released
+        pass